@@ -0,0 +1,71 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import genanki
+
+from src.exporters.anki_exporter import AnkiExporter
+from src.exporters.apkg_writer import ApkgWriter
+
+FIELDS = ['Front', 'Back', 'Phonetic', 'Examples', 'Collins']
+
+
+def notes(count: int):
+    for i in range(count):
+        yield {
+            'Front': f'word{i}',
+            'Back': f'translation of word {i}',
+            'Phonetic': '/wɜːd/',
+            'Examples': f'An example sentence using word{i}.<br>Another one.',
+            'Collins': ''
+        }
+
+
+def write_genanki(model, count: int, path: str):
+    """The previous export_to_apkg: a genanki.Note per note, written at the end"""
+    deck = genanki.Deck(2059400110, 'Bench')
+    for note in notes(count):
+        deck.add_note(genanki.Note(model=model, fields=[note.get(name, '') for name in FIELDS]))
+    genanki.Package(deck).write_to_file(path)
+
+
+def write_bulk(model, count: int, path: str):
+    ApkgWriter(model, 2059400110, 'Bench').write(notes(count), path)
+
+
+def measure(fn):
+    """Return (seconds, peak traced bytes), timing an untraced run"""
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare genanki and bulk SQLite .apkg export")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    model = AnkiExporter().model
+    print(f"{'notes':>9} {'writer':>8} {'seconds':>9} {'peak MB':>9} {'file KB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            for name, fn in (('genanki', write_genanki), ('bulk', write_bulk)):
+                path = os.path.join(tmp, f'{name}-{size}.apkg')
+                elapsed, peak = measure(lambda: fn(model, size, path))
+                print(f"{size:>9} {name:>8} {elapsed:9.2f} {peak / 2 ** 20:9.1f} "
+                      f"{os.path.getsize(path) / 1024:9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from src.bloom_filter import BloomFilter
+from src.cache_manager import CacheManager
+from src.core.models import WordNote
+
+
+def traced(fn):
+    """Run fn and return its result, the Python heap it retains and its wall time
+
+    Time is measured in a separate untraced run since tracemalloc slows
+    allocation down considerably.
+    """
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    result = fn()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, retained, elapsed
+
+
+def bench(size: int, error_rate: float, probes: int, tmp: str):
+    words = [f"word{i}" for i in range(size)]
+
+    cached, set_bytes, _ = traced(lambda: set(words))
+    del cached
+
+    path = os.path.join(tmp, f"bloom-{size}.bloom")
+    bloom = BloomFilter.create(path, capacity=size, error_rate=error_rate)
+    start = time.perf_counter()
+    bloom.update(words)
+    build_time = time.perf_counter() - start
+    false_positives = sum(f"absent{i}" in bloom for i in range(probes))
+    bloom.close()
+
+    cache_file = os.path.join(tmp, f"cache-{size}.json")
+    seed = CacheManager(cache_file)
+    seed.save_cache(WordNote(source_lang='en', target_lang='zh', word=w, translate='x') for w in words)
+    seed.close()
+    # A fetch of mostly new words is where the filter saves queries
+    incoming = [WordNote(source_lang='en', target_lang='zh', word=w, translate='x')
+                for w in words[:probes // 10] + [f"absent{i}" for i in range(probes)]]
+
+    # The first open with the filter enabled builds it from the table
+    start = time.perf_counter()
+    CacheManager(cache_file, bloom_filter=True, bloom_error_rate=error_rate).close()
+    rebuild_time = time.perf_counter() - start
+
+    timings = {}
+    for label, enabled in (('sqlite', False), ('bloom+sqlite', True)):
+        cache, retained, open_time = traced(lambda: CacheManager(cache_file, bloom_filter=enabled,
+                                                                 bloom_error_rate=error_rate))
+        start = time.perf_counter()
+        new_words = cache.filter_new_words(incoming)
+        timings[label] = (open_time, time.perf_counter() - start, retained)
+        assert len(new_words) == probes
+        cache.close()
+
+    print(f"\n{size:,} cached words, target error rate {error_rate}")
+    print(f"  python set heap:      {set_bytes / 1024 / 1024:8.1f} MiB")
+    print(f"  bloom bit array:      {os.path.getsize(path) / 1024 / 1024:8.1f} MiB mapped "
+          f"({build_time:.1f} s to build)")
+    print(f"  cache filter rebuild: {rebuild_time:8.1f} s (first open with bloom_filter enabled)")
+    print(f"  false positive rate:  {false_positives / probes:8.4%} measured over {probes:,} absent words")
+    for label, (open_time, filter_time, retained) in timings.items():
+        print(f"  {label:<13} open {open_time * 1000:8.1f} ms, filter {len(incoming):,} words "
+              f"{filter_time * 1000:7.1f} ms, heap {retained / 1024:7.1f} KiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the Bloom filter in front of the word cache")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--error-rate', type=float, default=0.001)
+    parser.add_argument('--probes', type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            bench(size, args.error_rate, args.probes, tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from src.cache_manager import CacheManager
+from src.core.models import WordNote
+
+
+class LegacyJsonCache:
+    """The original CacheManager storage: one JSON document rewritten on save"""
+
+    def __init__(self, cache_file: str):
+        self.cache_file = cache_file
+        self.cached_words = set()
+        if os.path.exists(cache_file):
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                self.cached_words = set(json.load(f).get('words', []))
+
+    def save_cache(self, words):
+        for word in words:
+            self.cached_words.add(word.word)
+        with open(self.cache_file, 'w', encoding='utf-8') as f:
+            json.dump({'last_updated': datetime.now().isoformat(), 'words': list(self.cached_words)},
+                      f, ensure_ascii=False, indent=2)
+
+    def filter_new_words(self, words):
+        return [word for word in words if word.word not in self.cached_words]
+
+
+def notes(words):
+    return [WordNote(source_lang='en', target_lang='zh', word=w, translate='x') for w in words]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def bench(size: int, batch: int, tmp: str):
+    """Time startup, filtering a fetched batch and saving it for one cache size"""
+    existing = notes(f"word{i}" for i in range(size))
+    # A typical fetch: mostly known words plus a few new ones
+    incoming = existing[:batch - batch // 10] + notes(f"new{i}" for i in range(batch // 10))
+
+    json_path = os.path.join(tmp, f"legacy-{size}.json")
+    LegacyJsonCache(json_path).save_cache(existing)
+    legacy, legacy_load = timed(lambda: LegacyJsonCache(json_path))
+    new_legacy, legacy_filter = timed(lambda: legacy.filter_new_words(incoming))
+    _, legacy_save = timed(lambda: legacy.save_cache(new_legacy))
+
+    sqlite_path = os.path.join(tmp, f"sqlite-{size}.json")
+    seed = CacheManager(sqlite_path)
+    seed.save_cache(existing)
+    seed.close()
+    cache, sqlite_load = timed(lambda: CacheManager(sqlite_path))
+    new_sqlite, sqlite_filter = timed(lambda: cache.filter_new_words(incoming))
+    _, sqlite_save = timed(lambda: cache.save_cache(new_sqlite))
+    cache.close()
+    assert [n.word for n in new_sqlite] == [n.word for n in new_legacy]
+
+    print(f"{size:>9} {'json':>7} {legacy_load:10.2f} {legacy_filter:10.2f} {legacy_save:10.2f}")
+    print(f"{size:>9} {'sqlite':>7} {sqlite_load:10.2f} {sqlite_filter:10.2f} {sqlite_save:10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare JSON and SQLite CacheManager storage")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000, 500_000])
+    parser.add_argument('--batch', type=int, default=1_000, help="Words per fetched batch")
+    args = parser.parse_args()
+
+    print(f"{'cached':>9} {'storage':>7} {'load ms':>10} {'filter ms':>10} {'save ms':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            bench(size, args.batch, tmp)
+
+
+if __name__ == "__main__":
+    main()
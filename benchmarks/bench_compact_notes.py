@@ -0,0 +1,77 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import gc
+import json
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from src.core.models import CompactWordNote, WordNotesApiResponse
+from src.services.dictionary_base import WordDetail
+
+
+@dataclass
+class DictWordDetail:
+    """WordDetail as it was before, with a per-object __dict__"""
+    word: str
+    phonetic: Optional[str] = None
+    definition: Optional[str] = None
+    examples: Optional[list] = None
+    collins: Optional[Dict[str, Any]] = None
+    additional_info: Optional[Dict[str, Any]] = None
+
+
+def response_body(count: int) -> bytes:
+    notes = [
+        {'source_lang': 'en', 'target_lang': 'zh', 'word': f'word{i}', 'translate': f'n. 翻译 {i}',
+         'phonetic': '英 [wɜːd]', 'sentences': [f'An example sentence for word{i}.']}
+        for i in range(count)
+    ]
+    return json.dumps({'code': 0, 'msg': '', 'data': {'word_notes': notes}}, ensure_ascii=False).encode('utf-8')
+
+
+def retained(build):
+    """Bytes still allocated by what build() returns, and the peak while building"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak
+
+
+def report(size: int, name: str, current: int, peak: int):
+    print(f"{size:>9} {name:>24} {current / 2 ** 20:10.1f} {peak / 2 ** 20:10.1f} {current / size:10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare memory of WordNote/WordDetail representations")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    print(f"{'items':>9} {'representation':>24} {'held MB':>10} {'peak MB':>10} {'B/item':>10}")
+    for size in args.sizes:
+        body = response_body(size)
+        models, current, peak = retained(lambda: WordNotesApiResponse.model_validate_json(body).data.word_notes)
+        report(size, 'WordNote', current, peak)
+        # What main keeps after converting the fetched models
+        compact, current, peak = retained(lambda: CompactWordNote.from_models(
+            WordNotesApiResponse.model_validate_json(body).data.word_notes
+        ))
+        report(size, 'CompactWordNote', current, peak)
+        assert [note.to_model() for note in compact[:100]] == models[:100]
+        del models, compact
+
+        fields = [(f'word{i}', '英 [wɜːd]', [f'Example {i}.']) for i in range(size)]
+        _, current, peak = retained(lambda: [DictWordDetail(w, p, examples=e) for w, p, e in fields])
+        report(size, 'WordDetail (dict)', current, peak)
+        _, current, peak = retained(lambda: [WordDetail(w, p, examples=e) for w, p, e in fields])
+        report(size, 'WordDetail (slots)', current, peak)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.fetchers.http import HTTPFetcher
+
+
+def export_body(rows: int) -> bytes:
+    lines = ['\ufeffword,translation,phonetic,mastered,sentences\r\n']
+    lines.extend(
+        f'word{i},"n. 翻译 {i}","英 [wɜːd]",No,"An example sentence for word{i}.\nAnd a second one."\r\n'
+        for i in range(rows)
+    )
+    return ''.join(lines).encode('utf-8')
+
+
+async def consume_buffered(fetcher: HTTPFetcher) -> int:
+    """The fetch_data path: whole body, then a list of notes"""
+    return len(await fetcher.fetch_data())
+
+
+async def consume_streamed(fetcher: HTTPFetcher) -> int:
+    """A consumer handling notes one by one, as the pipeline does"""
+    count = 0
+    async for _ in fetcher.stream_data():
+        count += 1
+    return count
+
+
+async def measure(url: str, consume):
+    fetcher = HTTPFetcher(base_url=url, format='csv')
+    async with fetcher:
+        tracemalloc.start()
+        start = time.perf_counter()
+        count = await consume(fetcher)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return count, elapsed, peak
+
+
+async def bench(rows: int):
+    body = export_body(rows)
+
+    async def export(request):
+        response = web.StreamResponse(headers={'Content-Type': 'text/csv; charset=utf-8'})
+        await response.prepare(request)
+        for start in range(0, len(body), 64 * 1024):
+            await response.write(body[start:start + 64 * 1024])
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_get('/export', export)
+    server = TestServer(app)
+    await server.start_server()
+    try:
+        url = str(server.make_url('/export'))
+        for name, consume in (('buffered', consume_buffered), ('streamed', consume_streamed)):
+            count, elapsed, peak = await measure(url, consume)
+            assert count == rows
+            # Timings include tracemalloc overhead, compare them with each other only
+            print(f"{rows:>9} {name:>9} {len(body) / 2 ** 20:9.1f} {elapsed:9.2f} {peak / 2 ** 20:9.1f}")
+    finally:
+        await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare buffered and streamed CSV fetching")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'mode':>9} {'body MB':>9} {'seconds':>9} {'peak MB':>9}")
+    for rows in args.rows:
+        asyncio.run(bench(rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import json
+import time
+
+from src.checkpoint import CheckpointStore
+from src.core.models import ApiResponse, WordNote, WordNotesApiResponse, WordNotesResponse
+
+
+def response_body(count: int) -> bytes:
+    notes = [
+        {
+            'source_lang': 'en',
+            'target_lang': 'zh',
+            'word': f'word{i}',
+            'translate': f'n. 翻译 {i}',
+            'phonetic': '英 [wɜːd]',
+            'sentences': [f'An example sentence for word{i}.', 'And a second one.']
+        }
+        for i in range(count)
+    ]
+    return json.dumps({'code': 0, 'msg': '', 'data': {'word_notes': notes}}, ensure_ascii=False).encode('utf-8')
+
+
+def decode_models(body: bytes):
+    """The previous path: json, then ApiResponse, then WordNotesResponse"""
+    api_response = ApiResponse(**json.loads(body))
+    return WordNotesResponse(**api_response.data).word_notes
+
+
+def decode_fast(body: bytes):
+    return WordNotesApiResponse.model_validate_json(body).data.word_notes
+
+
+def best_of(fn, arg, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare word notes decoding paths")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'notes':>9} {'path':>22} {'ms':>9}")
+    for size in args.sizes:
+        body = response_body(size)
+        assert decode_fast(body) == decode_models(body)
+        print(f"{size:>9} {'json + models':>22} {best_of(decode_models, body, args.repeat):9.1f}")
+        print(f"{size:>9} {'validate_json':>22} {best_of(decode_fast, body, args.repeat):9.1f}")
+
+        # The checkpoint hop: notes this program serialized itself. Skipping
+        # validation with model_construct is measured, not assumed, to help
+        payloads = [CheckpointStore._encode(note) for note in decode_fast(body)]
+        constructed = lambda items: [WordNote.model_construct(**json.loads(p)['data']) for p in items]
+        print(f"{size:>9} {'checkpoint validated':>22} "
+              f"{best_of(lambda items: [CheckpointStore._decode(p) for p in items], payloads, args.repeat):9.1f}")
+        print(f"{size:>9} {'checkpoint construct':>22} {best_of(constructed, payloads, args.repeat):9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import asyncio
+import time
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.config import settings
+from src.core.models import WordNote
+from src.middleware.dictionary_enhancement import DictionaryEnhancementMiddleware
+from src.session_manager import SessionManager
+
+PAGE = '''
+<span class="phonetic">[{word}]</span>
+<div class="trans-container"><ul><li>n. {word}</li></ul></div>
+<p class="example-sentences">An example with {word}.</p>
+'''
+
+
+async def start_server(latency: float) -> TestServer:
+    """Local stand-in for the Youdao word page with a fixed response latency"""
+    async def page(request):
+        await asyncio.sleep(latency)
+        return web.Response(text=PAGE.format(word=request.match_info['word']), content_type='text/html')
+
+    app = web.Application()
+    app.router.add_get('/w/{word}/', page)
+    server = TestServer(app)
+    await server.start_server()
+    return server
+
+
+async def run(concurrency: int, words: int, base_url: str) -> float:
+    middleware = DictionaryEnhancementMiddleware(dictionary_service='youdao', concurrency=concurrency)
+    middleware.dictionary.base_url = base_url
+    notes = [
+        WordNote(source_lang='en', target_lang='zh', word=f"word{concurrency}x{i}", translate='')
+        for i in range(words)
+    ]
+
+    start = time.perf_counter()
+    enhanced = await middleware.process(notes)
+    elapsed = time.perf_counter() - start
+
+    assert [n.word for n in enhanced] == [n.word for n in notes]
+    assert all(n.phonetic == n.word for n in enhanced)
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark DictionaryEnhancementMiddleware concurrency")
+    parser.add_argument('--words', type=int, default=256)
+    parser.add_argument('--latency', type=float, default=0.02, help="Server latency per page in seconds")
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 8, 32, 128])
+    args = parser.parse_args()
+
+    # Measure the middleware itself, not the per-host connection cap
+    settings.http.pool.limit_per_host = max(args.levels)
+    settings.http.pool.limit = max(args.levels)
+
+    server = await start_server(args.latency)
+    base_url = str(server.make_url('/w'))
+    try:
+        baseline = None
+        print(f"words={args.words} latency={args.latency * 1000:.0f}ms")
+        for level in args.levels:
+            elapsed = await run(level, args.words, base_url)
+            baseline = baseline or elapsed
+            print(f"concurrency={level:4d}: {elapsed:8.2f}s {args.words / elapsed:8.1f} words/s "
+                  f"speedup {baseline / elapsed:5.1f}x")
+    finally:
+        await SessionManager.close_all()
+        await server.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
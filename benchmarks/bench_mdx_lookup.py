@@ -0,0 +1,120 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import random
+import string
+import tempfile
+import time
+import os
+from typing import Optional
+
+from src.services.mdx_dictionary import build_key_index
+from src.services.mdx_index import MdxKeyIndex, SOURCE_EMBEDDED
+
+
+class SyntheticEntry:
+    """Minimal stand-in for a PyGlossary entry"""
+    __slots__ = ('l_word', 'defi')
+
+    def __init__(self, words: list[str], defi: str):
+        self.l_word = words
+        self.defi = defi
+
+    @property
+    def s_word(self) -> str:
+        return '|'.join(self.l_word)
+
+
+def make_glossary(size: int, seed: int = 42) -> list[SyntheticEntry]:
+    """Generate a synthetic glossary with a few variants per headword"""
+    rng = random.Random(seed)
+    entries = []
+    for i in range(size):
+        head = ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10))) + str(i)
+        words = [head.capitalize()]
+        if i % 3 == 0:
+            words.append(head + 's')
+        entries.append(SyntheticEntry(words, f"<b>{head}</b> definition {i}"))
+    return entries
+
+
+def scan_lookup(entries: list[SyntheticEntry], word: str) -> Optional[tuple[str, str]]:
+    """The original linear scan from MdxDictionaryService._lookup_word_sync"""
+    word = word.lower()
+    for entry in entries:
+        if entry.s_word and entry.s_word.lower() == word:
+            return entry.s_word, entry.defi
+        for variant in entry.l_word:
+            if variant.lower() == word:
+                return variant, entry.defi
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare linear scan and indexed MDX lookups")
+    parser.add_argument('--entries', type=int, default=100_000)
+    parser.add_argument('--lookups', type=int, default=200)
+    args = parser.parse_args()
+
+    entries = make_glossary(args.entries)
+    rng = random.Random(7)
+    queries = [rng.choice(rng.choice(entries).l_word).lower() for _ in range(args.lookups)]
+    queries += ['zzz-missing'] * (args.lookups // 10)
+
+    start = time.perf_counter()
+    index = build_key_index(entries)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = [index.get(q) for q in queries]
+    index_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scanned = [scan_lookup(entries, q) for q in queries]
+    scan_time = time.perf_counter() - start
+
+    assert [r and r[1] for r in indexed] == [r and r[1] for r in scanned]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mdx_path = os.path.join(tmp, 'synthetic.mdx')
+        open(mdx_path, 'wb').close()
+        index_path = mdx_path + '.idx'
+        data = [defi.encode('utf-8') for _, (_, defi) in index.items()]
+        entries, position = [], 0
+        for (key, (headword, _)), chunk in zip(index.items(), data):
+            entries.append((key, headword, position, len(chunk)))
+            position += len(chunk)
+
+        start = time.perf_counter()
+        MdxKeyIndex.write(index_path, mdx_path, entries, SOURCE_EMBEDDED, data)
+        write_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        sidecar = MdxKeyIndex.open(index_path, mdx_path)
+        open_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        mapped = []
+        for q in queries:
+            hit = sidecar.lookup(q)
+            mapped.append(hit and sidecar.read_embedded(hit[1], hit[2]))
+        mapped_time = time.perf_counter() - start
+        index_size = os.path.getsize(index_path)
+        sidecar.close()
+
+    assert mapped == [r and r[1] for r in indexed]
+
+    print(f"entries={args.entries} lookups={len(queries)}")
+    print(f"index build:    {build_time * 1000:10.1f} ms ({len(index)} keys)")
+    print(f"linear scan:    {scan_time * 1000:10.1f} ms ({scan_time / len(queries) * 1e6:.1f} us/lookup)")
+    print(f"indexed lookup: {index_time * 1000:10.3f} ms ({index_time / len(queries) * 1e6:.3f} us/lookup)")
+    print(f"speedup:        {scan_time / max(index_time, 1e-9):10.0f}x")
+    print(f"sidecar write:  {write_time * 1000:10.1f} ms ({index_size / 1024 / 1024:.1f} MiB)")
+    print(f"sidecar open:   {open_time * 1000:10.3f} ms")
+    print(f"sidecar lookup: {mapped_time * 1000:10.3f} ms ({mapped_time / len(queries) * 1e6:.3f} us/lookup)")
+
+
+if __name__ == "__main__":
+    main()
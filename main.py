@@ -1,98 +1,309 @@
 import asyncio
 import os
-from datetime import datetime
 import logging as logger
 from src.fetchers.http import HTTPFetcher
 from src.middleware.pipeline import MiddlewarePipeline
 from src.middleware.dictionary_enhancement import DictionaryEnhancementMiddleware
 from src.middleware.field_mapping import FieldMappingMiddleware
 from src.exporters.anki_exporter import AnkiExporter
+from src.exporters.anki_preflight import AnkiPreflight
+from src.exporters.apkg_backup import ApkgBackup
 from src.cache_manager import CacheManager
+from src.checkpoint import CheckpointStore
+from src.sync_state import SyncState
+from src.core.models import CompactWordNote
+from src.session_manager import SessionManager
+from src.services.dictionary_factory import DictionaryFactory
+from src.services.cached_dictionary import LookupCache
+from src.services.memo_dictionary import LookupMemo
+from src.metrics import metrics
 from src.config import settings
 
 async def main():
     """Main function to fetch words and export to Anki using the pipeline architecture"""
+    lookup_cache = None
+    lookup_memo = None
+    checkpoint = None
+    cache_manager = None
+    preflight = None
     try:
-        # Initialize pipeline components
+        # Remember what the last successful sync downloaded
+        sync_state = SyncState.from_settings() if settings.sync.enabled else None
         fetcher = HTTPFetcher(
             timeout=settings.http.timeout,
-            max_retries=settings.http.max_retries
+            max_retries=settings.http.max_retries,
+            pagination=settings.http.pagination,
+            sync_state=sync_state,
+            fast_decode=settings.http.fast_decode
         )
-        
-        # Create middleware pipeline
-        pipeline = MiddlewarePipeline()
-        pipeline.add_middleware(DictionaryEnhancementMiddleware(
-            dictionary_service='youdao',
-            include_examples=True,
-            include_phonetic=True,
-            include_collins=True
-        ))
-        pipeline.add_middleware(FieldMappingMiddleware(
-            field_mappings=settings.anki.field_mappings
-        ))
-        
-        exporter = AnkiExporter(anki_connect_url=settings.anki.connect_url)
-        cache_manager = CacheManager(
-            cache_file=settings.cache.file
-        ) if settings.cache.enabled else None
 
-        # Fetch word data
+        # Fetch word data before building anything else, most runs stop here
         logger.info("Fetching words from Doubao...")
         async with fetcher:
             word_data = await fetcher.fetch_data()
-                
+
+        if fetcher.not_modified:
+            logger.info("Notebook unchanged since the last sync, nothing to do")
+            return
         if not word_data:
             logger.warning("No word data received")
             return
+        if settings.pipeline.compact_notes:
+            # Validated once by the fetcher, from here on only memory matters
+            word_data = CompactWordNote.from_models(word_data)
+
+        cache_manager = CacheManager(
+            cache_file=settings.cache.file,
+            bloom_filter=settings.cache.bloom_filter,
+            bloom_error_rate=settings.cache.bloom_error_rate
+        ) if settings.cache.enabled else None
 
         # Filter out cached words if enabled
+        upsert = settings.anki.export_mode == "upsert"
+        changed_words = []
         if cache_manager and settings.cache.enabled:
-            new_words = cache_manager.filter_new_words(word_data)
-            if not new_words:
-                logger.info("No new words to process")
+            new_words, changed_words = cache_manager.filter_words(word_data)
+            if not new_words and not changed_words:
+                logger.info("No new or changed words to process")
+                if sync_state:
+                    sync_state.commit()
                 return
-            logger.info(f"Found {len(new_words)} new words")
+            logger.info(f"Found {len(new_words)} new and {len(changed_words)} changed words")
             words_to_process = new_words
+            if upsert:
+                # Upserting updates changed notes together with the new ones
+                words_to_process = new_words + changed_words
+                changed_words = []
         else:
             words_to_process = word_data
 
-        # Process data through pipeline
-        logger.info(f"Processing {len(words_to_process)} words through pipeline...")
-        processed_notes = await pipeline.process(words_to_process)
+        # Cache dictionary lookups across runs
+        if settings.lookup_cache.enabled:
+            lookup_cache = LookupCache.from_settings()
+            DictionaryFactory.register_wrapper(lookup_cache.wrap)
+        # Deduplicate lookups within this run; registered last so it sits outermost
+        lookup_memo = LookupMemo.from_settings() if settings.lookup_memo.enabled else None
+        if lookup_memo:
+            DictionaryFactory.register_wrapper(lookup_memo.wrap)
 
-        # Export to Anki
-        logger.info(f"Exporting {len(processed_notes)} notes to Anki...")
+        # Create middleware pipeline, resuming from the last interrupted run
+        checkpoint = CheckpointStore.from_settings() if settings.checkpoint.enabled else None
+        if checkpoint and checkpoint.count():
+            logger.info(f"Resuming from checkpoint with {checkpoint.count()} recorded stage outputs")
+        pipeline = MiddlewarePipeline(checkpoint=checkpoint)
+        pipeline.add_middleware(DictionaryEnhancementMiddleware(
+            dictionary_service='youdao',
+            include_examples=True,
+            include_phonetic=True,
+            include_collins=True,
+            concurrency=settings.enhancement.concurrency
+        ))
+        pipeline.add_middleware(FieldMappingMiddleware(
+            field_mappings=settings.anki.field_mappings
+        ))
         
-        # Export via AnkiConnect
-        success = await exporter.export(
-            processed_notes,
-            deck_name=settings.anki.deck_name,
-            model_name=settings.anki.model_name
-        )
+        exporter = AnkiExporter(anki_connect_url=settings.anki.connect_url)
 
-        if success:
-            logger.success(f"Successfully exported {len(processed_notes)} words to Anki!")
-            
-            # Export backup .apkg file
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_path = os.path.expanduser(f"~/Downloads/doubao_vocab_{timestamp}.apkg")
+        # Anki field notes are matched by when updating them
+        key_field = word_field()
+
+        # Update notes whose content was edited in Doubao since their export
+        backup_notes, backup_words = [], []
+        updates_failed = False
+        if changed_words:
+            logger.info(f"Updating {len(changed_words)} changed notes in Anki...")
+            updated_notes = await pipeline.process(changed_words)
+            if await exporter.update_notes(
+                updated_notes,
+                deck_name=settings.anki.deck_name,
+                model_name=settings.anki.model_name,
+                key_field=key_field
+            ):
+                cache_manager.save_cache(changed_words)
+                backup_notes.extend(updated_notes)
+                backup_words.extend(changed_words)
+                if not words_to_process and checkpoint:
+                    checkpoint.clear()
+            else:
+                logger.error("Failed to update changed notes in Anki")
+                updates_failed = True
+
+        # Skip words Anki would reject as duplicates before spending lookups on them
+        if settings.anki.preflight and not upsert and key_field and words_to_process:
+            try:
+                preflight = AnkiPreflight.from_settings(exporter, key_field)
+                existing = await preflight.existing_words(word.word for word in words_to_process)
+            except Exception as e:
+                logger.warning(f"Pre-flight duplicate check failed, continuing without it: {e}")
+                preflight = None
+                existing = set()
+            if existing:
+                logger.info(f"Skipping {len(existing)} words already in Anki")
+                already_in_anki = [word for word in words_to_process if word.word in existing]
+                words_to_process = [word for word in words_to_process if word.word not in existing]
+                if cache_manager:
+                    cache_manager.save_cache(already_in_anki)
+
+        if not words_to_process:
+            await write_backup(exporter, backup_notes, backup_words)
+            if sync_state and not updates_failed:
+                sync_state.commit()
+            return
+
+        # Process data through pipeline and export to Anki
+        logger.info(f"Processing {len(words_to_process)} words through pipeline...")
+        # Traces exported notes back to their words, built once for all batches
+        words_by_word = {word.word: word for word in words_to_process}
+        if settings.pipeline.streaming:
+            # Export each batch as soon as it leaves the pipeline, while
+            # later words are still being enriched
+            processed_notes = []
+            success = True
+            async for batch in pipeline.stream_batches(
+                words_to_process,
+                batch_size=settings.pipeline.batch_size,
+                queue_size=settings.pipeline.queue_size
+            ):
+                logger.info(f"Exporting batch of {len(batch)} notes to Anki...")
+                export_notes = exporter.upsert_notes if upsert else exporter.add_notes
+                result = await export_notes(
+                    batch,
+                    deck_name=settings.anki.deck_name,
+                    model_name=settings.anki.model_name,
+                    key_field=key_field
+                )
+                success = result.success and success
+                processed_notes.extend(batch)
+                if preflight:
+                    preflight.record_added([batch[i][key_field] for i in result.added],
+                                           [result.note_ids[i] for i in result.added])
+                # Mark words as cached as soon as their notes are in Anki, so
+                # a rerun after a later failure doesn't export them again
+                if cache_manager:
+                    cache_manager.save_cache(exported_words([batch[i] for i in result.stored], words_by_word, key_field))
+        else:
+            processed_notes = await pipeline.process(words_to_process)
+
+            # Export to Anki
+            logger.info(f"Exporting {len(processed_notes)} notes to Anki...")
             
-            await exporter.export(
+            # Export via AnkiConnect
+            export_notes = exporter.upsert_notes if upsert else exporter.add_notes
+            result = await export_notes(
                 processed_notes,
-                output_path=output_path,
-                deck_name=settings.anki.deck_name
+                deck_name=settings.anki.deck_name,
+                model_name=settings.anki.model_name,
+                key_field=key_field
             )
+            success = result.success
+            if preflight:
+                preflight.record_added([processed_notes[i][key_field] for i in result.added],
+                                       [result.note_ids[i] for i in result.added])
+            # Keep the words that made it into Anki even if others failed
+            if cache_manager and not success:
+                cache_manager.save_cache(exported_words(
+                    [processed_notes[i] for i in result.stored], words_by_word, key_field
+                ))
+
+        if success:
+            logger.info(f"Successfully exported {len(processed_notes)} words to Anki!")
+            
+            # Back up the exported notes as .apkg
+            await write_backup(exporter, backup_notes + processed_notes, backup_words + words_to_process)
             
             # Update cache with new words if enabled
             if cache_manager and settings.cache.enabled:
                 cache_manager.save_cache(words_to_process)
                 logger.info("Cache updated with new words")
+
+            # Everything is exported, nothing left to resume
+            if checkpoint:
+                checkpoint.clear()
+            if sync_state and not updates_failed:
+                sync_state.commit()
         else:
             logger.error("Failed to export notes to Anki")
 
     except Exception as e:
         logger.error(f"An error occurred: {e}")
         raise
+    finally:
+        # Services created after this run must not use its memo or closed cache
+        if lookup_memo:
+            DictionaryFactory.unregister_wrapper(lookup_memo.wrap)
+            logger.info(f"Dictionary lookup memo: {lookup_memo.stats()}")
+        if lookup_cache:
+            DictionaryFactory.unregister_wrapper(lookup_cache.wrap)
+            logger.info(f"Dictionary lookup cache: {lookup_cache.stats()}")
+            lookup_cache.close()
+        if preflight:
+            preflight.save()
+        if checkpoint:
+            checkpoint.close()
+        if cache_manager:
+            cache_manager.close()
+        await SessionManager.close_all()
+        logger.info(f"HTTP connection reuse: {SessionManager.stats.as_dict()}")
+        if settings.metrics.enabled:
+            write_metrics()
+
+def word_field():
+    """Return the Anki field the word is mapped to, if any"""
+    return next((field for field, attr in settings.anki.field_mappings.items() if attr == 'word'), None)
+
+def exported_words(notes, words_by_word, key_field):
+    """Return the word notes whose mapped Anki notes were exported
+    
+    Args:
+        notes: Exported Anki notes
+        words_by_word: Word notes that went into the pipeline, keyed by word
+        key_field: Anki field the word is mapped to, see word_field()
+    """
+    if not key_field:
+        # Notes can't be traced back to words, so only the full run counts
+        return []
+    return [words_by_word[note[key_field]] for note in notes if note.get(key_field) in words_by_word]
+
+def run_backup(model, notes, words):
+    """Write one backup; runs in a worker thread, which owns the backup state connection"""
+    backup = ApkgBackup.from_settings(model)
+    try:
+        return backup.backup(notes, words, word_field())
+    finally:
+        backup.close()
+
+async def write_backup(exporter, notes, words):
+    """Back up exported notes as configured in settings
+    
+    Args:
+        exporter: Exporter whose note model the backup uses
+        notes: Exported Anki notes
+        words: Word notes the Anki notes were made from
+    """
+    if not settings.backup.enabled or not notes:
+        return
+    try:
+        with metrics.stage("ApkgBackup") as timer:
+            path = await asyncio.to_thread(run_backup, exporter.model, notes, words)
+            timer.items = len(notes)
+        if path:
+            logger.info(f"Backup written to {path}")
+    except Exception as e:
+        logger.error(f"Failed to write backup: {e}")
+
+def write_metrics():
+    """Write the run report and Prometheus textfile configured in settings"""
+    directory = os.path.expanduser(settings.cache.directory)
+    try:
+        if settings.metrics.report_file:
+            path = os.path.join(directory, os.path.expanduser(settings.metrics.report_file))
+            metrics.write_json(path)
+            logger.info(f"Run report written to {path}")
+        if settings.metrics.prometheus_file:
+            path = os.path.join(directory, os.path.expanduser(settings.metrics.prometheus_file))
+            metrics.write_prometheus(path)
+    except OSError as e:
+        logger.error(f"Failed to write run metrics: {e}")
 
 if __name__ == "__main__":
     logger.info("Starting Doubao Word to Anki import process...")
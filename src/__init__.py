@@ -7,6 +7,7 @@ from .middleware.dictionary_enhancement import DictionaryEnhancementMiddleware
 from .middleware.field_mapping import FieldMappingMiddleware
 from .exporters.anki_exporter import AnkiExporter
 from .fetchers.http import HTTPFetcher
+from .session_manager import SessionManager
 from .config import settings, Config
 
 __all__ = [
@@ -30,6 +31,7 @@ __all__ = [
     # Exporters and fetchers
     'AnkiExporter',
     'HTTPFetcher',
+    'SessionManager',
     
     # Configuration
     'settings',
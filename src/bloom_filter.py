@@ -0,0 +1,165 @@
+import hashlib
+import math
+import mmap
+import os
+import struct
+from typing import Iterable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# File layout: header | bit array
+_MAGIC = b'DWBLOOMF'
+_VERSION = 2
+_HEADER = struct.Struct('<8sIIQQ')  # magic, version, hash count, bit count, item count
+_BLOCK = struct.Struct('<Q')
+_MAX_HASHES = 16
+
+
+def _blocked_error_rate(bits_per_item: float, hashes: int) -> float:
+    """False positive rate of a Bloom filter made of 64-bit blocks
+
+    Items per block follow a Poisson distribution, so the rate is averaged
+    over block loads rather than using the classic formula.
+    """
+    load = 64 / bits_per_item
+    probability = math.exp(-load)
+    rate = 0.0
+    for count in range(int(load + 10 * math.sqrt(load) + 10)):
+        if count:
+            probability *= load / count
+        rate += probability * (1 - (1 - 1 / 64) ** (hashes * count)) ** hashes
+    return rate
+
+
+def optimal_parameters(capacity: int, error_rate: float):
+    """Bit and hash counts for a blocked Bloom filter of the given capacity
+
+    Args:
+        capacity: Expected number of items
+        error_rate: Acceptable false positive rate at capacity
+
+    Returns:
+        Tuple of (bit count, hash count)
+    """
+    capacity = max(1, capacity)
+    bits_per_item = -math.log(error_rate) / math.log(2) ** 2
+    while True:
+        for hashes in range(1, _MAX_HASHES + 1):
+            if _blocked_error_rate(bits_per_item, hashes) <= error_rate:
+                # Round up to whole blocks
+                return math.ceil(capacity * bits_per_item / 64) * 64, hashes
+        bits_per_item *= 1.05
+
+
+class BloomFilter:
+    """Bloom filter whose bit array lives in a memory-mapped file
+
+    Membership answers are "definitely not present" or "maybe present", so
+    callers confirm positives against the authoritative store. Memory use
+    is only the pages of the bit array that are touched, whatever the
+    number of items.
+
+    The filter is blocked: all bits of an item fall into one 64-bit word,
+    so a check is a single hash and a single read, at the cost of a few
+    more bits per item than a classic Bloom filter.
+    """
+
+    def __init__(self, path: str, fileobj, mm: mmap.mmap):
+        self.path = path
+        self._file = fileobj
+        self._mm = mm
+        _, _, self.hashes, self.bits, self.count = _HEADER.unpack_from(mm, 0)
+        self._offset = _HEADER.size
+
+    @classmethod
+    def create(cls, path: str, capacity: int, error_rate: float = 0.001) -> 'BloomFilter':
+        """Create an empty filter file, replacing any existing one
+
+        Args:
+            path: Path of the filter file
+            capacity: Expected number of items
+            error_rate: Acceptable false positive rate at capacity
+        """
+        bits, hashes = optimal_parameters(capacity, error_rate)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, hashes, bits, 0))
+            f.truncate(_HEADER.size + bits // 8)
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path: str) -> Optional['BloomFilter']:
+        """Map an existing filter file
+
+        Returns:
+            BloomFilter, or None if the file is missing or not a valid filter
+        """
+        if not os.path.exists(path):
+            return None
+        f = open(path, 'r+b')
+        try:
+            mm = mmap.mmap(f.fileno(), 0)
+        except (OSError, ValueError) as e:
+            f.close()
+            logger.warning(f"Cannot map Bloom filter {path}: {e}")
+            return None
+        if len(mm) >= _HEADER.size:
+            magic, version, _, bits, _ = _HEADER.unpack_from(mm, 0)
+            if magic == _MAGIC and version == _VERSION and len(mm) == _HEADER.size + bits // 8:
+                return cls(path, f, mm)
+        mm.close()
+        f.close()
+        return None
+
+    def _locate(self, item: str):
+        """Byte offset of the item's block and the mask of its bits"""
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=8 + self.hashes).digest()
+        mask = 0
+        for byte in digest[8:]:
+            mask |= 1 << (byte & 63)
+        block = int.from_bytes(digest[:8], 'little') % (self.bits >> 6)
+        return self._offset + (block << 3), mask
+
+    def add(self, item: str):
+        """Add an item to the filter"""
+        offset, mask = self._locate(item)
+        _BLOCK.pack_into(self._mm, offset, _BLOCK.unpack_from(self._mm, offset)[0] | mask)
+        self.count += 1
+
+    def update(self, items: Iterable[str]):
+        """Add several items and record the new item count"""
+        for item in items:
+            self.add(item)
+        self.set_count(self.count)
+
+    def set_count(self, count: int):
+        """Record the number of items the filter describes"""
+        self.count = count
+        _HEADER.pack_into(self._mm, 0, _MAGIC, _VERSION, self.hashes, self.bits, count)
+
+    def __contains__(self, item: str) -> bool:
+        offset, mask = self._locate(item)
+        return _BLOCK.unpack_from(self._mm, offset)[0] & mask == mask
+
+    @property
+    def capacity_bytes(self) -> int:
+        return self.bits // 8
+
+    def estimated_error_rate(self) -> float:
+        """False positive rate expected at the current item count"""
+        if not self.count:
+            return 0.0
+        return _blocked_error_rate(self.bits / self.count, self.hashes)
+
+    def flush(self):
+        """Write dirty pages back to the file"""
+        self._mm.flush()
+
+    def close(self):
+        """Flush, unmap and close the filter file"""
+        self._mm.flush()
+        self._mm.close()
+        self._file.close()
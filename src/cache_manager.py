@@ -1,31 +1,67 @@
 import json
 import os
-from typing import List, Dict, Any, Set
+import sqlite3
+import time
+from typing import List, Dict, Any, Set, Iterable, Optional, Tuple
+import logging
 from datetime import datetime
 from pathlib import Path
 from .config import WordNote
+from .bloom_filter import BloomFilter
+
+logger = logging.getLogger(__name__)
 
 class CacheManager:
-    def __init__(self, cache_file: str = "word_cache.json"):
+    # Words per IN (...) query, well below SQLite's bound parameter limit
+    QUERY_CHUNK = 500
+
+    def __init__(
+        self,
+        cache_file: str = "word_cache.json",
+        bloom_filter: bool = False,
+        bloom_error_rate: float = 0.001
+    ):
         """Initialize cache manager
-        
+
+        Words are stored in an SQLite database next to the configured file
+        and looked up by index, so neither startup nor saving touches the
+        whole cache. An existing JSON cache is migrated on first use.
+        Each word keeps a content hash so that edited words can be detected.
+
         Args:
             cache_file: Path to cache file, relative to user's home directory
+            bloom_filter: Keep a memory-mapped Bloom filter of cached words so
+                that most new words are recognized without a database query
+            bloom_error_rate: Target false positive rate of the Bloom filter
         """
-        self.cache_file = os.path.expanduser(f"~/Downloads/doubao/{cache_file}")
+        self.cache_file = os.path.join(os.path.expanduser("~/Downloads/doubao"), cache_file)
+        self.db_file = str(Path(self.cache_file).with_suffix('.sqlite3'))
         self._ensure_cache_dir()
-        self.cached_words: Set[str] = self._load_cache()
+        self._cached_words = None
+        self.bloom = None
+        self._conn = sqlite3.connect(self.db_file, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS words (word TEXT PRIMARY KEY, added_at REAL NOT NULL, hash TEXT)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(words)")}
+        if 'hash' not in columns:
+            self._conn.execute("ALTER TABLE words ADD COLUMN hash TEXT")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._migrate_json()
+        self.bloom = self._open_bloom(bloom_error_rate) if bloom_filter else None
 
     def _ensure_cache_dir(self):
         """Ensure cache directory exists"""
         cache_dir = os.path.dirname(self.cache_file)
         os.makedirs(cache_dir, exist_ok=True)
 
-    def _load_cache(self) -> Set[str]:
-        """Load cached words from file"""
+    def _load_json(self) -> Set[str]:
+        """Load cached words from a legacy JSON file"""
         if not os.path.exists(self.cache_file):
             return set()
-        
+
         try:
             with open(self.cache_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
@@ -34,35 +70,154 @@ class CacheManager:
             print(f"Error loading cache: {e}")
             return set()
 
+    def _migrate_json(self):
+        """Import the legacy JSON cache once and keep it as a backup"""
+        if not os.path.exists(self.cache_file) or self.cache_file == self.db_file:
+            return
+        words = self._load_json()
+        # The JSON cache has no content, hashes are filled in on the next fetch
+        self._insert((word, None) for word in words)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_from', ?)", (self.cache_file,)
+        )
+        os.replace(self.cache_file, self.cache_file + '.migrated')
+        logger.info(f"Migrated {len(words)} cached words to {self.db_file}")
+
+    def _open_bloom(self, error_rate: float) -> BloomFilter:
+        """Open the Bloom filter, rebuilding it if it doesn't match the table"""
+        path = self.db_file + '.bloom'
+        size = len(self)
+        bloom = BloomFilter.open(path)
+        # A count mismatch means words were added without the filter, and an
+        # overfull filter no longer meets its error rate
+        if bloom and bloom.count == size and bloom.estimated_error_rate() <= error_rate * 2:
+            return bloom
+        if bloom:
+            bloom.close()
+        bloom = BloomFilter.create(path, capacity=max(size * 2, 100_000), error_rate=error_rate)
+        bloom.update(row[0] for row in self._conn.execute("SELECT word FROM words"))
+        bloom.set_count(size)
+        return bloom
+
+    def _insert(self, words: Iterable[Tuple[str, Optional[str]]]):
+        """Insert (word, hash) pairs, updating the hash of words already cached"""
+        words = list(words)
+        now = time.time()
+        self._conn.execute("BEGIN")
+        try:
+            # Inserting and updating separately tells how many words are new,
+            # so the Bloom filter's count is kept without counting the table
+            inserted = self._conn.executemany(
+                "INSERT OR IGNORE INTO words (word, added_at, hash) VALUES (?, ?, ?)",
+                ((word, now, content_hash) for word, content_hash in words)
+            ).rowcount
+            self._conn.executemany(
+                "UPDATE words SET hash = ? WHERE word = ? AND hash IS NOT ?",
+                ((content_hash, word, content_hash) for word, content_hash in words if content_hash is not None)
+            )
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+        if self.bloom:
+            count = self.bloom.count
+            self.bloom.update(word for word, _ in words)
+            self.bloom.set_count(count + inserted)
+
+    @property
+    def cached_words(self) -> Set[str]:
+        """All cached words, loaded on first access"""
+        if self._cached_words is None:
+            self._cached_words = {row[0] for row in self._conn.execute("SELECT word FROM words")}
+        return self._cached_words
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM words").fetchone()[0]
+
+    def __bool__(self) -> bool:
+        # An empty cache is still a cache; without this __len__ would make it falsy
+        return True
+
+    def __contains__(self, word: str) -> bool:
+        if self.bloom and word not in self.bloom:
+            return False
+        return self._conn.execute("SELECT 1 FROM words WHERE word = ?", (word,)).fetchone() is not None
+
     def save_cache(self, words: List[WordNote]):
         """Save words to cache
-        
+
+        Only the given words are written; words already cached get their
+        content hash updated.
+
         Args:
             words: List of word notes to cache
         """
-        # Add new words to cache
-        for word in words:
-            self.cached_words.add(word.word)
-
-        # Save to file
-        cache_data = {
-            'last_updated': datetime.now().isoformat(),
-            'words': list(self.cached_words)
-        }
-        
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
+            self._insert((word.word, word.content_hash()) for word in words)
         except Exception as e:
             print(f"Error saving cache: {e}")
+            return
+        if self._cached_words is not None:
+            self._cached_words.update(word.word for word in words)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('last_updated', ?)",
+            (datetime.now().isoformat(),)
+        )
+
+    def _cached_hashes(self, words: List[str]) -> Dict[str, Optional[str]]:
+        """Return the stored hash of each given word that is cached, using the primary key index"""
+        if self.bloom:
+            # Only words the filter may contain need a query
+            words = [word for word in words if word in self.bloom]
+        found = {}
+        for start in range(0, len(words), self.QUERY_CHUNK):
+            chunk = words[start:start + self.QUERY_CHUNK]
+            found.update(self._conn.execute(
+                f"SELECT word, hash FROM words WHERE word IN ({','.join('?' * len(chunk))})", chunk
+            ))
+        return found
+
+    def filter_words(self, words: List[WordNote]) -> Tuple[List[WordNote], List[WordNote]]:
+        """Split words into new ones and cached ones whose content changed
+
+        Cached words without a hash (from before hashes were stored) are
+        taken as unchanged and their current hash is recorded as baseline.
+
+        Args:
+            words: List of word notes to filter
+
+        Returns:
+            Tuple of (new word notes, changed word notes)
+        """
+        cached = self._cached_hashes(list({word.word for word in words}))
+        new_words, changed_words, baseline = [], [], []
+        for word in words:
+            if word.word not in cached:
+                new_words.append(word)
+                continue
+            content_hash = word.content_hash()
+            if cached[word.word] is None:
+                baseline.append((word.word, content_hash))
+            elif cached[word.word] != content_hash:
+                changed_words.append(word)
+        if baseline:
+            self._insert(baseline)
+        return new_words, changed_words
 
     def filter_new_words(self, words: List[WordNote]) -> List[WordNote]:
         """Filter out already cached words
-        
+
         Args:
             words: List of word notes to filter
-            
+
         Returns:
             List of new word notes not in cache
         """
-        return [word for word in words if word.word not in self.cached_words]
\ No newline at end of file
+        cached = self._cached_hashes(list({word.word for word in words}))
+        return [word for word in words if word.word not in cached]
+
+    def close(self):
+        """Close the cache database and Bloom filter"""
+        if self.bloom:
+            self.bloom.close()
+        self._conn.close()
@@ -0,0 +1,127 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import logging
+from pydantic import BaseModel
+from .core.models import CompactWordNote, WordNote
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Models that stage outputs may be restored as, by class name
+CHECKPOINT_MODELS = {'WordNote': WordNote, 'CompactWordNote': CompactWordNote}
+
+
+class CheckpointStore:
+    """SQLite store of per-word, per-stage pipeline outputs
+
+    Every stage's output for a word is recorded as soon as it is produced,
+    so an interrupted run can be resumed without redoing finished work. The
+    store is meant to be cleared once a run completes successfully.
+    """
+
+    def __init__(self, path: str):
+        """Initialize checkpoint store
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = os.path.expanduser(path)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            "stage TEXT NOT NULL, word TEXT NOT NULL, payload TEXT NOT NULL, "
+            "updated_at REAL NOT NULL, PRIMARY KEY (stage, word))"
+        )
+
+    @classmethod
+    def from_settings(cls) -> 'CheckpointStore':
+        return cls(os.path.join(os.path.expanduser(settings.cache.directory), settings.checkpoint.file))
+
+    @staticmethod
+    def _encode(value: Any) -> str:
+        if isinstance(value, BaseModel):
+            data = value.model_dump(mode='json')
+        elif isinstance(value, CompactWordNote):
+            data = value.to_dict()
+        else:
+            return json.dumps({'data': value}, ensure_ascii=False)
+        return json.dumps({'model': value.__class__.__name__, 'data': data}, ensure_ascii=False)
+
+    @staticmethod
+    def _decode(payload: str) -> Any:
+        record = json.loads(payload)
+        model = record.get('model')
+        if model:
+            return CHECKPOINT_MODELS[model](**record['data'])
+        return record['data']
+
+    def load(self, stage: str, words: Iterable[str]) -> Dict[str, Any]:
+        """Return the recorded outputs of a stage for the given words
+
+        Args:
+            stage: Stage name
+            words: Words to look up
+
+        Returns:
+            Dictionary mapping each finished word to its stage output
+        """
+        words = list(words)
+        results = {}
+        with self._lock:
+            # Stay well below SQLite's bound parameter limit
+            for start in range(0, len(words), 500):
+                chunk = words[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT word, payload FROM checkpoints WHERE stage = ? "
+                    f"AND word IN ({','.join('?' * len(chunk))})",
+                    (stage, *chunk)
+                ).fetchall()
+                results.update(rows)
+        return {word: self._decode(payload) for word, payload in results.items()}
+
+    def save(self, stage: str, outputs: List[Tuple[str, Any]]):
+        """Record stage outputs
+
+        Args:
+            stage: Stage name
+            outputs: (word, output) pairs
+        """
+        now = time.time()
+        rows = [(stage, word, self._encode(value), now) for word, value in outputs]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO checkpoints (stage, word, payload, updated_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._conn.execute("COMMIT")
+
+    def count(self, stage: Optional[str] = None) -> int:
+        """Number of recorded outputs, for one stage or in total"""
+        with self._lock:
+            if stage is None:
+                return self._conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM checkpoints WHERE stage = ?", (stage,)
+            ).fetchone()[0]
+
+    def clear(self):
+        """Forget all recorded progress"""
+        with self._lock:
+            self._conn.execute("DELETE FROM checkpoints")
+
+    def close(self):
+        """Close the database"""
+        with self._lock:
+            self._conn.close()
@@ -1,7 +1,7 @@
 import os
 from pydantic_settings import BaseSettings
 from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Literal
 from pathlib import Path
 import yaml
 from dotenv import load_dotenv
@@ -60,11 +60,41 @@ class HttpHeadersConfig(BaseModel):
     accept: str = "application/json"
     content_type: str = "application/json"
 
+class HttpPoolConfig(BaseModel):
+    """Shared connection pool settings"""
+    limit: int = 100
+    limit_per_host: int = 8
+    dns_cache_ttl: int = 300
+    keepalive_timeout: float = 30.0
+
+class PaginationConfig(BaseModel):
+    """Paginated word notes fetching"""
+    enabled: bool = False
+    # "page" sends page numbers, "cursor" passes back the previous page's cursor
+    mode: Literal["page", "cursor"] = "page"
+    page_size: int = 200
+    # Pages requested ahead of the one being parsed
+    prefetch: int = 3
+    # Attempts per page and the first backoff delay in seconds
+    max_retries: int = 3
+    retry_delay: float = 1.0
+    first_page: int = 1
+    # Query parameters sent and response data fields read
+    page_param: str = "page"
+    size_param: str = "page_size"
+    cursor_param: str = "cursor"
+    cursor_field: str = "cursor"
+    has_more_field: str = "has_more"
+
 class HttpConfig(BaseModel):
     """HTTP client settings"""
     timeout: int = 30
     max_retries: int = 3
     headers: HttpHeadersConfig
+    pool: HttpPoolConfig = HttpPoolConfig()
+    pagination: PaginationConfig = PaginationConfig()
+    # Validate word notes straight from the response bytes
+    fast_decode: bool = True
 
 class AnkiConfig(BaseModel):
     """Anki settings"""
@@ -72,12 +102,83 @@ class AnkiConfig(BaseModel):
     deck_name: str = "Doubao Vocabulary"
     model_name: str = "Basic"
     field_mappings: Dict[str, str]
+    # Notes per request and concurrent requests to AnkiConnect
+    chunk_size: int = 100
+    max_in_flight: int = 2
+    # "add" skips notes already in Anki, "upsert" updates their changed fields
+    export_mode: Literal["add", "upsert"] = "add"
+    # Ask Anki which words it already has before enriching them (add mode only)
+    preflight: bool = True
+
+class RateLimitRule(BaseModel):
+    """Token bucket settings for one host"""
+    rate: float
+    burst: int = 1
+
+class RateLimitConfig(BaseModel):
+    """Outbound rate limits keyed by host"""
+    default: Optional[RateLimitRule] = None
+    default_retry_after: float = 5.0
+    hosts: Dict[str, RateLimitRule] = {}
+
+class EnhancementConfig(BaseModel):
+    """Dictionary enhancement settings"""
+    concurrency: int = 1
+
+class PipelineConfig(BaseModel):
+    """Middleware pipeline settings"""
+    streaming: bool = False
+    # Carry words as slotted CompactWordNotes instead of pydantic models
+    compact_notes: bool = True
+    batch_size: int = 32
+    queue_size: int = 64
 
 class CacheConfig(BaseModel):
     """Cache settings"""
     enabled: bool = True
     file: str = "word_cache.json"
     directory: str = "~/.doubao"
+    bloom_filter: bool = False
+    bloom_error_rate: float = 0.001
+
+class LookupCacheConfig(BaseModel):
+    """Persistent dictionary lookup cache settings"""
+    enabled: bool = False
+    file: str = "lookup_cache.sqlite3"
+    ttl_days: Optional[float] = 30
+    max_entries: Optional[int] = 200000
+
+class LookupMemoConfig(BaseModel):
+    """In-process dictionary lookup memo settings"""
+    enabled: bool = True
+    max_entries: int = 4096
+    ttl: Optional[float] = None
+    negative_ttl: Optional[float] = 600
+
+class CheckpointConfig(BaseModel):
+    """Resumable run settings"""
+    enabled: bool = True
+    file: str = "checkpoint.sqlite3"
+
+class MetricsConfig(BaseModel):
+    """Run metrics settings"""
+    enabled: bool = True
+    # Relative paths are placed in the cache directory
+    report_file: Optional[str] = "run_report.json"
+    prometheus_file: Optional[str] = None
+
+class SyncConfig(BaseModel):
+    """Incremental sync settings"""
+    # Skip runs when the notebook is unchanged since the last successful sync
+    enabled: bool = True
+    file: str = "sync_state.json"
+
+class BackupConfig(BaseModel):
+    """.apkg backup settings"""
+    enabled: bool = True
+    # "full" packages every run's notes, "delta" only notes changed since the last backup
+    mode: Literal["full", "delta"] = "delta"
+    directory: str = "~/Downloads/doubao_backups"
 
 class Config(BaseModel):
     """Main configuration"""
@@ -86,6 +187,15 @@ class Config(BaseModel):
     http: HttpConfig
     anki: AnkiConfig
     cache: CacheConfig
+    enhancement: EnhancementConfig = EnhancementConfig()
+    pipeline: PipelineConfig = PipelineConfig()
+    rate_limits: RateLimitConfig = RateLimitConfig()
+    lookup_cache: LookupCacheConfig = LookupCacheConfig()
+    lookup_memo: LookupMemoConfig = LookupMemoConfig()
+    checkpoint: CheckpointConfig = CheckpointConfig()
+    metrics: MetricsConfig = MetricsConfig()
+    backup: BackupConfig = BackupConfig()
+    sync: SyncConfig = SyncConfig()
 
 def load_config() -> Config:
     """Load configuration from YAML file"""
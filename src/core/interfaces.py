@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, List, Dict, Optional
+from typing import Any, AsyncIterator, List, Dict, Optional
 from .models import WordNote
 
 class DataFetcher(ABC):
@@ -20,6 +20,9 @@ class DataFetcher(ABC):
 class DataMiddleware(ABC):
     """Abstract base class for data processing middleware"""
     
+    # True if the middleware always produces exactly one output per input, in order
+    one_to_one = False
+    
     @abstractmethod
     async def process(self, data: List[WordNote]) -> List[WordNote]:
         """Process data through the middleware
@@ -32,6 +35,43 @@ class DataMiddleware(ABC):
         """
         pass
 
+    def checkpointable(self, item: Any) -> bool:
+        """Whether an output may be recorded so a resumed run can reuse it
+        
+        Middleware returns False for outputs it produced as a fallback,
+        e.g. an input passed on unchanged after an error, so that they are
+        processed again on the next run.
+        
+        Args:
+            item: An output of this middleware
+        """
+        return True
+
+    async def process_stream(self, data: AsyncIterator[Any], batch_size: int = 32) -> AsyncIterator[Any]:
+        """Process an asynchronous stream of items
+        
+        The default implementation groups incoming items into batches and
+        runs process() on each batch, so list-based middleware works in
+        streaming pipelines unchanged.
+        
+        Args:
+            data: Asynchronous iterator of input items
+            batch_size: Number of items handed to process() at once
+            
+        Yields:
+            Processed items
+        """
+        batch = []
+        async for item in data:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                for result in await self.process(batch):
+                    yield result
+                batch = []
+        if batch:
+            for result in await self.process(batch):
+                yield result
+
 class DataExporter(ABC):
     """Abstract base class for data exporters"""
     
@@ -1,5 +1,17 @@
-from pydantic import BaseModel
-from typing import Dict, Any, Optional, List
+import hashlib
+import json
+import sys
+from pydantic import BaseModel, ConfigDict
+from typing import ClassVar, Dict, Any, Iterable, Optional, List, Tuple
+
+# Keyword arguments making a dataclass slotted where supported (Python 3.10+)
+DATACLASS_SLOTS: Dict[str, Any] = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+def content_hash(note: Any) -> str:
+    """Short digest of a note's content fields, used to detect edited words"""
+    content = json.dumps([getattr(note, field) for field in WordNote.CONTENT_FIELDS], ensure_ascii=False)
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=8).hexdigest()
 
 class WordNote(BaseModel):
     """Word note data model"""
@@ -14,6 +26,15 @@ class WordNote(BaseModel):
     mastered: Optional[bool] = False
     sentences: Optional[List[str]] = None
 
+    # Fields coming from Doubao that end up in Anki notes
+    CONTENT_FIELDS: ClassVar[Tuple[str, ...]] = (
+        "source_lang", "target_lang", "word", "translate", "phonetic", "sentences"
+    )
+
+    def content_hash(self) -> str:
+        """Short digest of the content fields, used to detect edited words"""
+        return content_hash(self)
+
     def to_json(self) -> Dict[str, Any]:
         """Convert to JSON format"""
         return {
@@ -47,12 +68,84 @@ class WordNote(BaseModel):
             sentences=[s for s in sentences if s.strip()]
         )
 
+class CompactWordNote:
+    """Slotted stand-in for WordNote on the pipeline hot path
+
+    Has the same attributes and content_hash as WordNote but no per-object
+    dict or pydantic state, and language codes are interned, so large
+    batches take much less memory. Values are not validated; create it from
+    a validated WordNote and convert back with to_model at API boundaries.
+    """
+
+    FIELDS: ClassVar[Tuple[str, ...]] = tuple(WordNote.model_fields)
+    __slots__ = FIELDS
+
+    def __init__(
+        self,
+        source_lang: str,
+        target_lang: str,
+        word: str,
+        translate: str,
+        phonetic: Optional[str] = None,
+        examples: Optional[List[str]] = None,
+        collins: Optional[Dict[str, Any]] = None,
+        additional_info: Optional[Dict[str, Any]] = None,
+        mastered: Optional[bool] = False,
+        sentences: Optional[List[str]] = None
+    ):
+        self.source_lang = sys.intern(source_lang)
+        self.target_lang = sys.intern(target_lang)
+        self.word = word
+        self.translate = translate
+        self.phonetic = phonetic
+        self.examples = examples
+        self.collins = collins
+        self.additional_info = additional_info
+        self.mastered = mastered
+        self.sentences = sentences
+
+    @classmethod
+    def from_model(cls, note: WordNote) -> "CompactWordNote":
+        return cls(*(getattr(note, field) for field in cls.FIELDS))
+
+    @classmethod
+    def from_models(cls, notes: Iterable[WordNote]) -> List["CompactWordNote"]:
+        return [cls.from_model(note) for note in notes]
+
+    def to_model(self) -> WordNote:
+        """Convert to the public pydantic model"""
+        return WordNote(**self.to_dict())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def content_hash(self) -> str:
+        """Short digest of the content fields, equal to the WordNote's"""
+        return content_hash(self)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, CompactWordNote):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.FIELDS)
+
+    def __repr__(self) -> str:
+        return f"CompactWordNote(word={self.word!r}, source_lang={self.source_lang!r}, target_lang={self.target_lang!r})"
+
 class WordNotesResponse(BaseModel):
     """Response data containing word notes"""
+    # Other fields, e.g. paging information, are kept in model_extra
+    model_config = ConfigDict(extra='allow')
+
     word_notes: List[WordNote]
 
 class ApiResponse(BaseModel):
     """API response model"""
     code: int
     msg: str
-    data: Optional[Dict[str, Any]]
\ No newline at end of file
+    data: Optional[Dict[str, Any]]
+
+class WordNotesApiResponse(BaseModel):
+    """API response carrying word notes, validated in one pass from the JSON bytes"""
+    code: int
+    msg: str
+    data: Optional[WordNotesResponse] = None
@@ -1,10 +1,52 @@
-import aiohttp
+import asyncio
 import genanki
 import os
+from dataclasses import dataclass, field
 from typing import Dict, Any, List, Optional
 import logging as logger
 from ..core.interfaces import DataExporter
 from ..config import settings
+from ..session_manager import SessionManager
+from ..metrics import metrics
+from .apkg_writer import ApkgWriter, stable_deck_id
+
+class AnkiConnectError(Exception):
+    """Raised when AnkiConnect reports an error for an action"""
+    pass
+
+@dataclass
+class ExportResult:
+    """Outcome of exporting notes to Anki, per note in input order"""
+    note_ids: List[Optional[int]] = field(default_factory=list)
+    errors: Dict[int, str] = field(default_factory=dict)
+    # Indices of notes that matched an existing note, when upserting
+    updated: List[int] = field(default_factory=list)
+    unchanged: List[int] = field(default_factory=list)
+
+    @property
+    def added(self) -> List[int]:
+        """Indices of notes that were added"""
+        existing = set(self.updated) | set(self.unchanged)
+        return [i for i, note_id in enumerate(self.note_ids) if note_id is not None and i not in existing]
+
+    @property
+    def duplicates(self) -> List[int]:
+        """Indices of notes rejected because they are already in Anki"""
+        return [i for i, error in self.errors.items() if 'duplicate' in error]
+
+    @property
+    def failed(self) -> List[int]:
+        """Indices of notes that could not be added for any other reason"""
+        return [i for i, error in self.errors.items() if 'duplicate' not in error]
+
+    @property
+    def stored(self) -> List[int]:
+        """Indices of notes that are in Anki after the export"""
+        return sorted(self.added + self.duplicates + self.updated + self.unchanged)
+
+    @property
+    def success(self) -> bool:
+        return not self.failed
 
 class AnkiExporter(DataExporter):
     """Exporter for Anki notes with support for both AnkiConnect and .apkg export"""
@@ -35,6 +77,188 @@ class AnkiExporter(DataExporter):
             }]
         )
 
+    async def invoke(self, action: str, **params) -> Any:
+        """Call an AnkiConnect action
+        
+        Args:
+            action: Name of the action
+            **params: Parameters of the action
+            
+        Returns:
+            The action's result
+            
+        Raises:
+            AnkiConnectError: If AnkiConnect reports an error
+        """
+        payload = {"action": action, "version": 6, "params": params}
+        session = await SessionManager.get_session()
+        async with session.post(self.anki_connect_url, json=payload) as response:
+            response.raise_for_status()
+            result = await response.json()
+        if result.get("error"):
+            raise AnkiConnectError(result["error"])
+        return result.get("result")
+
+    async def multi(self, actions: List[Dict[str, Any]]) -> List[Any]:
+        """Run several actions in one AnkiConnect request
+        
+        Args:
+            actions: Actions as dictionaries with "action" and "params"
+            
+        Returns:
+            One result per action; failed actions return an AnkiConnectError
+            instead of raising
+        """
+        results = await self.invoke("multi", actions=[
+            {"action": action["action"], "version": 6, "params": action.get("params", {})}
+            for action in actions
+        ])
+        unpacked = []
+        for result in results:
+            if isinstance(result, dict) and "error" in result:
+                result = AnkiConnectError(result["error"]) if result["error"] else result.get("result")
+            unpacked.append(result)
+        return unpacked
+
+    @staticmethod
+    def escape_search(text: str) -> str:
+        """Escape text for use inside a quoted Anki search term"""
+        for char in ('\\', '"', '*', '_', ':'):
+            text = text.replace(char, '\\' + char)
+        return text
+
+    @classmethod
+    def note_query(cls, deck_name: str, field: str, value: str) -> str:
+        """Build an Anki search query matching a field value exactly within a deck"""
+        escape = cls.escape_search
+        return f'"deck:{escape(deck_name)}" "{escape(field)}:{escape(value)}"'
+
+    async def _multi_batched(self, actions: List[Dict[str, Any]]) -> List[Any]:
+        """Run many actions as chunked ``multi`` requests with bounded concurrency"""
+        chunk_size = max(1, settings.anki.chunk_size)
+        semaphore = asyncio.Semaphore(max(1, settings.anki.max_in_flight))
+        
+        async def send(chunk: List[Dict[str, Any]]) -> List[Any]:
+            async with semaphore:
+                return await self.multi(chunk)
+        
+        chunks = await asyncio.gather(*(
+            send(actions[start:start + chunk_size]) for start in range(0, len(actions), chunk_size)
+        ))
+        return [result for chunk in chunks for result in chunk]
+
+    async def upsert_notes(self, notes: List[Dict[str, Any]], **kwargs) -> ExportResult:
+        """Add new notes and update existing ones whose fields differ
+        
+        Notes are matched by the value of their key field within the deck.
+        Current field values are read with notesInfo and only the fields
+        that differ are sent with updateNoteFields, so unchanged notes cost
+        no writes in Anki and no sync traffic.
+        
+        Args:
+            notes: List of mapped notes
+            **kwargs: Additional parameters including:
+                - deck_name: Name of the deck containing the notes
+                - model_name: Note model for notes that have to be added
+                - key_field: Field identifying a note, required
+                
+        Returns:
+            ExportResult with added, updated and unchanged notes; notes
+            without a value for the key field are reported as errors
+            
+        Raises:
+            ValueError: If no key field is given
+        """
+        key_field = kwargs.get('key_field')
+        if not key_field:
+            raise ValueError("upsert_notes needs the key_field that identifies notes")
+        result = ExportResult(note_ids=[None] * len(notes))
+        if not notes:
+            return result
+        deck_name = kwargs.get('deck_name', settings.anki.deck_name)
+        model_name = kwargs.get('model_name', settings.anki.model_name)
+        keyed = []
+        for i, note in enumerate(notes):
+            if note.get(key_field):
+                keyed.append(i)
+            else:
+                result.errors[i] = f"note has no {key_field} field to match it by"
+        
+        with metrics.stage(f"{self.__class__.__name__}.upsert") as timer:
+            try:
+                found = await self._multi_batched([
+                    {"action": "findNotes",
+                     "params": {"query": self.note_query(deck_name, key_field, notes[i][key_field])}}
+                    for i in keyed
+                ])
+                matches, missing = {}, []
+                for i, note_ids in zip(keyed, found):
+                    if isinstance(note_ids, AnkiConnectError):
+                        result.errors[i] = str(note_ids)
+                    elif note_ids:
+                        matches[i] = note_ids
+                    else:
+                        missing.append(i)
+                
+                infos = {}
+                all_ids = [note_id for note_ids in matches.values() for note_id in note_ids]
+                for start in range(0, len(all_ids), 500):
+                    for info in await self.invoke("notesInfo", notes=all_ids[start:start + 500]):
+                        if info:
+                            infos[info["noteId"]] = {name: f["value"] for name, f in info["fields"].items()}
+                
+                updates, update_owners = [], []
+                for i, note_ids in matches.items():
+                    result.note_ids[i] = note_ids[0]
+                    changed = False
+                    for note_id in note_ids:
+                        current = infos.get(note_id, {})
+                        diff = {name: value for name, value in notes[i].items() if current.get(name) != value}
+                        if diff:
+                            changed = True
+                            updates.append({"action": "updateNoteFields",
+                                            "params": {"note": {"id": note_id, "fields": diff}}})
+                            update_owners.append(i)
+                    (result.updated if changed else result.unchanged).append(i)
+                
+                for i, outcome in zip(update_owners, await self._multi_batched(updates)):
+                    if isinstance(outcome, AnkiConnectError):
+                        result.errors[i] = str(outcome)
+                        if i in result.updated:
+                            result.updated.remove(i)
+                
+                if missing:
+                    added = await self.add_notes([notes[i] for i in missing], deck_name=deck_name, model_name=model_name)
+                    for position, i in enumerate(missing):
+                        result.note_ids[i] = added.note_ids[position]
+                        if position in added.errors:
+                            result.errors[i] = added.errors[position]
+            except Exception as e:
+                logger.error(f"Failed to upsert notes in Anki: {e}")
+                for i in range(len(notes)):
+                    if i not in result.unchanged and i not in result.updated and result.note_ids[i] is None:
+                        result.errors.setdefault(i, str(e))
+            timer.items = len(result.updated) + len(result.added)
+            timer.errors = len(result.failed)
+        
+        logger.info(
+            f"Upserted {len(notes)} notes: {len(result.added)} added, {len(result.updated)} updated, "
+            f"{len(result.unchanged)} unchanged, {len(result.failed)} failed"
+        )
+        return result
+
+    async def update_notes(self, notes: List[Dict[str, Any]], **kwargs) -> bool:
+        """Update existing Anki notes in place, adding the ones not found
+        
+        Args:
+            notes: List of notes with updated fields
+            **kwargs: Same as upsert_notes()
+                
+        Returns:
+            True if all notes were updated or added, False otherwise
+        """
+        return (await self.upsert_notes(notes, **kwargs)).success
+
     async def create_deck(self, deck_name: str) -> bool:
         """Create a new deck in Anki if it doesn't exist"""
         try:
@@ -46,18 +270,18 @@ class AnkiExporter(DataExporter):
                 }
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.anki_connect_url, json=payload) as response:
-                    response.raise_for_status()
-                    result = await response.json()
-                    
-                    if result.get("error"):
-                        logger.error(f"Failed to create deck: {result['error']}")
-                        return False
-                    
-                    logger.info(f"Created deck: {deck_name}")
-                    return True
-                    
+            session = await SessionManager.get_session()
+            async with session.post(self.anki_connect_url, json=payload) as response:
+                response.raise_for_status()
+                result = await response.json()
+                
+                if result.get("error"):
+                    logger.error(f"Failed to create deck: {result['error']}")
+                    return False
+                
+                logger.info(f"Created deck: {deck_name}")
+                return True
+                
         except Exception as e:
             logger.error(f"Error creating deck: {e}")
             return False
@@ -81,43 +305,154 @@ class AnkiExporter(DataExporter):
         
         # If output path provided, export to .apkg file
         if output_path:
-            return self.export_to_apkg(notes, output_path, deck_name)
+            with metrics.stage(f"{self.__class__.__name__}.apkg") as timer:
+                success = await asyncio.to_thread(self.export_to_apkg, notes, output_path, deck_name)
+                timer.items, timer.errors = (len(notes), 0) if success else (0, 1)
+            return success
             
         # Otherwise export via AnkiConnect
-        try:
-            # Create deck if it doesn't exist
-            if not await self.create_deck(deck_name):
-                return False
+        return await self.export_to_anki(notes, deck_name, model_name)
 
-            payload = {
-                "action": "addNotes",
-                "version": 6,
-                "params": {
-                    "notes": [{
-                        "deckName": deck_name,
-                        "modelName": model_name,
-                        "fields": note,
-                        "options": {
-                            "allowDuplicate": False
-                        },
-                    } for note in notes]
-                }
-            }
+    async def export_to_anki(self, notes: List[Dict[str, Any]], deck_name: str, model_name: str) -> bool:
+        """Export notes to a running Anki through AnkiConnect
+        
+        Args:
+            notes: List of notes to export
+            deck_name: Name of the deck to export to
+            model_name: Name of the note model to use
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.anki_connect_url, json=payload) as response:
-                    response.raise_for_status()
-                    result = await response.json()
-                    
-                    if result.get("error"):
-                        logger.error(f"Anki error: {result['error']}")
-                        return False
-                    
-                    return True
+        Returns:
+            True if every note was added or already present, False otherwise
+        """
+        return (await self.add_notes(notes, deck_name=deck_name, model_name=model_name)).success
+
+    def _note_params(self, note: Dict[str, Any], deck_name: str, model_name: str) -> Dict[str, Any]:
+        return {
+            "deckName": deck_name,
+            "modelName": model_name,
+            "fields": note,
+            "options": {
+                "allowDuplicate": False
+            },
+        }
+
+    async def can_add_notes(
+        self,
+        notes: List[Dict[str, Any]],
+        deck_name: str,
+        model_name: str,
+        batch_size: int = 500
+    ) -> List[bool]:
+        """Ask AnkiConnect which notes it would accept, in batches
+        
+        A note is refused when its first field is empty or duplicates an
+        existing note of the same model.
+        
+        Args:
+            notes: Notes to check, only the first field of the model matters
+            deck_name: Name of the target deck
+            model_name: Name of the note model
+            batch_size: Notes per canAddNotes request
             
-        except Exception as e:
-            logger.error(f"Failed to export notes to Anki: {e}")
-            return False
+        Returns:
+            One flag per note, True if it could be added
+        """
+        results = []
+        for start in range(0, len(notes), batch_size):
+            results.extend(await self.invoke("canAddNotes", notes=[
+                self._note_params(note, deck_name, model_name) for note in notes[start:start + batch_size]
+            ]))
+        return results
+
+    async def _add_chunk(
+        self,
+        notes: List[Dict[str, Any]],
+        deck_name: str,
+        model_name: str,
+        create_deck: bool = False
+    ) -> List[Any]:
+        """Add one chunk of notes, creating the deck in the same request if asked
+        
+        Each note is its own addNote action inside one ``multi`` request.
+        addNotes fails as a whole when any note is rejected, without saying
+        which of the other notes it added, while ``multi`` reports every
+        action separately.
+        
+        Returns:
+            One note id or AnkiConnectError per note
+        """
+        actions = [
+            {"action": "addNote", "params": {"note": self._note_params(note, deck_name, model_name)}}
+            for note in notes
+        ]
+        if create_deck:
+            actions.insert(0, {"action": "createDeck", "params": {"deck": deck_name}})
+        results = await self.multi(actions)
+        if create_deck:
+            if isinstance(results[0], AnkiConnectError):
+                raise results[0]
+            results = results[1:]
+        return [AnkiConnectError("note was not added") if result is None else result for result in results]
+
+    async def add_notes(self, notes: List[Dict[str, Any]], **kwargs) -> ExportResult:
+        """Add notes through AnkiConnect in chunks
+        
+        The deck is created in the same ``multi`` request as the first
+        chunk; the remaining chunks are sent with a bounded number of
+        requests in flight.
+        
+        Args:
+            notes: List of notes to add
+            **kwargs: Additional parameters including:
+                - deck_name: Name of the deck to export to
+                - model_name: Name of the note model to use
+                - chunk_size: Notes per request
+                - max_in_flight: Maximum number of concurrent chunk requests
+                
+        Returns:
+            ExportResult with the outcome of every note
+        """
+        deck_name = kwargs.get('deck_name', settings.anki.deck_name)
+        model_name = kwargs.get('model_name', settings.anki.model_name)
+        chunk_size = max(1, kwargs.get('chunk_size') or settings.anki.chunk_size)
+        semaphore = asyncio.Semaphore(max(1, kwargs.get('max_in_flight') or settings.anki.max_in_flight))
+        result = ExportResult(note_ids=[None] * len(notes))
+        
+        def record(start: int, outcomes: List[Any]):
+            for offset, outcome in enumerate(outcomes):
+                if isinstance(outcome, Exception):
+                    result.errors[start + offset] = str(outcome)
+                else:
+                    result.note_ids[start + offset] = outcome
+        
+        async def send(start: int):
+            chunk = notes[start:start + chunk_size]
+            async with semaphore:
+                try:
+                    outcomes = await self._add_chunk(chunk, deck_name, model_name)
+                except Exception as e:
+                    outcomes = [e] * len(chunk)
+            record(start, outcomes)
+        
+        with metrics.stage(self.__class__.__name__) as timer:
+            if notes:
+                try:
+                    record(0, await self._add_chunk(notes[:chunk_size], deck_name, model_name, create_deck=True))
+                except Exception as e:
+                    # No point in sending more chunks, e.g. Anki is not running
+                    logger.error(f"Failed to export notes to Anki: {e}")
+                    record(0, [e] * len(notes))
+                else:
+                    await asyncio.gather(*(send(start) for start in range(chunk_size, len(notes), chunk_size)))
+            timer.items = len(result.added)
+            timer.errors = len(result.failed)
+        
+        if result.failed:
+            logger.error(
+                f"Failed to add {len(result.failed)} of {len(notes)} notes to Anki, "
+                f"e.g. {result.errors[result.failed[0]]}"
+            )
+        return result
 
     def export_to_apkg(
         self,
@@ -136,37 +471,11 @@ class AnkiExporter(DataExporter):
             True if successful, False otherwise
         """
         try:
-            # Create deck
-            deck = genanki.Deck(
-                2059400110,  # Random deck ID
-                deck_name
-            )
-
-            # Add notes to deck
-            for note_fields in notes:
-                note = genanki.Note(
-                    model=self.model,
-                    fields=[
-                        note_fields.get('Front', ''),
-                        note_fields.get('Back', ''),
-                        note_fields.get('Phonetic', ''),
-                        note_fields.get('Examples', ''),
-                        note_fields.get('Collins', '')
-                    ]
-                )
-                deck.add_note(note)
-
-            # Create package and save
-            output_dir = os.path.dirname(output_path)
-            if output_dir:
-                os.makedirs(output_dir, exist_ok=True)
-                
-            package = genanki.Package(deck)
-            package.write_to_file(output_path)
-            
-            logger.success(f"Successfully exported deck to {output_path}")
+            writer = ApkgWriter(self.model, stable_deck_id(deck_name), deck_name)
+            writer.write(notes, output_path)
+            logger.info(f"Successfully exported deck to {output_path}")
             return True
             
         except Exception as e:
             logger.error(f"Failed to export deck: {e}")
-            return False
\ No newline at end of file
+            return False
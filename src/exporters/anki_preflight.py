@@ -0,0 +1,146 @@
+import json
+import os
+import tempfile
+from typing import Any, Dict, Iterable, List, Set
+import logging
+from .anki_exporter import AnkiExporter
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AnkiPreflight:
+    """Finds words that are already in Anki before they are enriched
+
+    Results of canAddNotes are remembered between runs. They stay valid
+    while the set of notes of the model is unchanged, which is checked with
+    an order-independent fingerprint of the note ids. Notes added by this
+    program are folded into the fingerprint, so only changes made elsewhere
+    (e.g. in Anki itself) invalidate the remembered results.
+    """
+
+    def __init__(
+        self,
+        exporter: AnkiExporter,
+        cache_file: str,
+        deck_name: str,
+        model_name: str,
+        key_field: str
+    ):
+        """Initialize pre-flight check
+
+        Args:
+            exporter: Exporter used to talk to AnkiConnect
+            cache_file: JSON file remembering results between runs
+            deck_name: Name of the target deck
+            model_name: Name of the note model
+            key_field: Anki field holding the word, must be the model's first field
+        """
+        self.exporter = exporter
+        self.cache_file = os.path.expanduser(cache_file)
+        self.deck_name = deck_name
+        self.model_name = model_name
+        self.key_field = key_field
+        self.existing: Set[str] = set()
+        self.absent: Set[str] = set()
+        self.fingerprint: List[int] = []
+        self._load()
+
+    @classmethod
+    def from_settings(cls, exporter: AnkiExporter, key_field: str) -> 'AnkiPreflight':
+        return cls(
+            exporter,
+            os.path.join(os.path.expanduser(settings.cache.directory), 'anki_preflight.json'),
+            settings.anki.deck_name,
+            settings.anki.model_name,
+            key_field
+        )
+
+    def _scope(self) -> Dict[str, str]:
+        return {'deck': self.deck_name, 'model': self.model_name, 'key_field': self.key_field}
+
+    def _load(self):
+        if not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable pre-flight cache {self.cache_file}: {e}")
+            return
+        if data.get('scope') == self._scope():
+            self.fingerprint = data.get('fingerprint', [])
+            self.existing = set(data.get('existing', []))
+            self.absent = set(data.get('absent', []))
+
+    def save(self):
+        """Write the remembered results atomically"""
+        directory = os.path.dirname(self.cache_file) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({
+                'scope': self._scope(),
+                'fingerprint': self.fingerprint,
+                'existing': sorted(self.existing),
+                'absent': sorted(self.absent)
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_file)
+
+    @staticmethod
+    def _fold(fingerprint: List[int], note_ids: Iterable[int]) -> List[int]:
+        """Add note ids to a (count, sum, xor) fingerprint"""
+        count, total, xor = fingerprint or (0, 0, 0)
+        for note_id in note_ids:
+            count += 1
+            total = (total + note_id) % 2 ** 64
+            xor ^= note_id
+        return [count, total, xor]
+
+    async def existing_words(self, words: Iterable[str]) -> Set[str]:
+        """Return the words that Anki would reject as duplicates
+
+        Args:
+            words: Words to check
+
+        Returns:
+            Set of words already present in Anki
+        """
+        words = list(dict.fromkeys(words))
+        fields = await self.exporter.invoke("modelFieldNames", modelName=self.model_name)
+        if not fields or fields[0] != self.key_field:
+            # Anki only checks the first field for duplicates
+            logger.warning(f"{self.key_field} is not the first field of {self.model_name}, skipping pre-flight")
+            return set()
+
+        note_ids = await self.exporter.invoke(
+            "findNotes", query=f'"note:{self.exporter.escape_search(self.model_name)}"'
+        )
+        fingerprint = self._fold([], note_ids)
+        if fingerprint != self.fingerprint:
+            if self.fingerprint:
+                logger.info("Anki notes changed since the last run, re-checking duplicates")
+            self.existing.clear()
+            self.absent.clear()
+            self.fingerprint = fingerprint
+
+        unknown = [word for word in words if word not in self.existing and word not in self.absent]
+        if unknown:
+            addable = await self.exporter.can_add_notes(
+                [{self.key_field: word} for word in unknown], self.deck_name, self.model_name
+            )
+            for word, ok in zip(unknown, addable):
+                (self.absent if ok else self.existing).add(word)
+        logger.info(f"Pre-flight checked {len(unknown)} of {len(words)} words with AnkiConnect")
+        return {word for word in words if word in self.existing}
+
+    def record_added(self, words: List[str], note_ids: List[Any]):
+        """Remember notes added during this run
+
+        Args:
+            words: Key field values of the added notes
+            note_ids: Ids of the added notes
+        """
+        self.existing.update(words)
+        self.absent.difference_update(words)
+        self.fingerprint = self._fold(self.fingerprint, note_ids)
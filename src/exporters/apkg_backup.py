@@ -0,0 +1,210 @@
+import hashlib
+import itertools
+import json
+import os
+import sqlite3
+import tempfile
+import zipfile
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import logging
+import genanki
+from .apkg_writer import ApkgWriter, note_guid, stable_deck_id, word_guid
+from ..core.models import WordNote
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ApkgBackup:
+    """Writes .apkg backups of exported notes
+
+    In full mode every run writes one package with the notes it exported.
+    In delta mode packages only hold notes added or changed since the last
+    backup, and a manifest lists them in order, starting from a base. The
+    deck id and note GUIDs are stable (the GUID is derived from the word and
+    its language pair), so importing the packages in manifest order, or the
+    package built by reconstruct, yields the current deck, with edited
+    words updated in place.
+    """
+
+    MANIFEST = 'manifest.json'
+    STATE = 'backup_state.sqlite3'
+
+    def __init__(self, directory: str, model: genanki.Model, deck_name: str, mode: str = 'delta'):
+        """Initialize backup
+
+        Args:
+            directory: Directory holding the packages, manifest and state
+            model: Note model of the packages
+            deck_name: Name of the backed up deck
+            mode: "full" or "delta"
+        """
+        self.directory = os.path.expanduser(directory)
+        self.mode = mode
+        self.deck_name = deck_name
+        self.writer = ApkgWriter(model, stable_deck_id(deck_name), deck_name)
+        os.makedirs(self.directory, exist_ok=True)
+        self._conn = None
+        if mode == 'delta':
+            self._conn = sqlite3.connect(os.path.join(self.directory, self.STATE), isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS notes (guid TEXT PRIMARY KEY, digest TEXT NOT NULL)")
+
+    @classmethod
+    def from_settings(cls, model: genanki.Model) -> 'ApkgBackup':
+        return cls(settings.backup.directory, model, settings.anki.deck_name, settings.backup.mode)
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.directory, self.MANIFEST)
+
+    def load_manifest(self) -> Dict[str, Any]:
+        """Manifest of the delta chain, empty if there is none yet"""
+        if not os.path.exists(self.manifest_path):
+            return {'deck_name': self.deck_name, 'deck_id': self.writer.deck.deck_id, 'packages': []}
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_manifest(self, manifest: Dict[str, Any]):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _digest(self, note: Dict[str, Any]) -> str:
+        fields = '\x1f'.join(note.get(name) or '' for name in self.writer.field_names)
+        return hashlib.blake2b(fields.encode('utf-8'), digest_size=8).hexdigest()
+
+    def _guids(self, notes: List[Dict[str, Any]], words: List[WordNote], key_field: Optional[str]) -> List[str]:
+        """Stable GUID of each note, falling back to genanki's content GUID"""
+        by_word = {word.word: word for word in words}
+        guids = []
+        for note in notes:
+            word = by_word.get(note.get(key_field)) if key_field else None
+            guids.append(
+                word_guid(word.source_lang, word.target_lang, word.word) if word
+                else note_guid([note.get(name) or '' for name in self.writer.field_names])
+            )
+        return guids
+
+    def _changed(self, guids: List[str], digests: List[str]) -> List[int]:
+        """Indexes of notes whose digest differs from the last backup"""
+        stored = {}
+        for start in range(0, len(guids), 500):
+            chunk = guids[start:start + 500]
+            stored.update(self._conn.execute(
+                f"SELECT guid, digest FROM notes WHERE guid IN ({','.join('?' * len(chunk))})", chunk
+            ))
+        # A word listed twice is backed up once, with its last note
+        latest = {guid: index for index, guid in enumerate(guids)}
+        return [index for guid, index in latest.items() if stored.get(guid) != digests[index]]
+
+    def backup(
+        self,
+        notes: List[Dict[str, Any]],
+        words: List[WordNote],
+        key_field: Optional[str]
+    ) -> Optional[str]:
+        """Write a backup of exported notes
+
+        Args:
+            notes: Exported Anki notes
+            words: Word notes the Anki notes were made from
+            key_field: Anki field holding the word, used to find each note's word
+
+        Returns:
+            Path of the written package, or None if there was nothing to back up
+        """
+        guids = self._guids(notes, words, key_field)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        if self.mode == 'full':
+            if not notes:
+                return None
+            path = os.path.join(self.directory, f"doubao_vocab_{timestamp}.apkg")
+            self.writer.write(notes, path, guids=guids)
+            return path
+
+        digests = [self._digest(note) for note in notes]
+        changed = self._changed(guids, digests)
+        if not changed:
+            logger.info("No notes changed since the last backup")
+            return None
+        manifest = self.load_manifest()
+        kind = 'delta' if manifest['packages'] else 'base'
+        name = f"doubao_vocab_{kind}_{timestamp}.apkg"
+        path = os.path.join(self.directory, name)
+        self.writer.write((notes[i] for i in changed), path, guids=[guids[i] for i in changed])
+
+        # The package is complete before it is listed; a note recorded in
+        # the state is always in a listed package
+        manifest['packages'].append({
+            'file': name,
+            'kind': kind,
+            'created': timestamp,
+            'notes': len(changed)
+        })
+        self._save_manifest(manifest)
+        self._conn.execute("BEGIN")
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO notes (guid, digest) VALUES (?, ?)",
+            ((guids[i], digests[i]) for i in changed)
+        )
+        self._conn.execute("COMMIT")
+        logger.info(f"Backed up {len(changed)} of {len(notes)} notes to {path}")
+        return path
+
+    def reconstruct(self, output_path: str) -> int:
+        """Build one package with the full deck from the base and its deltas
+
+        Notes of later packages replace those with the same GUID. Notes are
+        collected in a scratch database, so memory use does not depend on
+        the size of the deck.
+
+        Args:
+            output_path: Path of the full .apkg file
+
+        Returns:
+            Number of notes in the full deck
+        """
+        fd, merged_path = tempfile.mkstemp(dir=self.directory, suffix='.sqlite3')
+        os.close(fd)
+        merged = sqlite3.connect(merged_path, isolation_level=None)
+        try:
+            merged.execute("CREATE TABLE notes (guid TEXT PRIMARY KEY, flds TEXT NOT NULL, seq INTEGER NOT NULL)")
+            seq = 0
+            for package in self.load_manifest()['packages']:
+                with tempfile.TemporaryDirectory(dir=self.directory) as tmp:
+                    with zipfile.ZipFile(os.path.join(self.directory, package['file'])) as apkg:
+                        collection = apkg.extract('collection.anki2', tmp)
+                    source = sqlite3.connect(collection)
+                    try:
+                        merged.execute("BEGIN")
+                        for guid, flds in source.execute("SELECT guid, flds FROM notes ORDER BY id"):
+                            merged.execute(
+                                "INSERT INTO notes (guid, flds, seq) VALUES (?, ?, ?) "
+                                "ON CONFLICT (guid) DO UPDATE SET flds = excluded.flds",
+                                (guid, flds, seq)
+                            )
+                            seq += 1
+                        merged.execute("COMMIT")
+                    finally:
+                        source.close()
+
+            rows = merged.execute("SELECT guid, flds FROM notes ORDER BY seq")
+            # zip in the writer advances both copies together, so tee buffers one row
+            note_rows, guid_rows = itertools.tee(rows)
+            names = self.writer.field_names
+            return self.writer.write(
+                (dict(zip(names, flds.split('\x1f'))) for _, flds in note_rows),
+                output_path,
+                guids=(guid for guid, _ in guid_rows)
+            )
+        finally:
+            merged.close()
+            os.remove(merged_path)
+
+    def close(self):
+        """Close the backup state database"""
+        if self._conn:
+            self._conn.close()
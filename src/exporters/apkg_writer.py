@@ -0,0 +1,195 @@
+import hashlib
+import itertools
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import time
+import zipfile
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import logging
+import genanki
+from genanki.apkg_col import APKG_COL
+from genanki.apkg_schema import APKG_SCHEMA
+from genanki.util import BASE91_TABLE
+
+logger = logging.getLogger(__name__)
+
+_HTML_TAG = re.compile(r'<[^>]*>')
+
+# Two base91 digits per step halve the work of encoding a GUID
+_BASE91_PAIRS = [high + low for high in BASE91_TABLE for low in BASE91_TABLE]
+
+# Indexes are built once after the bulk insert instead of row by row
+_INDEX_START = APKG_SCHEMA.index('CREATE INDEX')
+_APKG_TABLES, _APKG_INDEXES = APKG_SCHEMA[:_INDEX_START], APKG_SCHEMA[_INDEX_START:]
+
+
+def note_guid(fields: List[str]) -> str:
+    """Same GUID as genanki.util.note_guid(fields), without its per-digit overhead"""
+    value = int.from_bytes(hashlib.sha256('__'.join(fields).encode('utf-8')).digest()[:8], 'big')
+    digits = []
+    while value:
+        value, pair = divmod(value, 8281)
+        digits.append(_BASE91_PAIRS[pair])
+    # The leading pair may start with a zero digit, which guid_for omits
+    return ''.join(reversed(digits)).lstrip(BASE91_TABLE[0])
+
+
+def word_guid(source_lang: str, target_lang: str, word: str) -> str:
+    """GUID of a word's note that stays the same when its content changes"""
+    return note_guid([source_lang, target_lang, word])
+
+
+def stable_deck_id(deck_name: str) -> int:
+    """Deck id derived from the deck name, in the range genanki recommends"""
+    digest = hashlib.blake2b(deck_name.encode('utf-8'), digest_size=4).digest()
+    return (1 << 30) + int.from_bytes(digest, 'big') % (1 << 30)
+
+
+def field_checksum(value: str) -> int:
+    """Checksum Anki keeps of a note's first field for duplicate checks"""
+    text = _HTML_TAG.sub('', value).strip()
+    return int(hashlib.sha1(text.encode('utf-8')).hexdigest()[:8], 16)
+
+
+class ApkgWriter:
+    """Writes .apkg packages straight into the collection database
+
+    Produces the same collection as genanki.Package, but notes are turned
+    into rows chunk by chunk and inserted with executemany in a single
+    transaction, so no genanki.Note is built and memory use does not grow
+    with the number of notes.
+    """
+
+    # Notes converted and inserted per executemany call
+    CHUNK_SIZE = 1000
+
+    def __init__(self, model: genanki.Model, deck_id: int, deck_name: str):
+        """Initialize writer
+
+        Args:
+            model: Note model, its field names are the keys of the notes
+            deck_id: Id of the deck
+            deck_name: Name of the deck
+        """
+        self.model = model
+        self.deck = genanki.Deck(deck_id, deck_name)
+        self.field_names = [field['name'] for field in model.fields]
+
+    def _card_ords(self, fields: List[str]) -> List[int]:
+        """Templates producing a card for the given fields, like genanki's front/back rule"""
+        ords = []
+        for card_ord, any_or_all, required in self.model._req:
+            op = any if any_or_all == 'any' else all
+            if op(fields[index] for index in required):
+                ords.append(card_ord)
+        return ords
+
+    def _rows(
+        self,
+        notes: List[Tuple[Dict[str, Any], Optional[str]]],
+        id_gen: Iterable[int],
+        mod: int
+    ) -> Tuple[List[tuple], List[tuple]]:
+        """Note and card rows for a chunk of notes"""
+        note_rows, card_rows = [], []
+        mid, did = self.model.model_id, self.deck.deck_id
+        sort_index = self.model.sort_field_index
+        for note, guid in notes:
+            fields = [note.get(name) or '' for name in self.field_names]
+            note_id = next(id_gen)
+            note_rows.append((
+                note_id, guid or note_guid(fields), mid, mod, -1, '  ', '\x1f'.join(fields),
+                fields[sort_index], field_checksum(fields[0]), 0, ''
+            ))
+            for card_ord in self._card_ords(fields):
+                card_rows.append((
+                    next(id_gen), note_id, did, card_ord, mod, -1, 0, 0, 0,
+                    0, 0, 0, 0, 0, 0, 0, 0, ''
+                ))
+        return note_rows, card_rows
+
+    def _write_collection(
+        self,
+        cursor: sqlite3.Cursor,
+        notes: Iterable[Tuple[Dict[str, Any], Optional[str]]],
+        timestamp: float
+    ) -> int:
+        cursor.executescript(_APKG_TABLES)
+        cursor.executescript(APKG_COL)
+        # executescript commits, so the transaction starts after the schema
+        cursor.execute("BEGIN")
+        decks = json.loads(cursor.execute("SELECT decks FROM col").fetchone()[0])
+        decks[str(self.deck.deck_id)] = self.deck.to_json()
+        models = json.loads(cursor.execute("SELECT models FROM col").fetchone()[0])
+        models[str(self.model.model_id)] = self.model.to_json(timestamp, self.deck.deck_id)
+        cursor.execute("UPDATE col SET decks = ?, models = ?", (json.dumps(decks), json.dumps(models)))
+
+        id_gen = itertools.count(int(timestamp * 1000))
+        count = 0
+        notes = iter(notes)
+        while True:
+            chunk = list(itertools.islice(notes, self.CHUNK_SIZE))
+            if not chunk:
+                cursor.execute("COMMIT")
+                cursor.executescript(_APKG_INDEXES)
+                return count
+            note_rows, card_rows = self._rows(chunk, id_gen, int(timestamp))
+            cursor.executemany("INSERT INTO notes VALUES (?,?,?,?,?,?,?,?,?,?,?)", note_rows)
+            cursor.executemany("INSERT INTO cards VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)", card_rows)
+            count += len(chunk)
+
+    def write(
+        self,
+        notes: Iterable[Dict[str, Any]],
+        output_path: str,
+        guids: Optional[Iterable[Optional[str]]] = None,
+        timestamp: Optional[float] = None,
+        compression: int = zipfile.ZIP_DEFLATED
+    ) -> int:
+        """Write notes to an .apkg file
+
+        The package is built next to the output path and moved into place
+        when complete, so a failed export never leaves a partial file.
+
+        Args:
+            notes: Notes keyed by model field name, may be a generator
+            output_path: Path of the .apkg file
+            guids: GUID of each note, in order; notes without one get
+                genanki's GUID derived from all their fields
+            timestamp: Creation time of notes and cards, defaults to now
+            compression: Zip compression of the package
+
+        Returns:
+            Number of notes written
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        pairs = zip(notes, guids) if guids is not None else ((note, None) for note in notes)
+        directory = os.path.dirname(output_path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, db_path = tempfile.mkstemp(dir=directory, suffix='.anki2')
+        os.close(fd)
+        fd, zip_path = tempfile.mkstemp(dir=directory, suffix='.apkg.tmp')
+        os.close(fd)
+        try:
+            conn = sqlite3.connect(db_path, isolation_level=None)
+            try:
+                # Scratch database, durability only matters once it is zipped
+                conn.execute("PRAGMA journal_mode=OFF")
+                conn.execute("PRAGMA synchronous=OFF")
+                count = self._write_collection(conn.cursor(), pairs, timestamp)
+            finally:
+                conn.close()
+
+            with zipfile.ZipFile(zip_path, 'w', compression=compression) as package:
+                package.write(db_path, 'collection.anki2')
+                package.writestr('media', json.dumps({}))
+            os.replace(zip_path, output_path)
+        finally:
+            for path in (db_path, zip_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        logger.info(f"Wrote {count} notes to {output_path}")
+        return count
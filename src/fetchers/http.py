@@ -1,11 +1,18 @@
 import aiohttp
 import asyncio
 import backoff
-from typing import Dict, Any, Optional, List
+import codecs
+import csv
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, Any, Optional, List, Tuple
 import logging
 from src.core.interfaces import DataFetcher
-from ..core.models import WordNote, ApiResponse, WordNotesResponse
-from ..config import settings
+from pydantic import ValidationError
+from ..core.models import WordNote, ApiResponse, WordNotesApiResponse, WordNotesResponse
+from ..config import PaginationConfig, settings
+from ..rate_limiter import rate_limiter
+from ..metrics import metrics
+from ..sync_state import SyncState
 
 logger = logging.getLogger(__name__)
 
@@ -13,16 +20,72 @@ class RequestError(Exception):
     """Custom exception for request errors"""
     pass
 
+class CsvRecordSplitter:
+    """Splits CSV text arriving in pieces into complete records
+
+    A line break ends a record only when the record holds an even number of
+    quote characters so far, i.e. it is not inside a quoted field. Escaped
+    quotes ("") don't change the parity. Only the unfinished record is kept.
+    """
+
+    def __init__(self):
+        self._buffer = ''
+        self._scanned = 0
+        self._quotes = 0
+
+    def feed(self, text: str) -> List[str]:
+        """Add text and return the records it completes"""
+        buffer = self._buffer + text
+        records = []
+        start = 0
+        pos = self._scanned
+        while True:
+            end = buffer.find('\n', pos)
+            if end < 0:
+                break
+            self._quotes += buffer.count('"', pos, end + 1)
+            pos = end + 1
+            if self._quotes % 2 == 0:
+                records.append(buffer[start:pos])
+                start = pos
+                self._quotes = 0
+        self._buffer = buffer[start:]
+        self._scanned = pos - start
+        return records
+
+    def close(self) -> List[str]:
+        """Return the last record if the text didn't end with a line break"""
+        rest, self._buffer, self._scanned, self._quotes = self._buffer, '', 0, 0
+        return [rest] if rest.strip() else []
+
 class HTTPFetcher(DataFetcher):
+    # Bytes read from the response at a time when streaming
+    STREAM_CHUNK_SIZE = 64 * 1024
+
     def __init__(
         self,
         base_url: Optional[str] = None,
         timeout: int = 30,
         max_retries: int = 3,
-        format: str = 'json'
+        format: str = 'json',
+        pagination: Optional[PaginationConfig] = None,
+        sync_state: Optional[SyncState] = None,
+        fast_decode: bool = True
     ):
-        """Initialize HTTP fetcher with configuration"""
+        """Initialize HTTP fetcher with configuration
+        
+        Args:
+            pagination: Fetch JSON word notes page by page when enabled
+            sync_state: Make single-request fetches conditional on a change
+                since the last sync
+            fast_decode: Validate JSON responses straight from the bytes
+        """
         self.format = format.lower()
+        self.pagination = pagination
+        self.sync_state = sync_state
+        self.fast_decode = fast_decode
+        # Set when the last fetch found the notebook unchanged
+        self.not_modified = False
         # Use the appropriate endpoint based on format
         if base_url:
             self.base_url = base_url
@@ -41,7 +104,8 @@ class HTTPFetcher(DataFetcher):
         """Get or create aiohttp session"""
         if self._session is None or self._session.closed:
             self._session = aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=self.timeout)
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_configs=[rate_limiter.trace_config()]
             )
         return self._session
 
@@ -54,30 +118,120 @@ class HTTPFetcher(DataFetcher):
             "Content-Type": "application/json"
         }
 
+    def _build_params(self, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Default query parameters updated with the given ones"""
+        default_params = {
+            "language": settings.language.default,
+            "source_lang": settings.language.source,
+            "target_lang": settings.language.target
+        }
+
+        if params:
+            default_params.update(params)
+        return default_params
+
+    def _api_data(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the data of an API response, raising RequestError for API errors"""
+        api_response = ApiResponse(**data)
+        
+        if api_response.code != 0:
+            error_msg = f"API Error {api_response.code}: {api_response.msg}"
+            logger.error(error_msg)
+            raise RequestError(error_msg)
+        return api_response.data
+
+    def _decode_fast(self, body: bytes) -> Optional[WordNotesApiResponse]:
+        """Parse and validate a word notes response in one pass over the bytes
+
+        Returns:
+            The response, or None if it has another shape (e.g. an API error
+            without notes), which the general path then handles
+        """
+        try:
+            response = WordNotesApiResponse.model_validate_json(body)
+        except ValidationError:
+            return None
+        return response if response.code == 0 and response.data else None
+
+    def _csv_row_to_note(self, row: Dict[str, str]) -> WordNote:
+        """Convert one row of the CSV export into a WordNote"""
+        sentences = row.get('sentences', '').split('\n') if row.get('sentences') else []
+        return WordNote(
+            source_lang=settings.language.source,
+            target_lang=settings.language.target,
+            word=row.get('word', ''),
+            translate=row.get('translation', ''),
+            phonetic=row.get('phonetic', ''),
+            sentences=sentences
+        )
+
     async def _parse_csv_response(self, content: str) -> List[WordNote]:
         """Parse CSV response into WordNote objects"""
-        import csv
         from io import StringIO
         
         # logger.debug("Parsing CSV content",content)
 
-        word_notes = []
         csv_file = StringIO(content.lstrip('\ufeff'))  # Remove BOM if present
         reader = csv.DictReader(csv_file)
-        
-        for row in reader:
-            sentences = row.get('sentences', '').split('\n') if row.get('sentences') else []
-            word_note = WordNote(
-                source_lang=settings.language.source,
-                target_lang=settings.language.target,
-                word=row.get('word', ''),
-                translate=row.get('translation', ''),
-                phonetic=row.get('phonetic', ''),
-                sentences=sentences
-            )
-            word_notes.append(word_note)
-            
-        return word_notes
+        return [self._csv_row_to_note(row) for row in reader]
+
+    async def _csv_records(
+        self,
+        response: aiohttp.ClientResponse,
+        hasher: Optional[Any] = None
+    ) -> AsyncIterator[List[str]]:
+        """Complete CSV records of the body, one chunk's worth at a time
+
+        Bytes are decoded incrementally, so a character split between
+        chunks is fine, and a record split between chunks is held back
+        until its end arrives. A hasher, if given, is updated with the raw
+        bytes of every chunk.
+        """
+        decoder = codecs.getincrementaldecoder(response.charset or 'utf-8')()
+        splitter = CsvRecordSplitter()
+        first = True
+        async for chunk in response.content.iter_chunked(self.STREAM_CHUNK_SIZE):
+            if hasher:
+                hasher.update(chunk)
+            text = decoder.decode(chunk)
+            if first and text:
+                text = text.lstrip('\ufeff')  # Remove BOM if present
+                first = False
+            yield splitter.feed(text)
+        yield splitter.feed(decoder.decode(b'', final=True)) + splitter.close()
+
+    async def _iter_csv(
+        self,
+        response: aiohttp.ClientResponse,
+        hasher: Optional[Any] = None
+    ) -> AsyncIterator[WordNote]:
+        """Yield WordNotes while the CSV body downloads"""
+        header = None
+        async for records in self._csv_records(response, hasher):
+            for row in csv.reader(records):
+                if header is None:
+                    header = row
+                elif row:
+                    yield self._csv_row_to_note(dict(zip(header, row)))
+
+    def _stage_sync(self, sync_key: str, response: aiohttp.ClientResponse, digest: str) -> bool:
+        """Stage a downloaded response in the sync state
+
+        Returns:
+            False if the body is the one the last sync processed, which
+            sets not_modified
+        """
+        # Servers ignoring conditional requests still resend the same body
+        if self.sync_state.unchanged(sync_key, digest):
+            self.not_modified = True
+            return False
+        self.sync_state.stage(
+            sync_key,
+            response.headers.get('ETag'),
+            response.headers.get('Last-Modified'),
+            digest
+        )
+        return True
 
     @backoff.on_exception(
         backoff.expo,
@@ -95,15 +249,11 @@ class HTTPFetcher(DataFetcher):
         """Make HTTP request with automatic retries and error handling"""
         session = await self._get_session()
         url = f"{self.base_url}/{endpoint}".rstrip('/')
-
-        default_params = {
-            "language": settings.language.default,
-            "source_lang": settings.language.source,
-            "target_lang": settings.language.target
-        }
-
-        if params:
-            default_params.update(params)
+        default_params = self._build_params(params)
+        headers = self._get_headers()
+        sync_key = SyncState.key(url, default_params) if self.sync_state else None
+        if sync_key:
+            headers.update(self.sync_state.conditional_headers(sync_key))
 
         logger.debug(f"Making request to {url} with params: {default_params}")
 
@@ -113,29 +263,39 @@ class HTTPFetcher(DataFetcher):
                 url,
                 params=default_params,
                 json=json,
-                headers=self._get_headers(),
+                headers=headers,
                 **kwargs
             ) as response:
                 response.raise_for_status()
                 
+                if sync_key and response.status == 304:
+                    self.not_modified = True
+                    return []
+                
                 if self.format == 'csv':
-                    content = await response.text()
-                    return await self._parse_csv_response(content)
+                    # Parsed while the body downloads, never held as one string
+                    hasher = SyncState.hasher() if sync_key else None
+                    notes = [note async for note in self._iter_csv(response, hasher)]
+                    if sync_key and not self._stage_sync(sync_key, response, hasher.hexdigest()):
+                        return []
+                    return notes
                 
-                data = await response.json()
-                api_response = ApiResponse(**data)
+                if sync_key and not self._stage_sync(sync_key, response, SyncState.digest(await response.read())):
+                    return []
                 
-                if api_response.code != 0:
-                    error_msg = f"API Error {api_response.code}: {api_response.msg}"
-                    logger.error(error_msg)
-                    raise RequestError(error_msg)
+                if self.fast_decode:
+                    decoded = self._decode_fast(await response.read())
+                    if decoded:
+                        return decoded.data.word_notes
+
+                data = self._api_data(await response.json())
                 
-                if not api_response.data:
+                if not data:
                     logger.warning("No data in API response")
                     return []
                 
                 try:
-                    word_notes_response = WordNotesResponse(**api_response.data)
+                    word_notes_response = WordNotesResponse(**data)
                     return word_notes_response.word_notes
                 except Exception as e:
                     logger.error(f"Failed to parse word notes: {e}")
@@ -145,10 +305,179 @@ class HTTPFetcher(DataFetcher):
             logger.error(f"Request failed: {e}")
             raise
 
+    async def _get_page(self, params: Dict[str, Any]) -> Tuple[List[WordNote], Dict[str, Any]]:
+        """Fetch one page of word notes, retrying with exponential backoff
+
+        Returns:
+            Tuple of (word notes, response data)
+        """
+        session = await self._get_session()
+        url = self.base_url.rstrip('/')
+        attempts = max(1, self.pagination.max_retries)
+        for attempt in range(1, attempts + 1):
+            try:
+                with metrics.stage(f"{self.__class__.__name__}.page") as timer:
+                    async with session.get(
+                        url,
+                        params=self._build_params(params),
+                        headers=self._get_headers()
+                    ) as response:
+                        response.raise_for_status()
+                        decoded = self._decode_fast(await response.read()) if self.fast_decode else None
+                        if decoded:
+                            notes, data = decoded.data.word_notes, decoded.data.model_extra
+                        else:
+                            data = self._api_data(await response.json()) or {}
+                            notes = WordNotesResponse(**data).word_notes if data.get('word_notes') else []
+                    timer.items = len(notes)
+                return notes, data
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == attempts:
+                    logger.error(f"Page request failed after {attempts} attempts: {e}")
+                    raise
+                delay = self.pagination.retry_delay * 2 ** (attempt - 1)
+                logger.warning(f"Page request failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    def _is_last_page(self, notes: List[WordNote], data: Dict[str, Any]) -> bool:
+        has_more = data.get(self.pagination.has_more_field)
+        if has_more is not None:
+            return not has_more
+        return len(notes) < self.pagination.page_size
+
+    async def _iter_numbered_pages(self, params: Dict[str, Any]) -> AsyncIterator[List[WordNote]]:
+        """Walk numbered pages, keeping the next pages in flight while one is consumed"""
+        config = self.pagination
+        window: Deque[asyncio.Task] = deque()
+        next_page = config.first_page
+
+        def request_next():
+            nonlocal next_page
+            page_params = {**params, config.page_param: next_page, config.size_param: config.page_size}
+            window.append(asyncio.ensure_future(self._get_page(page_params)))
+            next_page += 1
+
+        try:
+            for _ in range(1 + max(0, config.prefetch)):
+                request_next()
+            while window:
+                notes, data = await window.popleft()
+                if self._is_last_page(notes, data):
+                    if notes:
+                        yield notes
+                    return
+                request_next()
+                yield notes
+        finally:
+            # Pages requested past the last one are dropped
+            for task in window:
+                task.cancel()
+            await asyncio.gather(*window, return_exceptions=True)
+
+    async def _iter_cursor_pages(self, params: Dict[str, Any]) -> AsyncIterator[List[WordNote]]:
+        """Walk cursor pages; each needs the previous cursor, so a producer
+        fetches ahead of the consumer into a bounded queue instead"""
+        config = self.pagination
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, config.prefetch))
+
+        async def produce():
+            cursor = None
+            try:
+                while True:
+                    page_params = {**params, config.size_param: config.page_size}
+                    if cursor is not None:
+                        page_params[config.cursor_param] = cursor
+                    notes, data = await self._get_page(page_params)
+                    cursor = data.get(config.cursor_field)
+                    await queue.put((notes, None))
+                    if cursor is None or not notes or data.get(config.has_more_field) is False:
+                        break
+            except Exception as e:
+                await queue.put((None, e))
+                return
+            await queue.put((None, None))
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                notes, error = await queue.get()
+                if error:
+                    raise error
+                if notes is None:
+                    return
+                if notes:
+                    yield notes
+        finally:
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+
+    async def _iter_pages(self, params: Optional[Dict[str, Any]] = None) -> AsyncIterator[List[WordNote]]:
+        """Word notes of each page, in order"""
+        if self.pagination.mode == 'cursor':
+            pages = self._iter_cursor_pages(params or {})
+        else:
+            pages = self._iter_numbered_pages(params or {})
+        async for notes in pages:
+            yield notes
+
+    @property
+    def paginated(self) -> bool:
+        return bool(self.pagination and self.pagination.enabled and self.format != 'csv')
+
     async def fetch_data(self, **kwargs) -> List[WordNote]:
-        """Fetch word notes from API"""
+        """Fetch word notes from API
+        
+        With a sync state, a notebook unchanged since the last committed
+        sync returns no notes and sets not_modified. Paginated fetches are
+        not conditional, as no single response covers the notebook.
+        """
         params = kwargs.get('params')
-        return await self._request("GET", params=params)
+        self.not_modified = False
+        with metrics.stage(self.__class__.__name__) as timer:
+            if self.paginated:
+                notes = []
+                async for page in self._iter_pages(params):
+                    notes.extend(page)
+            else:
+                notes = await self._request("GET", params=params)
+            timer.items = len(notes)
+        return notes
+
+    async def stream_data(self, **kwargs) -> AsyncIterator[WordNote]:
+        """Yield word notes from API as they arrive
+
+        In CSV format notes are parsed while the body downloads, so memory
+        holds a chunk and a record instead of the whole export, and
+        consumers can start before the download finishes. Unlike
+        fetch_data, a failed download is not retried, as notes before the
+        failure were already yielded. With pagination enabled, JSON notes
+        are yielded page by page while the next pages are fetched. Otherwise
+        they are fetched whole.
+        """
+        params = kwargs.get('params')
+        if self.paginated:
+            async for page in self._iter_pages(params):
+                for note in page:
+                    yield note
+            return
+        if self.format != 'csv':
+            for note in await self.fetch_data(params=params):
+                yield note
+            return
+
+        session = await self._get_session()
+        url = self.base_url.rstrip('/')
+        with metrics.stage(self.__class__.__name__) as timer:
+            async with session.request(
+                "GET",
+                url,
+                params=self._build_params(params),
+                headers=self._get_headers()
+            ) as response:
+                response.raise_for_status()
+                async for note in self._iter_csv(response):
+                    timer.items += 1
+                    yield note
 
     async def close(self):
         """Close the client session"""
@@ -0,0 +1,229 @@
+import bisect
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds, covering single lookups up to whole-run stages
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+
+class Histogram:
+    """Fixed-bucket histogram of durations"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Approximate a quantile by the upper bound of its bucket"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'max': round(self.max, 6)
+        }
+
+
+class StageStats:
+    """Counters and histograms for one pipeline stage"""
+
+    def __init__(self):
+        self.calls = 0
+        self.items = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.stage_latency = Histogram()
+        self.item_latency = Histogram()
+        self.queue_depth = 0
+        self.queue_depth_max = 0
+
+    def report(self) -> Dict[str, Any]:
+        data = {
+            'calls': self.calls,
+            'items': self.items,
+            'errors': self.errors,
+            'seconds': round(self.seconds, 6),
+            'items_per_sec': round(self.items / self.seconds, 3) if self.seconds else 0.0,
+            'stage_latency': self.stage_latency.summary(),
+            'item_latency': self.item_latency.summary()
+        }
+        if self.queue_depth_max:
+            data['queue_depth'] = {'last': self.queue_depth, 'max': self.queue_depth_max}
+        return data
+
+
+class StageTimer:
+    """Handle returned by MetricsRegistry.stage() to report item and error counts"""
+
+    def __init__(self):
+        self.items = 0
+        self.errors = 0
+
+
+class MetricsRegistry:
+    """Collects per-stage metrics for a run
+
+    Fetchers, middleware and exporters report wall time, item counts and
+    errors here. The collected data can be written as a JSON run report and
+    as a Prometheus textfile for the node exporter's textfile collector.
+    """
+
+    def __init__(self, prefix: str = 'doubao'):
+        self.prefix = prefix
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self.stages: Dict[str, StageStats] = {}
+
+    def _stage(self, name: str) -> StageStats:
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats()
+        return stats
+
+    def observe_stage(self, name: str, seconds: float, items: int = 0, errors: int = 0):
+        """Record one invocation of a stage"""
+        stats = self._stage(name)
+        stats.calls += 1
+        stats.items += items
+        stats.errors += errors
+        stats.seconds += seconds
+        stats.stage_latency.observe(seconds)
+
+    def observe_item(self, name: str, seconds: float):
+        """Record the time a single item spent in a stage"""
+        self._stage(name).item_latency.observe(seconds)
+
+    def set_queue_depth(self, name: str, depth: int):
+        """Record the number of items waiting in front of a stage"""
+        stats = self._stage(name)
+        stats.queue_depth = depth
+        stats.queue_depth_max = max(stats.queue_depth_max, depth)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageTimer]:
+        """Time a block as one invocation of a stage
+
+        Set ``items`` (and ``errors``) on the yielded timer; an exception
+        escaping the block counts as one error.
+        """
+        timer = StageTimer()
+        start = time.perf_counter()
+        try:
+            yield timer
+        except BaseException:
+            timer.errors += 1
+            raise
+        finally:
+            self.observe_stage(name, time.perf_counter() - start, timer.items, timer.errors)
+
+    def report(self) -> Dict[str, Any]:
+        """Build the JSON run report"""
+        return {
+            'started_at': self.started_at.isoformat(),
+            'duration_seconds': round(time.perf_counter() - self._started, 6),
+            'stages': {name: stats.report() for name, stats in self.stages.items()}
+        }
+
+    @staticmethod
+    def _atomic_write(path: str, content: str):
+        path = os.path.expanduser(path)
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def write_json(self, path: str):
+        """Write the run report as JSON"""
+        self._atomic_write(path, json.dumps(self.report(), ensure_ascii=False, indent=2))
+
+    def _histogram_lines(self, metric: str, label: str, histogram: Histogram) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append(f'{metric}_bucket{{{label},le="{bound}"}} {cumulative}')
+        lines.append(f'{metric}_bucket{{{label},le="+Inf"}} {histogram.count}')
+        lines.append(f'{metric}_sum{{{label}}} {histogram.sum}')
+        lines.append(f'{metric}_count{{{label}}} {histogram.count}')
+        return lines
+
+    def prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format"""
+        p = self.prefix
+        families = {
+            f'{p}_stage_duration_seconds': ('histogram', 'Wall time per stage invocation'),
+            f'{p}_item_duration_seconds': ('histogram', 'Wall time per item within a stage'),
+            f'{p}_stage_items_total': ('counter', 'Items processed by a stage'),
+            f'{p}_stage_errors_total': ('counter', 'Errors raised in a stage'),
+            f'{p}_stage_items_per_second': ('gauge', 'Stage throughput over the run'),
+            f'{p}_stage_queue_depth_max': ('gauge', 'Largest queue depth in front of a stage'),
+        }
+        samples: Dict[str, List[str]] = {name: [] for name in families}
+        for name, stats in self.stages.items():
+            label = 'stage="{}"'.format(name.replace('\\', '\\\\').replace('"', '\\"'))
+            samples[f'{p}_stage_duration_seconds'] += self._histogram_lines(
+                f'{p}_stage_duration_seconds', label, stats.stage_latency)
+            samples[f'{p}_item_duration_seconds'] += self._histogram_lines(
+                f'{p}_item_duration_seconds', label, stats.item_latency)
+            samples[f'{p}_stage_items_total'].append(f'{p}_stage_items_total{{{label}}} {stats.items}')
+            samples[f'{p}_stage_errors_total'].append(f'{p}_stage_errors_total{{{label}}} {stats.errors}')
+            throughput = stats.items / stats.seconds if stats.seconds else 0.0
+            samples[f'{p}_stage_items_per_second'].append(f'{p}_stage_items_per_second{{{label}}} {throughput}')
+            samples[f'{p}_stage_queue_depth_max'].append(
+                f'{p}_stage_queue_depth_max{{{label}}} {stats.queue_depth_max}')
+
+        lines = []
+        for name, (kind, help_text) in families.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            lines.extend(samples[name])
+        lines.append(f'# HELP {p}_run_duration_seconds Wall time of the whole run')
+        lines.append(f'# TYPE {p}_run_duration_seconds gauge')
+        lines.append(f'{p}_run_duration_seconds {time.perf_counter() - self._started}')
+        lines.append(f'# HELP {p}_run_timestamp_seconds Unix time the run started')
+        lines.append(f'# TYPE {p}_run_timestamp_seconds gauge')
+        lines.append(f'{p}_run_timestamp_seconds {self.started_at.timestamp()}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str):
+        """Write a Prometheus textfile atomically so the collector never sees partial output"""
+        self._atomic_write(path, self.prometheus())
+
+
+# Global metrics registry
+metrics = MetricsRegistry()
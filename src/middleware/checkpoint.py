@@ -0,0 +1,158 @@
+from collections import deque
+from typing import Any, AsyncIterator, List, Optional
+from ..core.interfaces import DataMiddleware
+from ..checkpoint import CheckpointStore
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Placeholder for an output the wrapped middleware has not produced yet
+_PENDING = object()
+
+
+async def _iterate(items: List[Any]) -> AsyncIterator[Any]:
+    for item in items:
+        yield item
+
+
+class CheckpointMiddleware(DataMiddleware):
+    """Middleware wrapper that records and restores another middleware's outputs
+
+    Input items are keyed by their ``word`` attribute, plus the content hash
+    for word notes. Words already recorded for the stage are restored from
+    the store instead of being processed again; items without a word always
+    go through the wrapped middleware. Outputs the middleware does not deem
+    checkpointable, e.g. notes whose lookup failed, are not recorded, so a
+    resumed run processes those words again.
+    """
+
+    def __init__(self, middleware: DataMiddleware, store: CheckpointStore, stage: str):
+        """Initialize checkpoint middleware
+
+        Args:
+            middleware: Middleware to wrap
+            store: Checkpoint store to record outputs in
+            stage: Unique stage name within the pipeline
+        """
+        self.middleware = middleware
+        self.store = store
+        self.stage = stage
+        self.restored = 0
+
+    @staticmethod
+    def _key(item: Any) -> Optional[str]:
+        word = getattr(item, 'word', None)
+        if word and hasattr(item, 'content_hash'):
+            # Outputs recorded for an older version of the word are not reused
+            return f"{word}:{item.content_hash()}"
+        return word
+
+    async def process(self, data: List[Any]) -> List[Any]:
+        """Process only the items whose output is not recorded yet
+
+        Args:
+            data: Input data to process
+
+        Returns:
+            Processed data, in input order when the wrapped middleware keeps
+            one output per input
+        """
+        keys = [self._key(item) for item in data]
+        restored = self.store.load(self.stage, [key for key in keys if key])
+        pending = [item for key, item in zip(keys, data) if key not in restored]
+        pending_keys = [key for key in keys if key not in restored]
+        self.restored += len(data) - len(pending)
+
+        if self.middleware.one_to_one:
+            # Record every output as it is produced, so an interrupted batch keeps its progress
+            results = []
+            async for result in self.middleware.process_stream(_iterate(pending)):
+                key = pending_keys[len(results)]
+                if key and self.middleware.checkpointable(result):
+                    self.store.save(self.stage, [(key, result)])
+                results.append(result)
+            new_results = iter(results)
+            return [restored[key] if key in restored else next(new_results) for key in keys]
+
+        results = await self.middleware.process(pending) if pending else []
+        if len(results) != len(pending):
+            # Outputs can't be matched to words when items were dropped
+            logger.warning(
+                f"{self.stage} returned {len(results)} items for {len(pending)} inputs, "
+                f"outputs not checkpointed"
+            )
+            return [restored[key] for key in keys if key in restored] + results
+
+        self.store.save(self.stage, [
+            (key, result) for key, result in zip(pending_keys, results)
+            if key and self.middleware.checkpointable(result)
+        ])
+        new_results = iter(results)
+        return [restored[key] if key in restored else next(new_results) for key in keys]
+
+    async def process_stream(self, data: AsyncIterator[Any], batch_size: int = 32) -> AsyncIterator[Any]:
+        """Process a stream, skipping items whose output is recorded
+
+        Middleware that declares ``one_to_one`` keeps its native streaming and
+        each output is recorded as it is produced. Restored items keep their
+        place in input order; while they wait behind items still being
+        processed, at most ``batch_size`` of them are held before the wrapped
+        stream is ended to flush its pending outputs, and a new one is started
+        for the rest of the input. Other middleware is run batch by batch.
+
+        Args:
+            data: Asynchronous iterator of input items
+            batch_size: Restored items held at once, and batch size for
+                middleware without native streaming
+
+        Yields:
+            Processed items in input order
+        """
+        if not self.middleware.one_to_one:
+            async for item in super().process_stream(data, batch_size=batch_size):
+                yield item
+            return
+
+        # (key, output) per input item in order, output is _PENDING until produced
+        entries = deque()
+        source = data.__aiter__()
+        held = 0
+        exhausted = False
+
+        async def segment() -> AsyncIterator[Any]:
+            nonlocal held, exhausted
+            while held < max(1, batch_size):
+                try:
+                    item = await source.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    return
+                key = self._key(item)
+                if key:
+                    restored = self.store.load(self.stage, [key])
+                    if key in restored:
+                        self.restored += 1
+                        entries.append((key, restored[key]))
+                        held += 1
+                        continue
+                entries.append((key, _PENDING))
+                yield item
+
+        def restored_ahead() -> List[Any]:
+            nonlocal held
+            ready = []
+            while entries and entries[0][1] is not _PENDING:
+                ready.append(entries.popleft()[1])
+            held -= len(ready)
+            return ready
+
+        while not exhausted:
+            async for result in self.middleware.process_stream(segment(), batch_size=batch_size):
+                for item in restored_ahead():
+                    yield item
+                key, _ = entries.popleft()
+                if key and self.middleware.checkpointable(result):
+                    self.store.save(self.stage, [(key, result)])
+                yield result
+            for item in restored_ahead():
+                yield item
@@ -1,4 +1,7 @@
-from typing import List, Dict, Any
+import asyncio
+import copy
+from collections import deque
+from typing import List, Dict, Any, Optional, AsyncIterator
 from ..core.interfaces import DataMiddleware
 from ..core.models import WordNote
 from ..services.dictionary_factory import DictionaryFactory
@@ -9,12 +12,15 @@ logger = logging.getLogger(__name__)
 class DictionaryEnhancementMiddleware(DataMiddleware):
     """Middleware to enrich word data with dictionary lookups"""
     
+    one_to_one = True
+    
     def __init__(
         self,
         dictionary_service: str = 'youdao',
         include_examples: bool = True,
         include_phonetic: bool = True,
-        include_collins: bool = True
+        include_collins: bool = True,
+        concurrency: int = 1
     ):
         """Initialize dictionary enhancement middleware
         
@@ -23,6 +29,7 @@ class DictionaryEnhancementMiddleware(DataMiddleware):
             include_examples: Whether to include example sentences
             include_phonetic: Whether to include phonetic notation
             include_collins: Whether to include Collins dictionary data
+            concurrency: Maximum number of lookups in flight at once
         """
         try:
             self.dictionary = DictionaryFactory.get_service(dictionary_service)
@@ -33,6 +40,9 @@ class DictionaryEnhancementMiddleware(DataMiddleware):
         self.include_examples = include_examples
         self.include_phonetic = include_phonetic
         self.include_collins = include_collins
+        self.concurrency = max(1, concurrency)
+        # Notes passed on unenriched after a failed lookup, by identity
+        self._failed: Dict[int, WordNote] = {}
 
     async def process(self, data: List[WordNote]) -> List[WordNote]:
         """Process word notes by adding dictionary data
@@ -43,35 +53,76 @@ class DictionaryEnhancementMiddleware(DataMiddleware):
         Returns:
             Enhanced word notes
         """
-        enhanced_notes = []
         total = len(data)
+        enhanced_notes: List[Optional[WordNote]] = [None] * total
+        pending = iter(enumerate(data))
         
-        for i, note in enumerate(data, 1):
-            try:
-                logger.info(f"Enhancing word {i}/{total}: {note.word}")
-                enhanced_note = await self._enhance_note(note)
-                enhanced_notes.append(enhanced_note)
-            except Exception as e:
-                logger.error(f"Error enhancing word {note.word}: {e}")
-                enhanced_notes.append(note)  # Keep original note on error
-                
+        async def worker():
+            # Workers share one iterator and write results back by index to keep order
+            for i, note in pending:
+                logger.info(f"Enhancing word {i + 1}/{total}: {note.word}")
+                enhanced_notes[i] = await self._enhance_safely(note)
+        
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, total))))
         return enhanced_notes
 
-    async def _enhance_note(self, note: WordNote) -> WordNote:
-        """Enhance a single word note with dictionary data"""
+    async def process_stream(self, data: AsyncIterator[WordNote], batch_size: int = 32) -> AsyncIterator[WordNote]:
+        """Enhance a stream of word notes
+        
+        Keeps up to ``concurrency`` lookups in flight as a sliding window
+        instead of waiting for whole batches, and yields notes in input order.
+        
+        Args:
+            data: Asynchronous iterator of word notes
+            batch_size: Unused, lookups are not batched
+            
+        Yields:
+            Enhanced word notes
+        """
+        window = deque()
         try:
-            details = await self.dictionary.lookup_word(note.word)
-            if details:
-                if self.include_phonetic:
-                    note.phonetic = details.phonetic
-                    
-                if self.include_examples:
-                    note.examples = details.examples
-                    
-                if self.include_collins:
-                    note.collins = details.collins
-                    
+            async for note in data:
+                logger.info(f"Enhancing word: {note.word}")
+                window.append(asyncio.ensure_future(self._enhance_safely(note)))
+                if len(window) >= self.concurrency:
+                    yield await window.popleft()
+            while window:
+                yield await window.popleft()
+        finally:
+            for task in window:
+                task.cancel()
+
+    def checkpointable(self, item: WordNote) -> bool:
+        """False for a note whose lookup failed, so a resumed run retries it"""
+        return self._failed.pop(id(item), None) is not item
+
+    async def _enhance_safely(self, note: WordNote) -> WordNote:
+        """Enhance a note, keeping the original note on error"""
+        try:
+            return await self._enhance_note(note)
         except Exception as e:
             logger.warning(f"Failed to get dictionary data for {note.word}: {e}")
+            self._failed[id(note)] = note
+            return note
+
+    async def _enhance_note(self, note: WordNote) -> WordNote:
+        """Enhance a single word note with dictionary data
+        
+        Raises:
+            Exception: If the lookup failed; a word the dictionary doesn't
+                know is not an error and returns the note unchanged
+        """
+        details = await self.dictionary.lookup_word(note.word)
+        if details:
+            # Enrich a copy: the fetched note keeps the content its hash was taken from
+            note = copy.copy(note)
+            if self.include_phonetic:
+                note.phonetic = details.phonetic
+                
+            if self.include_examples:
+                note.examples = details.examples
+                
+            if self.include_collins:
+                note.collins = details.collins
             
-        return note
\ No newline at end of file
+        return note
@@ -1,14 +1,58 @@
-from typing import List, Type
+import asyncio
+import time
+from collections import deque
+from typing import Any, AsyncIterable, AsyncIterator, Deque, Iterable, List, Optional, Tuple, Type, Union
 from ..core.interfaces import DataMiddleware
+from ..checkpoint import CheckpointStore
+from .checkpoint import CheckpointMiddleware
 from ..core.models import WordNote
+from ..metrics import metrics
 import logging
 logger = logging.getLogger(__name__)
 
+_DONE = object()
+
+
+class _StageFailure:
+    """Queue marker carrying an exception raised by an upstream stage"""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+async def _iterate(data: Union[Iterable[Any], AsyncIterable[Any]]) -> AsyncIterator[Any]:
+    """Iterate a plain or asynchronous iterable asynchronously"""
+    if hasattr(data, '__aiter__'):
+        async for item in data:
+            yield item
+    else:
+        for item in data:
+            yield item
+
+
+async def _drain(queue: asyncio.Queue) -> AsyncIterator[Any]:
+    """Yield items from a stage queue until the producer is done"""
+    while True:
+        item = await queue.get()
+        if item is _DONE:
+            return
+        if isinstance(item, _StageFailure):
+            raise item.error
+        yield item
+
+
 class MiddlewarePipeline:
     """Pipeline for processing data through multiple middleware components"""
     
-    def __init__(self):
+    def __init__(self, checkpoint: Optional[CheckpointStore] = None):
+        """Initialize pipeline
+        
+        Args:
+            checkpoint: Store recording each stage's output per word, so
+                that a rerun skips words that already completed a stage
+        """
         self.middlewares: List[DataMiddleware] = []
+        self.checkpoint = checkpoint
         
     def add_middleware(self, middleware: DataMiddleware) -> 'MiddlewarePipeline':
         """Add a middleware to the pipeline
@@ -21,6 +65,16 @@ class MiddlewarePipeline:
         """
         self.middlewares.append(middleware)
         return self
+
+    def _stages(self) -> List[Tuple[str, DataMiddleware]]:
+        """Middleware to run with their names, wrapped for checkpointing if enabled"""
+        stages = []
+        for index, middleware in enumerate(self.middlewares):
+            name = middleware.__class__.__name__
+            if self.checkpoint:
+                middleware = CheckpointMiddleware(middleware, self.checkpoint, f"{index}.{name}")
+            stages.append((name, middleware))
+        return stages
         
     async def process(self, data: List[WordNote]) -> List[WordNote]:
         """Process data through all registered middleware
@@ -33,12 +87,126 @@ class MiddlewarePipeline:
         """
         current_data = data
         
-        for middleware in self.middlewares:
+        for name, middleware in self._stages():
             try:
-                logger.debug(f"Processing through {middleware.__class__.__name__}")
-                current_data = await middleware.process(current_data)
+                logger.debug(f"Processing through {name}")
+                with metrics.stage(name) as timer:
+                    start = time.perf_counter()
+                    current_data = await middleware.process(current_data)
+                    timer.items = len(current_data)
+                # Batch stages only expose their total time, so items are
+                # charged an equal share of it
+                if current_data:
+                    per_item = (time.perf_counter() - start) / len(current_data)
+                    for _ in current_data:
+                        metrics.observe_item(name, per_item)
             except Exception as e:
-                logger.error(f"Error in middleware {middleware.__class__.__name__}: {e}")
+                logger.error(f"Error in middleware {name}: {e}")
                 raise
                 
-        return current_data
\ No newline at end of file
+        return current_data
+
+    async def _feed(self, queue: asyncio.Queue, name: str, entered: Deque[float]) -> AsyncIterator[Any]:
+        """Drain a stage's input queue, recording its depth and when items enter the stage"""
+        while True:
+            metrics.set_queue_depth(name, queue.qsize())
+            item = await queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _StageFailure):
+                raise item.error
+            entered.append(time.perf_counter())
+            yield item
+
+    async def _run_stage(
+        self,
+        stage: AsyncIterator[Any],
+        queue: asyncio.Queue,
+        name: str,
+        entered: Optional[Deque[float]] = None
+    ):
+        """Pump a stage's output into its queue, forwarding failures downstream"""
+        start = time.perf_counter()
+        items = 0
+        errors = 0
+        try:
+            async for item in stage:
+                if entered:
+                    # Stages keep input order, so the oldest entry belongs to this item
+                    metrics.observe_item(name, time.perf_counter() - entered.popleft())
+                items += 1
+                await queue.put(item)
+        except Exception as e:
+            if name:
+                logger.error(f"Error in middleware {name}: {e}")
+                errors = 1
+            await queue.put(_StageFailure(e))
+        else:
+            await queue.put(_DONE)
+        finally:
+            if name:
+                metrics.observe_stage(name, time.perf_counter() - start, items, errors)
+
+    async def stream(
+        self,
+        data: Union[Iterable[Any], AsyncIterable[Any]],
+        batch_size: int = 32,
+        queue_size: int = 64
+    ) -> AsyncIterator[Any]:
+        """Process data through all middleware as a stream
+        
+        Each middleware runs as its own task and stages are connected by
+        bounded queues, so a slow stage applies backpressure upstream and
+        items reach the consumer while later ones are still being processed.
+        
+        Args:
+            data: Input items, as a list or an asynchronous iterator
+            batch_size: Batch size for middleware without native streaming
+            queue_size: Maximum number of items buffered between two stages
+            
+        Yields:
+            Processed items in input order
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        tasks = [asyncio.ensure_future(self._run_stage(_iterate(data), queue, ''))]
+        
+        for name, middleware in self._stages():
+            logger.debug(f"Streaming through {name}")
+            next_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+            entered: Deque[float] = deque()
+            stage = middleware.process_stream(self._feed(queue, name, entered), batch_size=batch_size)
+            tasks.append(asyncio.ensure_future(self._run_stage(stage, next_queue, name, entered)))
+            queue = next_queue
+        
+        try:
+            async for item in _drain(queue):
+                yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def stream_batches(
+        self,
+        data: Union[Iterable[Any], AsyncIterable[Any]],
+        batch_size: int = 32,
+        queue_size: int = 64
+    ) -> AsyncIterator[List[Any]]:
+        """Stream processed items grouped into lists, e.g. for chunked export
+        
+        Args:
+            data: Input items, as a list or an asynchronous iterator
+            batch_size: Number of processed items per yielded list
+            queue_size: Maximum number of items buffered between two stages
+            
+        Yields:
+            Lists of at most batch_size processed items
+        """
+        batch = []
+        async for item in self.stream(data, batch_size=batch_size, queue_size=queue_size):
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
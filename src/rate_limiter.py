@@ -0,0 +1,155 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+import aiohttp
+import logging
+from .config import settings, RateLimitRule
+
+logger = logging.getLogger(__name__)
+
+# Status codes that mean "slow down" rather than "failed"
+THROTTLE_STATUSES = (429, 503)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date
+
+    Returns:
+        Delay in seconds, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """Token bucket that hands out evenly spaced request slots
+
+    Every caller reserves a token immediately and sleeps until its slot, so
+    waiters are released one by one at the configured rate instead of all
+    waking up together. A rate of None means unlimited, but the bucket still
+    honours pauses requested by the server.
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _reserve(self, now: float) -> float:
+        """Take a token and return how long to wait before using it"""
+        if self.rate is None:
+            return max(0.0, self.blocked_until - now)
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+        self.tokens -= 1
+        return max(0.0, self.updated - now) + max(0.0, -self.tokens / self.rate)
+
+    async def acquire(self):
+        """Wait until a request may be sent"""
+        while True:
+            delay = self._reserve(time.monotonic())
+            if delay > 0:
+                await asyncio.sleep(delay)
+            # A throttling response may have paused the host while we waited
+            if time.monotonic() >= self.blocked_until:
+                return
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for the given number of seconds"""
+        now = time.monotonic()
+        self.blocked_until = max(self.blocked_until, now + seconds)
+        if self.rate is not None:
+            # Restart from a single token once the pause is over
+            self.updated = max(self.updated, self.blocked_until)
+            self.tokens = min(self.tokens, 1.0)
+
+
+class RateLimiter:
+    """Per-host rate limiter shared by every outbound HTTP call"""
+
+    def __init__(
+        self,
+        hosts: Optional[Dict[str, RateLimitRule]] = None,
+        default: Optional[RateLimitRule] = None,
+        default_retry_after: float = 5.0
+    ):
+        """Initialize rate limiter
+
+        Args:
+            hosts: Rules keyed by host name; a rule also applies to subdomains
+            default: Rule for hosts without their own rule, None for unlimited
+            default_retry_after: Pause applied on 429/503 without a Retry-After header
+        """
+        self.hosts = {host.lower(): rule for host, rule in (hosts or {}).items()}
+        self.default = default
+        self.default_retry_after = default_retry_after
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    @classmethod
+    def from_settings(cls) -> 'RateLimiter':
+        config = settings.rate_limits
+        return cls(config.hosts, config.default, config.default_retry_after)
+
+    def _rule_for(self, host: str) -> Optional[RateLimitRule]:
+        parts = host.split('.')
+        for i in range(len(parts)):
+            rule = self.hosts.get('.'.join(parts[i:]))
+            if rule:
+                return rule
+        return self.default
+
+    def bucket(self, host: str) -> TokenBucket:
+        """Get the token bucket for a host"""
+        host = (host or '').lower()
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rule = self._rule_for(host)
+            bucket = self._buckets[host] = (
+                TokenBucket(rule.rate, rule.burst) if rule else TokenBucket()
+            )
+        return bucket
+
+    async def acquire(self, host: str):
+        """Wait for permission to send a request to a host"""
+        await self.bucket(host).acquire()
+
+    def penalize(self, host: str, retry_after: Optional[float] = None):
+        """Pause a host after it asked us to slow down"""
+        delay = retry_after if retry_after is not None else self.default_retry_after
+        logger.warning(f"Throttled by {host}, pausing requests for {delay:.1f}s")
+        self.bucket(host).pause(delay)
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """Trace config that applies the limiter to every request of a session"""
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            await self.acquire(params.url.host)
+
+        async def on_request_end(session, context, params):
+            if params.response.status in THROTTLE_STATUSES:
+                retry_after = parse_retry_after(params.response.headers.get('Retry-After'))
+                self.penalize(params.url.host, retry_after)
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_end.append(on_request_end)
+        return trace
+
+
+# Global rate limiter instance
+rate_limiter = RateLimiter.from_settings()
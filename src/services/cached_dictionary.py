@@ -0,0 +1,170 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from typing import Optional, List, Dict, Any
+import logging
+from .dictionary_base import DictionaryService, WordDetail
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LookupCache:
+    """Disk-backed cache of WordDetail results shared by all dictionary services
+
+    Entries are keyed by service name plus the normalized word and stored as
+    JSON in an SQLite database running in WAL mode. Entries expire after the
+    TTL, and the least recently used ones are evicted once the cache grows
+    past max_entries.
+    """
+
+    # Eviction is checked every this many writes rather than on each insert
+    EVICT_INTERVAL = 100
+
+    def __init__(self, path: str, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        """Initialize lookup cache
+
+        Args:
+            path: SQLite database file
+            ttl: Seconds before an entry expires, None to keep entries forever
+            max_entries: Maximum number of entries, None for no limit
+        """
+        self.path = os.path.expanduser(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS lookups ("
+            "key TEXT PRIMARY KEY, payload TEXT NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_lookups_accessed ON lookups (accessed_at)")
+
+    @classmethod
+    def from_settings(cls) -> 'LookupCache':
+        config = settings.lookup_cache
+        return cls(
+            path=os.path.join(os.path.expanduser(settings.cache.directory), config.file),
+            ttl=config.ttl_days * 86400 if config.ttl_days else None,
+            max_entries=config.max_entries
+        )
+
+    @staticmethod
+    def make_key(service: str, word: str) -> str:
+        return f"{service}:{word.strip().lower()}"
+
+    def get(self, service: str, word: str) -> Optional[WordDetail]:
+        """Return a cached result, or None on a miss or expired entry"""
+        key = self.make_key(service, word)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created_at FROM lookups WHERE key = ?", (key,)
+            ).fetchone()
+            if row and self.ttl is not None and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM lookups WHERE key = ?", (key,))
+                row = None
+            if not row:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE lookups SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return WordDetail(**json.loads(row[0]))
+
+    def put(self, service: str, word: str, detail: WordDetail):
+        """Store a lookup result"""
+        payload = json.dumps(asdict(detail), ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO lookups (key, payload, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (self.make_key(service, word), payload, now, now)
+            )
+            self._writes += 1
+            if self._writes % self.EVICT_INTERVAL == 0:
+                self._evict()
+
+    def _evict(self):
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM lookups WHERE created_at < ?", (time.time() - self.ttl,))
+        if self.max_entries:
+            count = self._conn.execute("SELECT COUNT(*) FROM lookups").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM lookups WHERE key IN "
+                    "(SELECT key FROM lookups ORDER BY accessed_at LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+
+    def evict(self):
+        """Drop expired entries and trim the cache to max_entries"""
+        with self._lock:
+            self._evict()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM lookups").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+            'entries': size
+        }
+
+    def wrap(self, name: str, service: DictionaryService) -> DictionaryService:
+        """Factory wrapper, see DictionaryFactory.register_wrapper"""
+        return CachedDictionaryService(service, self, name)
+
+    def close(self):
+        """Apply eviction and close the database"""
+        with self._lock:
+            self._evict()
+            self._conn.close()
+
+
+class CachedDictionaryService(DictionaryService):
+    """Dictionary service that consults a LookupCache before the wrapped service"""
+
+    def __init__(self, service: DictionaryService, cache: LookupCache, name: str):
+        self.service = service
+        self.cache = cache
+        self.name = name
+
+    def __getattr__(self, name: str):
+        # Expose attributes of the wrapped service, e.g. base_url
+        if name == 'service':
+            raise AttributeError(name)
+        return getattr(self.service, name)
+
+    async def lookup_word(self, word: str) -> Optional[WordDetail]:
+        """Look up a word, using the cache when possible"""
+        detail = self.cache.get(self.name, word)
+        if detail:
+            return detail
+
+        detail = await self.service.lookup_word(word)
+        if detail:
+            self.cache.put(self.name, word, detail)
+        return detail
+
+    async def get_examples(self, word: str) -> List[str]:
+        """Get example sentences from the cached lookup"""
+        detail = await self.lookup_word(word)
+        if detail and detail.examples:
+            return list(detail.examples)
+        return []
@@ -1,8 +1,9 @@
 from abc import ABC, abstractmethod
 from typing import Optional, Dict, Any
 from dataclasses import dataclass
+from ..core.models import DATACLASS_SLOTS
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class WordDetail:
     """Word details from dictionary"""
     word: str
@@ -1,4 +1,4 @@
-from typing import Dict, Type
+from typing import Callable, Dict, List, Type
 from .dictionary_base import DictionaryService
 from .youdao_dictionary import YoudaoDictionary
 from .renren_dictionary import RenRenDictionary
@@ -10,11 +10,15 @@ class DictionaryFactory:
         'renren': RenRenDictionary,
         'mdx': MdxDictionaryService
     }
+    _wrappers: List[Callable[[str, DictionaryService], DictionaryService]] = []
 
     @classmethod
     def get_service(cls, name: str) -> DictionaryService:
         """Get dictionary service by name
         
+        The service is passed through every registered wrapper, in
+        registration order, so the last wrapper ends up outermost.
+        
         Args:
             name: Name of the dictionary service
             
@@ -28,7 +32,10 @@ class DictionaryFactory:
         if not service_class:
             raise ValueError(f"Dictionary service '{name}' not found")
         
-        return service_class()
+        service = service_class()
+        for wrapper in cls._wrappers:
+            service = wrapper(name.lower(), service)
+        return service
 
     @classmethod
     def register_service(cls, name: str, service_class: Type[DictionaryService]):
@@ -38,4 +45,32 @@ class DictionaryFactory:
             name: Name for the service
             service_class: Class implementing DictionaryService
         """
-        cls._services[name.lower()] = service_class
\ No newline at end of file
+        cls._services[name.lower()] = service_class
+
+    @classmethod
+    def register_wrapper(cls, wrapper: Callable[[str, DictionaryService], DictionaryService]):
+        """Register a wrapper applied to every service created by the factory
+        
+        Args:
+            wrapper: Callable taking the service name and instance and
+                returning the service to use in its place
+        """
+        cls._wrappers.append(wrapper)
+
+    @classmethod
+    def unregister_wrapper(cls, wrapper: Callable[[str, DictionaryService], DictionaryService]):
+        """Remove a wrapper registered with register_wrapper, if present
+        
+        Services created before keep their wrappers; only later calls to
+        get_service are affected.
+        
+        Args:
+            wrapper: The wrapper that was registered
+        """
+        if wrapper in cls._wrappers:
+            cls._wrappers.remove(wrapper)
+
+    @classmethod
+    def clear_wrappers(cls):
+        """Remove all registered wrappers"""
+        cls._wrappers.clear()
\ No newline at end of file
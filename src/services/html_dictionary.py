@@ -0,0 +1,107 @@
+from abc import abstractmethod
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Optional, Dict, List
+import logging
+from .dictionary_base import DictionaryService, WordDetail
+from ..config import settings
+from ..session_manager import SessionManager
+from ..rate_limiter import THROTTLE_STATUSES
+
+logger = logging.getLogger(__name__)
+
+
+class HtmlDictionaryService(DictionaryService):
+    """Base class for dictionaries scraped from one HTML page per word
+
+    The page is downloaded once and parsed once into a WordDetail holding the
+    phonetic, definition, examples and Collins data. Recently parsed pages are
+    kept so that get_examples() after lookup_word() does not hit the network
+    again.
+    """
+
+    page_cache_size: int = 128
+    max_examples: int = 5
+
+    def __init__(self):
+        self.headers = {
+            "User-Agent": settings.http.headers.user_agent,
+            "Accept": "text/html,application/xhtml+xml,application/xml"
+        }
+        self._pages: 'OrderedDict[str, Optional[WordDetail]]' = OrderedDict()
+
+    @abstractmethod
+    def _page_url(self, word: str) -> str:
+        """Build the URL of the page describing a word"""
+        pass
+
+    @abstractmethod
+    def _parse_page(self, word: str, html: str) -> Optional[WordDetail]:
+        """Parse a downloaded page
+
+        Args:
+            word: The word that was looked up
+            html: Page content
+
+        Returns:
+            WordDetail if the page describes the word, None otherwise
+        """
+        pass
+
+    async def _fetch_page(self, word: str) -> str:
+        """Download the page for a word
+        
+        Throttled responses are retried; the rate limiter holds the retry
+        back until the host's Retry-After has passed.
+        """
+        session = await SessionManager.get_session()
+        attempts = max(1, settings.http.max_retries)
+        for attempt in range(1, attempts + 1):
+            async with session.get(self._page_url(word), headers=self.headers) as response:
+                if response.status in THROTTLE_STATUSES and attempt < attempts:
+                    continue
+                response.raise_for_status()
+                return await response.text()
+
+    async def _get_page(self, word: str) -> Optional[WordDetail]:
+        """Return the parsed page for a word, fetching it at most once"""
+        if word in self._pages:
+            self._pages.move_to_end(word)
+            return self._pages[word]
+
+        html = await self._fetch_page(word)
+        detail = self._parse_page(word, html)
+
+        self._pages[word] = detail
+        while len(self._pages) > self.page_cache_size:
+            self._pages.popitem(last=False)
+        return detail
+
+    async def lookup_word(self, word: str) -> Optional[WordDetail]:
+        """Look up a word, parsing its page once
+
+        Returns:
+            WordDetail if found, None if the page says the word is unknown
+
+        Raises:
+            Exception: If the page could not be fetched, e.g. a network error
+                or throttling that outlasted the retries. Unlike None, this
+                must not be remembered as "not found".
+        """
+        try:
+            detail = await self._get_page(word)
+        except Exception as e:
+            logger.error(f"Error looking up word in {self.__class__.__name__}: {e}")
+            raise
+        return replace(detail) if detail else None
+
+    async def get_examples(self, word: str) -> List[str]:
+        """Get example sentences, reusing the parsed page when available"""
+        try:
+            detail = await self._get_page(word)
+        except Exception as e:
+            logger.error(f"Error getting examples from {self.__class__.__name__}: {e}")
+            return []
+        if not detail or not detail.examples:
+            return []
+        return list(detail.examples[:self.max_examples])
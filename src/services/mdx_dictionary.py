@@ -1,17 +1,398 @@
-from typing import Optional
+from typing import Optional, Dict, Iterable, Iterator, Tuple, List
+from array import array
+from collections import OrderedDict
 import asyncio
+import bisect
+import hashlib
+import os
+import re
+import struct
+import threading
+import zlib
 from pathlib import Path
-from pyglossary.glossary import Glossary
 from .dictionary_base import DictionaryService, WordDetail
+from .mdx_index import MdxKeyIndex, SOURCE_EMBEDDED, SOURCE_MDX
+from ..config import settings
 import logging
 from bs4 import BeautifulSoup
 
+try:
+    import lzo
+except ImportError:  # 只有 LZO 压缩的词典才需要
+    lzo = None
+
 logger = logging.getLogger(__name__)
 
+def _entry_keys(entry) -> list[str]:
+    """Return the headword and all variants of a glossary entry"""
+    keys = []
+    if getattr(entry, 's_word', None):
+        keys.append(entry.s_word)
+    l_word = getattr(entry, 'l_word', None)
+    if isinstance(l_word, (list, tuple)):
+        keys.extend(l_word)
+    elif isinstance(l_word, str):
+        keys.append(l_word)
+    return keys
+
+def build_key_index(entries: Iterable) -> Dict[str, Tuple[str, str]]:
+    """Build a normalized lookup index over glossary entries
+    
+    Every headword and ``l_word`` variant is lowercased and mapped to the
+    original key and its definition. The first entry wins on collisions,
+    matching the order a linear scan would have found.
+    
+    Args:
+        entries: Iterable of glossary entries with ``s_word``/``l_word``/``defi``
+        
+    Returns:
+        Dictionary mapping lowercased keys to (key, definition) tuples
+    """
+    index: Dict[str, Tuple[str, str]] = {}
+    for entry in entries:
+        if not hasattr(entry, 'defi'):  # 跳过无效条目
+            continue
+        for key in _entry_keys(entry):
+            if key:
+                index.setdefault(key.lower(), (key, entry.defi))
+    return index
+
+class MdxFormatError(Exception):
+    """Raised when an MDX file cannot be read by the native reader"""
+    pass
+
+def _rol(x: int, n: int) -> int:
+    return ((x << n) | (x >> (32 - n))) & 0xffffffff
+
+_RMD_R = [
+    0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15,
+    7, 4, 13, 1, 10, 6, 15, 3, 12, 0, 9, 5, 2, 14, 11, 8,
+    3, 10, 14, 4, 9, 15, 8, 1, 2, 7, 0, 6, 13, 11, 5, 12,
+    1, 9, 11, 10, 0, 8, 12, 4, 13, 3, 7, 15, 14, 5, 6, 2,
+]
+_RMD_RP = [
+    5, 14, 7, 0, 9, 2, 11, 4, 13, 6, 15, 8, 1, 10, 3, 12,
+    6, 11, 3, 7, 0, 13, 5, 10, 14, 15, 8, 12, 4, 9, 1, 2,
+    15, 5, 1, 3, 7, 14, 6, 9, 11, 8, 12, 2, 10, 0, 4, 13,
+    8, 6, 4, 1, 3, 11, 15, 0, 5, 12, 2, 13, 9, 7, 10, 14,
+]
+_RMD_S = [
+    11, 14, 15, 12, 5, 8, 7, 9, 11, 13, 14, 15, 6, 7, 9, 8,
+    7, 6, 8, 13, 11, 9, 7, 15, 7, 12, 15, 9, 11, 7, 13, 12,
+    11, 13, 6, 7, 14, 9, 13, 15, 14, 8, 13, 6, 5, 12, 7, 5,
+    11, 12, 14, 15, 14, 15, 9, 8, 9, 14, 5, 6, 8, 6, 5, 12,
+]
+_RMD_SP = [
+    8, 9, 9, 11, 13, 15, 15, 5, 7, 7, 8, 11, 14, 14, 12, 6,
+    9, 13, 15, 7, 12, 8, 9, 11, 7, 7, 12, 7, 6, 15, 13, 11,
+    9, 7, 15, 11, 8, 6, 6, 14, 12, 13, 5, 14, 13, 13, 7, 5,
+    15, 5, 8, 11, 14, 14, 6, 14, 6, 9, 12, 9, 12, 5, 15, 8,
+]
+_RMD_K = [0x00000000, 0x5a827999, 0x6ed9eba1, 0x8f1bbcdc]
+_RMD_KP = [0x50a28be6, 0x5c4dd124, 0x6d703ef3, 0x00000000]
+
+def _rmd_f(j: int, x: int, y: int, z: int) -> int:
+    if j == 0:
+        return x ^ y ^ z
+    if j == 1:
+        return (x & y) | (~x & z)
+    if j == 2:
+        return (x | ~y & 0xffffffff) ^ z
+    return (x & z) | (y & ~z & 0xffffffff)
+
+def ripemd128(message: bytes) -> bytes:
+    """RIPEMD-128 digest, used to derive the MDX key-info decryption key
+    
+    hashlib does not ship RIPEMD-128, so this is a small pure Python version.
+    It only ever hashes 8 bytes per dictionary.
+    """
+    h = [0x67452301, 0xefcdab89, 0x98badcfe, 0x10325476]
+    length = len(message)
+    message = message + b'\x80' + b'\x00' * ((55 - length) % 64) + struct.pack('<Q', length * 8)
+    for offset in range(0, len(message), 64):
+        x = struct.unpack('<16I', message[offset:offset + 64])
+        a, b, c, d = h
+        ap, bp, cp, dp = h
+        for j in range(64):
+            rnd = j // 16
+            t = _rol((a + _rmd_f(rnd, b, c, d) + x[_RMD_R[j]] + _RMD_K[rnd]) & 0xffffffff, _RMD_S[j])
+            a, d, c, b = d, c, b, t
+            t = _rol((ap + _rmd_f(3 - rnd, bp, cp, dp) + x[_RMD_RP[j]] + _RMD_KP[rnd]) & 0xffffffff, _RMD_SP[j])
+            ap, dp, cp, bp = dp, cp, bp, t
+        t = (h[1] + c + dp) & 0xffffffff
+        h[1] = (h[2] + d + ap) & 0xffffffff
+        h[2] = (h[3] + a + bp) & 0xffffffff
+        h[3] = (h[0] + b + cp) & 0xffffffff
+        h[0] = t
+    return struct.pack('<4I', *h)
+
+def _mdx_key_info_key(block: bytes) -> bytes:
+    return ripemd128(block[4:8] + struct.pack('<L', 0x3695))
+
+def _mdx_decrypt(block: bytes) -> bytes:
+    """Decrypt an encrypted key-block info section (Encrypted="2")"""
+    key = _mdx_key_info_key(block)
+    data = bytearray(block[8:])
+    previous = 0x36
+    for i, value in enumerate(data):
+        t = ((value >> 4) | (value << 4)) & 0xff
+        data[i] = t ^ previous ^ (i & 0xff) ^ key[i % len(key)]
+        previous = value
+    return block[:8] + bytes(data)
+
+class MdxReader:
+    """Random-access reader for MDX dictionaries
+    
+    Only the header, key-block index and record-block index are parsed up
+    front. Record blocks are read and decompressed on demand and kept in a
+    bounded LRU, so memory follows the working set instead of the file size.
+    """
+    
+    def __init__(self, path: str, cache_blocks: int = 64):
+        """Open an MDX file
+        
+        Args:
+            path: Path to the .mdx file
+            cache_blocks: Number of decompressed record blocks to keep
+            
+        Raises:
+            MdxFormatError: If the file uses a layout this reader does not support
+        """
+        self.path = str(path)
+        self.cache_blocks = cache_blocks
+        self._file = open(self.path, 'rb')
+        self._lock = threading.Lock()
+        self._blocks: 'OrderedDict[int, bytes]' = OrderedDict()
+        try:
+            self._read_header()
+            self._read_key_section()
+            self._read_record_section()
+        except (struct.error, zlib.error, ValueError, IndexError, OverflowError) as e:
+            self._file.close()
+            raise MdxFormatError(f"Malformed MDX file {self.path}: {e}") from e
+        except MdxFormatError:
+            self._file.close()
+            raise
+
+    def _read_header(self):
+        f = self._file
+        header_size = struct.unpack('>I', f.read(4))[0]
+        header = f.read(header_size)
+        f.read(4)  # adler32 校验和
+        text = header[:-2].decode('utf-16-le', errors='ignore')
+        attrs = dict(re.findall(r'(\w+)="(.*?)"', text, re.DOTALL))
+        
+        self.version = float(attrs.get('GeneratedByEngineVersion', '2.0') or 2.0)
+        if self.version >= 3.0:
+            raise MdxFormatError(f"MDX engine version {self.version} is not supported")
+        
+        encrypted = attrs.get('Encrypted', '0')
+        if encrypted == 'Yes':
+            self.encrypted = 1
+        elif encrypted.isdigit():
+            self.encrypted = int(encrypted)
+        else:
+            self.encrypted = 0
+        if self.encrypted & 1:
+            raise MdxFormatError("MDX record headers are encrypted and need a registration code")
+        
+        encoding = (attrs.get('Encoding') or 'UTF-8').upper()
+        if encoding in ('GBK', 'GB2312'):
+            encoding = 'GB18030'
+        elif encoding in ('UTF-16', 'UTF16'):
+            encoding = 'UTF-16-LE'
+        self.encoding = encoding
+        
+        if self.version >= 2.0:
+            self._number_width, self._number_format = 8, '>Q'
+        else:
+            self._number_width, self._number_format = 4, '>I'
+        self._key_section_offset = f.tell()
+
+    def _read_number(self, data: bytes, offset: int) -> int:
+        return struct.unpack_from(self._number_format, data, offset)[0]
+
+    def _decompress(self, block: bytes, size: int = 0) -> bytes:
+        kind = block[:4]
+        if kind == b'\x00\x00\x00\x00':
+            return block[8:]
+        if kind == b'\x02\x00\x00\x00':
+            return zlib.decompress(block[8:])
+        if kind == b'\x01\x00\x00\x00':
+            if lzo is None:
+                raise MdxFormatError("LZO-compressed MDX requires the python-lzo package")
+            return lzo.decompress(block[8:], False, size)
+        raise MdxFormatError(f"Unknown MDX block compression {kind!r}")
+
+    def _read_key_section(self):
+        f = self._file
+        f.seek(self._key_section_offset)
+        width = self._number_width
+        if self.version >= 2.0:
+            header = f.read(width * 5)
+            f.read(4)  # adler32 校验和
+            num_blocks, self.num_entries, _, info_size, blocks_size = (
+                self._read_number(header, i * width) for i in range(5)
+            )
+        else:
+            header = f.read(width * 4)
+            num_blocks, self.num_entries, info_size, blocks_size = (
+                self._read_number(header, i * width) for i in range(4)
+            )
+        
+        info = f.read(info_size)
+        if self.version >= 2.0:
+            if self.encrypted & 2:
+                info = _mdx_decrypt(info)
+            info = self._decompress(info)
+        self._key_blocks = self._parse_key_block_info(info)
+        if len(self._key_blocks) != num_blocks:
+            raise MdxFormatError("MDX key block count does not match its index")
+        
+        self._key_blocks_offset = f.tell()
+        self._record_section_offset = self._key_blocks_offset + blocks_size
+
+    def _parse_key_block_info(self, info: bytes) -> List[Tuple[int, int]]:
+        """Return (compressed size, decompressed size) for every key block"""
+        blocks = []
+        width = self._number_width
+        if self.version >= 2.0:
+            size_format, size_width, term = '>H', 2, 1
+        else:
+            size_format, size_width, term = '>B', 1, 0
+        char_width = 2 if self.encoding.startswith('UTF-16') else 1
+        
+        i = 0
+        while i < len(info):
+            i += width  # 本块词条数
+            for _ in range(2):  # 首尾词条文本
+                text_size = struct.unpack_from(size_format, info, i)[0]
+                i += size_width + (text_size + term) * char_width
+            compressed = self._read_number(info, i)
+            decompressed = self._read_number(info, i + width)
+            i += width * 2
+            blocks.append((compressed, decompressed))
+        return blocks
+
+    def iter_keys(self) -> Iterator[Tuple[int, str]]:
+        """Iterate (record offset, key) pairs one key block at a time"""
+        if self.encoding.startswith('UTF-16'):
+            delimiter, char_width = b'\x00\x00', 2
+        else:
+            delimiter, char_width = b'\x00', 1
+        width = self._number_width
+        
+        offset = self._key_blocks_offset
+        for compressed, decompressed in self._key_blocks:
+            with self._lock:
+                self._file.seek(offset)
+                raw = self._file.read(compressed)
+            offset += compressed
+            block = self._decompress(raw, decompressed)
+            
+            i = 0
+            while i < len(block):
+                key_id = self._read_number(block, i)
+                start = end = i + width
+                while end < len(block):
+                    if block[end:end + char_width] == delimiter:
+                        break
+                    end += char_width
+                text = block[start:end].decode(self.encoding, errors='ignore').strip()
+                yield key_id, text
+                i = end + char_width
+
+    def _read_record_section(self):
+        f = self._file
+        f.seek(self._record_section_offset)
+        width = self._number_width
+        header = f.read(width * 4)
+        num_blocks = self._read_number(header, 0)
+        info = f.read(num_blocks * width * 2)
+        
+        # 每个记录块在文件中的位置及其解压后在记录流中的起点
+        self._record_file_offsets = array('Q')
+        self._record_starts = array('Q')
+        self._record_sizes = array('Q')
+        file_offset = f.tell()
+        start = 0
+        for i in range(num_blocks):
+            compressed = self._read_number(info, i * width * 2)
+            decompressed = self._read_number(info, i * width * 2 + width)
+            self._record_file_offsets.append(file_offset)
+            self._record_starts.append(start)
+            self._record_sizes.append(compressed)
+            file_offset += compressed
+            start += decompressed
+        self.records_size = start
+
+    def _record_block(self, index: int) -> bytes:
+        with self._lock:
+            block = self._blocks.get(index)
+            if block is not None:
+                self._blocks.move_to_end(index)
+                return block
+            self._file.seek(self._record_file_offsets[index])
+            raw = self._file.read(self._record_sizes[index])
+        
+        next_start = (self._record_starts[index + 1]
+                      if index + 1 < len(self._record_starts) else self.records_size)
+        block = self._decompress(raw, next_start - self._record_starts[index])
+        
+        with self._lock:
+            self._blocks[index] = block
+            self._blocks.move_to_end(index)
+            while len(self._blocks) > self.cache_blocks:
+                self._blocks.popitem(last=False)
+        return block
+
+    def read_record(self, offset: int, length: int) -> str:
+        """Read a record from the decompressed record stream
+        
+        Args:
+            offset: Offset of the record, as stored in the key block
+            length: Length of the record in bytes
+            
+        Returns:
+            Decoded record text
+        """
+        chunks = []
+        end = offset + length
+        index = bisect.bisect_right(self._record_starts, offset) - 1
+        while offset < end and 0 <= index < len(self._record_starts):
+            block = self._record_block(index)
+            start = offset - self._record_starts[index]
+            chunk = block[start:start + end - offset]
+            if not chunk:
+                break
+            chunks.append(chunk)
+            offset += len(chunk)
+            index += 1
+        return b''.join(chunks).decode(self.encoding, errors='ignore').strip('\x00').strip()
+
+    def index_entries(self) -> List[Tuple[str, str, int, int]]:
+        """Collect (normalized key, key, record offset, record length) for every key"""
+        keys = list(self.iter_keys())
+        boundaries = sorted({key_id for key_id, _ in keys})
+        boundaries.append(self.records_size)
+        entries = []
+        for key_id, key in keys:
+            if not key:
+                continue
+            end = boundaries[bisect.bisect_right(boundaries, key_id)]
+            entries.append((key.lower(), key, key_id, end - key_id))
+        return entries
+
+    def close(self):
+        """Close the underlying file"""
+        self._file.close()
+        self._blocks.clear()
+
 class MdxDictionaryService(DictionaryService):
     """Service for querying local MDX dictionary files"""
     
     _mdx_path: str = None
+    record_cache_blocks: int = 64
     
     @classmethod
     def set_mdx_path(cls, path: str):
@@ -26,22 +407,104 @@ class MdxDictionaryService(DictionaryService):
         self.mdx_path = Path(self._mdx_path)
         if not self.mdx_path.exists():
             raise FileNotFoundError(f"MDX file not found: {self._mdx_path}")
-            
+        
+        # 原生读取器按需解压记录块；不支持的格式退回 PyGlossary
+        try:
+            self._reader: Optional[MdxReader] = MdxReader(
+                str(self.mdx_path), cache_blocks=self.record_cache_blocks
+            )
+        except MdxFormatError as e:
+            logger.warning(f"Native MDX reader unavailable, falling back to PyGlossary: {e}")
+            self._reader = None
+        
+        # 优先使用已有的索引文件，只有索引缺失或过期时才解析整个词典
+        self._index = self._open_index()
+        
+        logger.info(
+            f"Successfully loaded MDX dictionary: {self._mdx_path} "
+            f"({len(self._index)} keys indexed in {self._index.path})"
+        )
+
+    def _index_paths(self) -> List[str]:
+        """Candidate index locations: next to the .mdx file, then the cache directory"""
+        mdx_path = str(self.mdx_path.resolve())
+        digest = hashlib.sha1(mdx_path.encode('utf-8')).hexdigest()[:16]
+        cache_dir = os.path.expanduser(settings.cache.directory)
+        return [
+            f"{mdx_path}.idx",
+            os.path.join(cache_dir, 'mdx_index', f"{self.mdx_path.stem}-{digest}.idx")
+        ]
+
+    def _open_index(self) -> MdxKeyIndex:
+        """Open a valid sidecar index, building it first if necessary"""
+        paths = self._index_paths()
+        for path in paths:
+            index = MdxKeyIndex.open(path, str(self.mdx_path))
+            if index and (index.source == SOURCE_EMBEDDED or self._reader):
+                return index
+            if index:
+                index.close()
+
+        if self._reader:
+            logger.info(f"Building MDX index for {self._mdx_path}")
+            source, entries, data = SOURCE_MDX, self._reader.index_entries(), []
+        else:
+            source = SOURCE_EMBEDDED
+            entries, data = self._build_embedded_index()
+        for path in paths:
+            try:
+                MdxKeyIndex.write(path, str(self.mdx_path), entries, source, data)
+            except OSError as e:
+                logger.warning(f"Cannot write MDX index to {path}: {e}")
+                continue
+            index = MdxKeyIndex.open(path, str(self.mdx_path))
+            if index:
+                return index
+
+        raise RuntimeError(f"Failed to build an index for MDX file: {self._mdx_path}")
+
+    def _load_glossary(self):
+        """Load the whole dictionary through PyGlossary"""
+        from pyglossary.glossary import Glossary
+        
         # 初始化 PyGlossary
         Glossary.init()
-        self.glos = Glossary()
-        self.glos.config = {
+        glos = Glossary()
+        glos.config = {
             'lower': True,
             'skip_resources': True,
             'html': True,
         }
         
         # 加载词典文件
-        success = self.glos.read(str(self._mdx_path))
+        success = glos.read(str(self._mdx_path))
         if not success:
             raise RuntimeError(f"Failed to load MDX file: {self._mdx_path}")
+        return glos
+
+    def _build_embedded_index(self) -> Tuple[List[Tuple[str, str, int, int]], List[bytes]]:
+        """Build index entries with the definitions embedded in the index file
         
-        logger.info(f"Successfully loaded MDX dictionary: {self._mdx_path}")
+        Returns:
+            Tuple of (index entries, definition chunks)
+        """
+        logger.info(f"Building MDX index for {self._mdx_path}")
+        key_index = build_key_index(self._load_glossary())
+        
+        entries = []
+        data = []
+        offsets: Dict[int, Tuple[int, int]] = {}
+        position = 0
+        for key, (headword, defi) in key_index.items():
+            # 同一词条的多个变体共享同一份释义
+            location = offsets.get(id(defi))
+            if location is None:
+                encoded = defi.encode('utf-8')
+                location = offsets[id(defi)] = (position, len(encoded))
+                data.append(encoded)
+                position += len(encoded)
+            entries.append((key, headword, location[0], location[1]))
+        return entries, data
 
     def _parse_definition(self, raw_def: str) -> tuple[Optional[str], Optional[str], list[str], dict]:
         """Parse the raw definition to extract structured information
@@ -151,33 +614,31 @@ class MdxDictionaryService(DictionaryService):
             Tuple of (word, definition) if found, None otherwise
         """
         try:
-            word = word.lower()
-            # 直接遍历词典条目
-            for entry in self.glos:
-                if not hasattr(entry, 'defi'):  # 跳过无效条目
-                    continue
-                    
-                # 检查主词条
-                if hasattr(entry, 's_word') and entry.s_word and entry.s_word.lower() == word:
-                    return entry.s_word, entry.defi
-                
-                # 检查词条变体
-                if hasattr(entry, 'l_word') and entry.l_word:
-                    # 如果是列表，检查每个变体
-                    if isinstance(entry.l_word, (list, tuple)):
-                        for variant in entry.l_word:
-                            if variant.lower() == word:
-                                return variant, entry.defi
-                    # 如果是字符串，直接检查
-                    elif isinstance(entry.l_word, str) and entry.l_word.lower() == word:
-                        return entry.l_word, entry.defi
-            
-            return None
+            hit = self._index.lookup(word.lower())
+            if not hit:
+                return None
+            headword, offset, length = hit
+            return headword, self._read_record(offset, length)
             
         except Exception as e:
             logger.error(f"Error looking up word '{word}': {e}")
             return None
 
+    def _read_record(self, offset: int, length: int, max_links: int = 5) -> str:
+        """Read a definition, following MDX ``@@@LINK=`` redirects"""
+        if self._index.source == SOURCE_EMBEDDED:
+            return self._index.read_embedded(offset, length)
+        
+        record = self._reader.read_record(offset, length)
+        for _ in range(max_links):
+            if not record.startswith('@@@LINK='):
+                break
+            target = self._index.lookup(record[len('@@@LINK='):].strip().lower())
+            if not target:
+                break
+            record = self._reader.read_record(target[1], target[2])
+        return record
+
     async def get_examples(self, word: str) -> list[str]:
         """Get example sentences for a word"""
         result = await self.lookup_word(word)
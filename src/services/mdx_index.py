@@ -0,0 +1,187 @@
+import mmap
+import os
+import struct
+import tempfile
+from typing import Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 索引文件结构: header | entry table | keys blob | data blob
+_MAGIC = b'DWMDXIDX'
+_VERSION = 1
+_HEADER = struct.Struct('<8sIIQQQQQ')  # magic, version, source, mdx size, mdx mtime, count, keys offset, data offset
+_ENTRY = struct.Struct('<QHHQI')  # key offset, key length, headword length, record offset, record length
+
+SOURCE_EMBEDDED = 0
+"""Records are stored in the data section of the index file itself"""
+
+SOURCE_MDX = 1
+"""Records are offsets into the decompressed record stream of the .mdx file"""
+
+IndexEntry = Tuple[str, str, int, int]
+
+
+class MdxKeyIndex:
+    """Sorted, memory-mapped key index stored next to an MDX dictionary
+
+    The file holds a fixed-width entry table sorted by the UTF-8 bytes of the
+    normalized (lowercased) key, so lookups are a binary search over the
+    mapping and nothing is read into memory until a page is touched.
+    """
+
+    def __init__(self, path: str, fileobj, mm: mmap.mmap):
+        self.path = path
+        self._file = fileobj
+        self._mm = mm
+        (_, _, self.source, _, _, self.count,
+         self._keys_offset, self._data_offset) = _HEADER.unpack_from(mm, 0)
+        self._table_offset = _HEADER.size
+
+    @staticmethod
+    def _mdx_stamp(mdx_path: str) -> Tuple[int, int]:
+        stat = os.stat(mdx_path)
+        return stat.st_size, stat.st_mtime_ns
+
+    @classmethod
+    def open(cls, path: str, mdx_path: str) -> Optional['MdxKeyIndex']:
+        """Open an index if it exists and still matches the MDX file
+
+        Args:
+            path: Path of the index file
+            mdx_path: Path of the dictionary the index was built from
+
+        Returns:
+            MdxKeyIndex if the index is present and valid, None otherwise
+        """
+        if not os.path.exists(path):
+            return None
+
+        try:
+            f = open(path, 'rb')
+        except OSError as e:
+            logger.warning(f"Cannot open MDX index {path}: {e}")
+            return None
+
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            f.close()
+            logger.warning(f"Cannot map MDX index {path}: {e}")
+            return None
+
+        if len(mm) < _HEADER.size:
+            mm.close()
+            f.close()
+            return None
+
+        magic, version, _, size, mtime, _, _, _ = _HEADER.unpack_from(mm, 0)
+        if magic != _MAGIC or version != _VERSION or (size, mtime) != cls._mdx_stamp(mdx_path):
+            logger.info(f"MDX index {path} is stale, rebuilding")
+            mm.close()
+            f.close()
+            return None
+
+        return cls(path, f, mm)
+
+    @classmethod
+    def write(
+        cls,
+        path: str,
+        mdx_path: str,
+        entries: List[IndexEntry],
+        source: int = SOURCE_MDX,
+        data: Iterable[bytes] = ()
+    ) -> None:
+        """Write an index file atomically
+
+        Args:
+            path: Destination path of the index file
+            mdx_path: Dictionary the index describes, used for invalidation
+            entries: (key, headword, record offset, record length) tuples;
+                keys must already be normalized
+            source: SOURCE_MDX or SOURCE_EMBEDDED
+            data: Record payload chunks for SOURCE_EMBEDDED indexes, whose
+                record offsets are relative to the start of this data
+        """
+        # 按键稳定排序，重复的键只保留输入顺序中的第一个
+        encoded = sorted(
+            ((key.encode('utf-8'), headword.encode('utf-8'), offset, length)
+             for key, headword, offset, length in entries),
+            key=lambda e: e[0]
+        )
+        unique = []
+        for item in encoded:
+            if not unique or unique[-1][0] != item[0]:
+                unique.append(item)
+
+        size, mtime = cls._mdx_stamp(mdx_path)
+        keys_offset = _HEADER.size + _ENTRY.size * len(unique)
+        keys_size = sum(len(k) + len(h) for k, h, _, _ in unique)
+        data_offset = keys_offset + keys_size
+
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_HEADER.pack(
+                    _MAGIC, _VERSION, source, size, mtime,
+                    len(unique), keys_offset, data_offset
+                ))
+                position = keys_offset
+                for key, headword, offset, length in unique:
+                    f.write(_ENTRY.pack(position, len(key), len(headword), offset, length))
+                    position += len(key) + len(headword)
+                for key, headword, _, _ in unique:
+                    f.write(key)
+                    f.write(headword)
+                for chunk in data:
+                    f.write(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def _entry(self, i: int) -> Tuple[int, int, int, int, int]:
+        return _ENTRY.unpack_from(self._mm, self._table_offset + i * _ENTRY.size)
+
+    def lookup(self, key: str) -> Optional[Tuple[str, int, int]]:
+        """Find a normalized key
+
+        Args:
+            key: Lowercased key to look up
+
+        Returns:
+            Tuple of (headword, record offset, record length) if found, None otherwise
+        """
+        target = key.encode('utf-8')
+        mm = self._mm
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key_offset, key_len, head_len, offset, length = self._entry(mid)
+            current = mm[key_offset:key_offset + key_len]
+            if current < target:
+                lo = mid + 1
+            elif current > target:
+                hi = mid
+            else:
+                start = key_offset + key_len
+                headword = mm[start:start + head_len].decode('utf-8')
+                return headword, offset, length
+        return None
+
+    def read_embedded(self, offset: int, length: int) -> str:
+        """Read a record stored in the data section of the index"""
+        start = self._data_offset + offset
+        return self._mm[start:start + length].decode('utf-8')
+
+    def close(self):
+        """Unmap and close the index file"""
+        self._mm.close()
+        self._file.close()
+
+    def __len__(self) -> int:
+        return self.count
@@ -0,0 +1,149 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Any
+import logging
+from .dictionary_base import DictionaryService, WordDetail
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+MemoKey = Tuple[str, str]
+
+
+class LookupMemo:
+    """In-process LRU of lookup results shared by every wrapped service
+
+    Concurrent lookups of the same word share one in-flight request
+    (singleflight), and "not found" results are remembered for a shorter
+    time so that empty pages are not fetched over and over.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        ttl: Optional[float] = None,
+        negative_ttl: Optional[float] = 600
+    ):
+        """Initialize lookup memo
+
+        Args:
+            max_entries: Maximum number of remembered results
+            ttl: Seconds to remember found words, None for the whole run
+            negative_ttl: Seconds to remember missing words, 0 to disable
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries: 'OrderedDict[MemoKey, Tuple[Optional[float], Optional[WordDetail]]]' = OrderedDict()
+        self._in_flight: Dict[MemoKey, asyncio.Future] = {}
+
+    @classmethod
+    def from_settings(cls) -> 'LookupMemo':
+        config = settings.lookup_memo
+        return cls(config.max_entries, config.ttl, config.negative_ttl)
+
+    def _remember(self, key: MemoKey, detail: Optional[WordDetail]):
+        # Only results are remembered; failed lookups raise and are retried next time
+        ttl = self.ttl if detail else self.negative_ttl
+        if ttl == 0:
+            return
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._entries[key] = (expires_at, detail)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def lookup(
+        self,
+        service: str,
+        word: str,
+        loader: Callable[[str], Awaitable[Optional[WordDetail]]]
+    ) -> Optional[WordDetail]:
+        """Return a remembered result, or load it once for all concurrent callers
+
+        Args:
+            service: Name of the dictionary service
+            word: The word to look up
+            loader: Coroutine function performing the real lookup
+
+        Returns:
+            WordDetail if found, None otherwise
+        """
+        key = (service, word.strip().lower())
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, detail = entry
+            if expires_at is None or expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return replace(detail) if detail else None
+            del self._entries[key]
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            detail = await asyncio.shield(future)
+            return replace(detail) if detail else None
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            detail = await loader(word)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Waiters re-raise it; don't log it as unretrieved
+            raise
+        else:
+            self._remember(key, detail)
+            future.set_result(detail)
+            return detail
+        finally:
+            del self._in_flight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/coalesced counters and current size"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'entries': len(self._entries)
+        }
+
+    def wrap(self, name: str, service: DictionaryService) -> DictionaryService:
+        """Factory wrapper, see DictionaryFactory.register_wrapper"""
+        return MemoizedDictionaryService(service, self, name)
+
+
+class MemoizedDictionaryService(DictionaryService):
+    """Dictionary service that deduplicates lookups through a LookupMemo"""
+
+    def __init__(self, service: DictionaryService, memo: LookupMemo, name: str):
+        self.service = service
+        self.memo = memo
+        self.name = name
+
+    def __getattr__(self, name: str):
+        # Expose attributes of the wrapped service, e.g. base_url
+        if name == 'service':
+            raise AttributeError(name)
+        return getattr(self.service, name)
+
+    async def lookup_word(self, word: str) -> Optional[WordDetail]:
+        """Look up a word, sharing results and in-flight requests"""
+        return await self.memo.lookup(self.name, word, self.service.lookup_word)
+
+    async def get_examples(self, word: str) -> List[str]:
+        """Get example sentences from the memoized lookup"""
+        detail = await self.lookup_word(word)
+        if detail and detail.examples:
+            return list(detail.examples)
+        return []
@@ -1,61 +1,54 @@
-import aiohttp
 import re
-from typing import Optional, List
-from .dictionary_base import DictionaryService, WordDetail
+from typing import Optional
+from .dictionary_base import WordDetail
+from .html_dictionary import HtmlDictionaryService
 from ..config import settings
 
-class YoudaoDictionary(DictionaryService):
+class YoudaoDictionary(HtmlDictionaryService):
     def __init__(self):
+        super().__init__()
         self.base_url = settings.api.dictionaries.youdao.endpoint
-        self.headers = {
-            "User-Agent": settings.http.headers.user_agent,
-            "Accept": "text/html,application/xhtml+xml,application/xml"
-        }
 
-    async def lookup_word(self, word: str) -> Optional[WordDetail]:
-        """Look up a word in Youdao Dictionary using simple string parsing"""
-        url = f"{self.base_url}/{word}/#keyfrom={settings.api.dictionaries.collins.keyfrom}"
+    def _page_url(self, word: str) -> str:
+        return f"{self.base_url}/{word}/#keyfrom={settings.api.dictionaries.collins.keyfrom}"
+
+    def _parse_page(self, word: str, html: str) -> Optional[WordDetail]:
+        """Parse a Youdao page using simple string parsing"""
+        # Extract phonetic using regex
+        phonetic = None
+        phonetic_match = re.search(r'<span class="phonetic">\[(.*?)\]</span>', html)
+        if phonetic_match:
+            phonetic = phonetic_match.group(1)
+        
+        # Extract basic definition
+        definition = None
+        trans_match = re.search(r'<div class="trans-container">(.*?)</div>', html, re.DOTALL)
+        if trans_match:
+            # Extract definitions from li elements
+            defs = re.findall(r'<li>(.*?)</li>', trans_match.group(1))
+            definition = '\n'.join([d.strip() for d in defs if d.strip()])
+        
+        # Extract examples
+        example_matches = re.findall(r'<p class="example-sentences">(.*?)</p>', html)
+        examples = [e.strip() for e in example_matches if e.strip()][:self.max_examples]
         
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=self.headers) as response:
-                    response.raise_for_status()
-                    html = await response.text()
-                    
-                    # Extract phonetic using regex
-                    phonetic = None
-                    phonetic_match = re.search(r'<span class="phonetic">\[(.*?)\]</span>', html)
-                    if phonetic_match:
-                        phonetic = phonetic_match.group(1)
-                    
-                    # Extract basic definition
-                    definition = None
-                    trans_match = re.search(r'<div class="trans-container">(.*?)</div>', html, re.DOTALL)
-                    if trans_match:
-                        # Extract definitions from li elements
-                        defs = re.findall(r'<li>(.*?)</li>', trans_match.group(1))
-                        definition = '\n'.join([d.strip() for d in defs if d.strip()])
-                    
-                    # Extract examples
-                    examples = await self.get_examples(word)
-                    
-                    # Extract Collins data if available
-                    collins_data = None
-                    collins_section = re.search(r'<div id="authTrans".*?>(.*?)</div>', html, re.DOTALL)
-                    if collins_section:
-                        collins_data = self._parse_collins_data(collins_section.group(1))
-                    
-                    return WordDetail(
-                        word=word,
-                        phonetic=phonetic,
-                        definition=definition,
-                        examples=examples,
-                        collins=collins_data
-                    )
-                    
-        except Exception as e:
-            print(f"Error looking up word in Youdao: {e}")
+        # Extract Collins data if available
+        collins_data = None
+        collins_section = re.search(r'<div id="authTrans".*?>(.*?)</div>', html, re.DOTALL)
+        if collins_section:
+            collins_data = self._parse_collins_data(collins_section.group(1))
+        
+        # Youdao answers unknown words with an empty page rather than an error
+        if not (phonetic or definition or examples or collins_data):
             return None
+        
+        return WordDetail(
+            word=word,
+            phonetic=phonetic,
+            definition=definition,
+            examples=examples,
+            collins=collins_data
+        )
 
     def _parse_collins_data(self, collins_html: str) -> dict:
         """Parse Collins dictionary section using regex"""
@@ -77,23 +70,3 @@ class YoudaoDictionary(DictionaryService):
             })
         
         return result
-
-    async def get_examples(self, word: str) -> List[str]:
-        """Get example sentences from Youdao using regex"""
-        url = f"{self.base_url}/{word}"
-        examples = []
-        
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=self.headers) as response:
-                    response.raise_for_status()
-                    html = await response.text()
-                    
-                    # Extract examples using regex
-                    example_matches = re.findall(r'<p class="example-sentences">(.*?)</p>', html)
-                    examples = [e.strip() for e in example_matches if e.strip()]
-                            
-        except Exception as e:
-            print(f"Error getting examples from Youdao: {e}")
-            
-        return examples[:5]  # Return up to 5 examples
\ No newline at end of file
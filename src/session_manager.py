@@ -0,0 +1,106 @@
+import asyncio
+import weakref
+from dataclasses import dataclass, asdict
+from typing import Dict, Any
+import aiohttp
+import logging
+from .config import settings
+from .rate_limiter import rate_limiter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ConnectionStats:
+    """Counters describing how well pooled connections are reused"""
+    requests: int = 0
+    connections_created: int = 0
+    connections_reused: int = 0
+
+    @property
+    def reuse_ratio(self) -> float:
+        """Share of connection acquisitions served by a keep-alive connection"""
+        total = self.connections_created + self.connections_reused
+        return self.connections_reused / total if total else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['reuse_ratio'] = round(self.reuse_ratio, 4)
+        return data
+
+
+class SessionManager:
+    """Process-wide registry of pooled aiohttp sessions
+
+    Dictionary services and exporters borrow sessions from here instead of
+    opening a new ClientSession per call, so TCP/TLS connections and DNS
+    results are reused across requests. Every request also passes through
+    the per-host rate limiter. Sessions are bound to the event loop
+    that created them and must be released with close_all() on shutdown.
+    """
+
+    _sessions: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, aiohttp.ClientSession]]' = (
+        weakref.WeakKeyDictionary()
+    )
+    stats = ConnectionStats()
+
+    @classmethod
+    def _trace_config(cls) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            cls.stats.requests += 1
+
+        async def on_connection_create_end(session, context, params):
+            cls.stats.connections_created += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            cls.stats.connections_reused += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace
+
+    @classmethod
+    def _create_session(cls) -> aiohttp.ClientSession:
+        pool = settings.http.pool
+        connector = aiohttp.TCPConnector(
+            limit=pool.limit,
+            limit_per_host=pool.limit_per_host,
+            ttl_dns_cache=pool.dns_cache_ttl,
+            keepalive_timeout=pool.keepalive_timeout
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=settings.http.timeout),
+            trace_configs=[cls._trace_config(), rate_limiter.trace_config()]
+        )
+
+    @classmethod
+    async def get_session(cls, name: str = 'default') -> aiohttp.ClientSession:
+        """Borrow the shared session for the running event loop
+
+        Args:
+            name: Pool name, for callers that need an isolated pool
+
+        Returns:
+            Shared aiohttp session; callers must not close it
+        """
+        loop = asyncio.get_running_loop()
+        sessions = cls._sessions.setdefault(loop, {})
+        session = sessions.get(name)
+        if session is None or session.closed:
+            session = sessions[name] = cls._create_session()
+        return session
+
+    @classmethod
+    async def close_all(cls):
+        """Close every session owned by the running event loop"""
+        loop = asyncio.get_running_loop()
+        sessions = cls._sessions.pop(loop, {})
+        for session in sessions.values():
+            if not session.closed:
+                await session.close()
+        if sessions:
+            logger.debug(f"Closed {len(sessions)} pooled session(s): {cls.stats.as_dict()}")
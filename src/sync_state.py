@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, Optional
+import logging
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SyncState:
+    """Remembers what the last successful sync downloaded
+
+    For each request (URL and query parameters) the ETag and Last-Modified
+    validators and a digest of the body are kept, so the next run can send
+    a conditional request and recognize an unchanged notebook even when the
+    server ignores it. Values seen during a run are only staged; they are
+    written by commit() once the run has exported everything, so a failed
+    run is never taken as synced.
+    """
+
+    def __init__(self, state_file: str):
+        """Initialize sync state
+
+        Args:
+            state_file: JSON file holding the state between runs
+        """
+        self.state_file = os.path.expanduser(state_file)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    @classmethod
+    def from_settings(cls) -> 'SyncState':
+        return cls(os.path.join(os.path.expanduser(settings.cache.directory), settings.sync.file))
+
+    def _load(self):
+        if not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable sync state {self.state_file}: {e}")
+
+    @staticmethod
+    def key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Identify a request by its URL and query parameters"""
+        query = '&'.join(f"{name}={value}" for name, value in sorted((params or {}).items()))
+        return f"{url}?{query}" if query else url
+
+    @staticmethod
+    def digest(body: bytes) -> str:
+        return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+    @staticmethod
+    def hasher() -> Any:
+        """Incremental form of digest(), for bodies read in chunks"""
+        return hashlib.blake2b(digest_size=16)
+
+    def conditional_headers(self, key: str) -> Dict[str, str]:
+        """Headers making the request conditional on a change since the last sync"""
+        entry = self.entries.get(key, {})
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def unchanged(self, key: str, digest: str) -> bool:
+        """Whether the body is the one the last sync processed"""
+        return self.entries.get(key, {}).get('digest') == digest
+
+    def stage(self, key: str, etag: Optional[str], last_modified: Optional[str], digest: str):
+        """Remember a downloaded response until the run is committed"""
+        self.pending[key] = {
+            'etag': etag,
+            'last_modified': last_modified,
+            'digest': digest,
+            'synced_at': datetime.now().isoformat()
+        }
+
+    def commit(self):
+        """Record the staged responses as synced and write the state atomically"""
+        if not self.pending:
+            return
+        self.entries.update(self.pending)
+        self.pending = {}
+        directory = os.path.dirname(self.state_file) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.state_file)
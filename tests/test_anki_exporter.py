@@ -0,0 +1,189 @@
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from src.exporters.anki_exporter import AnkiExporter
+from src.exporters.anki_preflight import AnkiPreflight
+from src.session_manager import SessionManager
+
+
+class FakeAnkiConnect:
+    """In-memory AnkiConnect supporting the actions used by the exporter"""
+
+    def __init__(self):
+        self.notes = {}
+        self.next_id = 1
+        self.requests = []
+
+    def add_note(self, deck, fields):
+        if not fields.get('Front'):
+            raise ValueError('cannot create note because it is empty')
+        if any(n['deck'] == deck and n['fields'].get('Front') == fields['Front'] for n in self.notes.values()):
+            raise ValueError('cannot create note because it is a duplicate')
+        note_id = self.next_id
+        self.next_id += 1
+        self.notes[note_id] = {'deck': deck, 'fields': dict(fields)}
+        return note_id
+
+    def run(self, action, params):
+        if action == 'createDeck':
+            return 1
+        if action == 'multi':
+            results = []
+            for sub in params['actions']:
+                try:
+                    results.append({'result': self.run(sub['action'], sub.get('params', {})), 'error': None})
+                except Exception as e:
+                    results.append({'result': None, 'error': str(e)})
+            return results
+        if action == 'addNotes':
+            # Like current AnkiConnect: valid notes are added, then the call fails
+            results, errors = [], []
+            for n in params['notes']:
+                try:
+                    results.append(self.add_note(n['deckName'], n['fields']))
+                except ValueError as e:
+                    results.append(None)
+                    errors.append(str(e))
+            if errors:
+                raise ValueError(str(errors))
+            return results
+        if action == 'addNote':
+            return self.add_note(params['note']['deckName'], params['note']['fields'])
+        if action == 'modelFieldNames':
+            return ['Front', 'Back']
+        if action == 'canAddNotes':
+            return [bool(n['fields'].get('Front')) and not any(
+                m['fields'].get('Front') == n['fields']['Front'] for m in self.notes.values()
+            ) for n in params['notes']]
+        if action == 'findNotes' and params['query'].startswith('"note:'):
+            return list(self.notes)
+        if action == 'findNotes':
+            deck_part, field_part = params['query'].split('" "')
+            deck = deck_part.strip('"')[len('deck:'):].replace('\\', '')
+            field, value = field_part.strip('"').replace('\\:', '\0').split(':', 1)
+            value = value.replace('\0', ':').replace('\\', '')
+            return [i for i, n in self.notes.items()
+                    if n['deck'] == deck and n['fields'].get(field) == value]
+        if action == 'notesInfo':
+            return [{'noteId': i, 'fields': {k: {'value': v, 'order': n}
+                                              for n, (k, v) in enumerate(self.notes[i]['fields'].items())}}
+                    if i in self.notes else {} for i in params['notes']]
+        if action == 'updateNoteFields':
+            note = params['note']
+            if note['id'] not in self.notes:
+                raise ValueError('note was not found')
+            self.notes[note['id']]['fields'].update(note['fields'])
+            return None
+        raise ValueError(f'unsupported action {action}')
+
+    async def handle(self, request):
+        body = await request.json()
+        self.requests.append(body['action'])
+        if body['action'] == 'multi':
+            self.requests[-1] = [a['action'] for a in body['params']['actions']]
+        try:
+            return web.json_response({'result': self.run(body['action'], body.get('params', {})), 'error': None})
+        except Exception as e:
+            return web.json_response({'result': None, 'error': str(e)})
+
+
+@pytest_asyncio.fixture
+async def anki():
+    fake = FakeAnkiConnect()
+    app = web.Application()
+    app.router.add_post('/', fake.handle)
+    server = TestServer(app)
+    await server.start_server()
+    fake.url = str(server.make_url('/'))
+    yield fake
+    await SessionManager.close_all()
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_update_notes_in_place(anki):
+    existing = anki.add_note('Vocab', {'Front': 'a:b', 'Back': 'old'})
+    exporter = AnkiExporter(anki_connect_url=anki.url)
+
+    assert await exporter.update_notes(
+        [{'Front': 'a:b', 'Back': 'new'}, {'Front': 'pear', 'Back': 'fruit'}],
+        deck_name='Vocab', model_name='Basic', key_field='Front'
+    )
+    assert anki.notes[existing]['fields']['Back'] == 'new'
+    # Notes missing from Anki are added instead
+    assert [n['fields']['Front'] for n in anki.notes.values()] == ['a:b', 'pear']
+    assert anki.requests == [['findNotes', 'findNotes'], 'notesInfo', ['updateNoteFields'], ['createDeck', 'addNote']]
+
+
+@pytest.mark.asyncio
+async def test_upsert_only_sends_changed_fields(anki):
+    same = anki.add_note('Vocab', {'Front': 'apple', 'Back': 'fruit'})
+    edited = anki.add_note('Vocab', {'Front': 'pear', 'Back': 'old', 'Phonetic': '/per/'})
+    exporter = AnkiExporter(anki_connect_url=anki.url)
+    updates = []
+    run = anki.run
+    anki.run = lambda action, params: (updates.append(params) if action == 'updateNoteFields' else None) or run(action, params)
+
+    result = await exporter.upsert_notes(
+        [{'Front': 'apple', 'Back': 'fruit'}, {'Front': 'pear', 'Back': 'new', 'Phonetic': '/per/'},
+         {'Front': 'kiwi', 'Back': 'fruit'}],
+        deck_name='Vocab', model_name='Basic', key_field='Front'
+    )
+    assert (result.unchanged, result.updated, result.added) == ([0], [1], [2])
+    assert result.note_ids[:2] == [same, edited]
+    assert updates == [{'note': {'id': edited, 'fields': {'Back': 'new'}}}]
+    assert result.success and result.stored == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_upsert_needs_the_key_field(anki):
+    exporter = AnkiExporter(anki_connect_url=anki.url)
+    with pytest.raises(ValueError):
+        await exporter.upsert_notes([{'Front': 'apple'}], deck_name='Vocab', model_name='Basic')
+
+    # A note whose key field was dropped, e.g. mapped from None, is not guessed at
+    result = await exporter.upsert_notes(
+        [{'Back': 'fruit'}, {'Front': 'pear', 'Back': 'fruit'}],
+        deck_name='Vocab', model_name='Basic', key_field='Front'
+    )
+    assert result.failed == [0] and result.added == [1]
+    assert [n['fields'] for n in anki.notes.values()] == [{'Front': 'pear', 'Back': 'fruit'}]
+
+
+@pytest.mark.asyncio
+async def test_add_notes_in_chunks_reports_each_note(anki):
+    anki.add_note('Vocab', {'Front': 'w3'})
+    exporter = AnkiExporter(anki_connect_url=anki.url)
+    notes = [{'Front': f"w{i}"} for i in range(7)] + [{'Front': ''}]
+
+    result = await exporter.add_notes(notes, deck_name='Vocab', model_name='Basic', chunk_size=3)
+    assert anki.requests == [['createDeck'] + ['addNote'] * 3, ['addNote'] * 3, ['addNote'] * 2]
+    assert result.duplicates == [3]
+    assert result.failed == [7]
+    assert result.stored == list(range(7))
+    assert not result.success
+    assert result.added == [0, 1, 2, 4, 5, 6]
+
+
+@pytest.mark.asyncio
+async def test_preflight_remembers_results_until_notes_change(anki, tmp_path):
+    anki.add_note('Vocab', {'Front': 'apple'})
+    exporter = AnkiExporter(anki_connect_url=anki.url)
+    cache_file = str(tmp_path / 'preflight.json')
+
+    preflight = AnkiPreflight(exporter, cache_file, 'Vocab', 'Basic', 'Front')
+    assert await preflight.existing_words(['apple', 'pear']) == {'apple'}
+    result = await exporter.add_notes([{'Front': 'pear'}], deck_name='Vocab', model_name='Basic')
+    preflight.record_added(['pear'], result.note_ids)
+    preflight.save()
+
+    anki.requests.clear()
+    rerun = AnkiPreflight(exporter, cache_file, 'Vocab', 'Basic', 'Front')
+    assert await rerun.existing_words(['apple', 'pear']) == {'apple', 'pear'}
+    assert 'canAddNotes' not in anki.requests
+
+    # A note added in Anki itself invalidates the remembered results
+    anki.add_note('Vocab', {'Front': 'kiwi'})
+    assert await rerun.existing_words(['kiwi']) == {'kiwi'}
+    assert 'canAddNotes' in anki.requests
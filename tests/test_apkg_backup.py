@@ -0,0 +1,73 @@
+import json
+import os
+import sqlite3
+import zipfile
+from src.core.models import WordNote
+from src.exporters.anki_exporter import AnkiExporter
+from src.exporters.apkg_backup import ApkgBackup
+from src.exporters.apkg_writer import stable_deck_id, word_guid
+
+
+def words_and_notes(entries, source_lang='en'):
+    words = [WordNote(source_lang=source_lang, target_lang='zh', word=w, translate=t) for w, t in entries]
+    notes = [{'Front': w, 'Back': t} for w, t in entries]
+    return words, notes
+
+
+def read_notes(path, tmp_path):
+    with zipfile.ZipFile(path) as package:
+        collection = package.extract('collection.anki2', tmp_path / 'extracted')
+    conn = sqlite3.connect(collection)
+    try:
+        rows = conn.execute("SELECT guid, flds FROM notes ORDER BY id").fetchall()
+        decks = json.loads(conn.execute("SELECT decks FROM col").fetchone()[0])
+    finally:
+        conn.close()
+    os.remove(collection)
+    return {guid: flds.split('\x1f')[:2] for guid, flds in rows}, decks
+
+
+def test_stable_ids():
+    assert stable_deck_id('Vocab') == stable_deck_id('Vocab') != stable_deck_id('Other')
+    assert (1 << 30) <= stable_deck_id('Vocab') < (1 << 31)
+    assert word_guid('en', 'zh', 'apple') != word_guid('fr', 'zh', 'apple')
+
+
+def test_delta_chain_and_reconstruct(tmp_path):
+    backup = ApkgBackup(str(tmp_path / 'backups'), AnkiExporter().model, 'Vocab')
+
+    words, notes = words_and_notes([('apple', '苹果'), ('pear', '梨')])
+    base = backup.backup(notes, words, 'Front')
+    # Nothing changed, nothing to write
+    assert backup.backup(notes, words, 'Front') is None
+
+    words, notes = words_and_notes([('apple', '苹果 (fruit)'), ('pear', '梨'), ('plum', '李子')])
+    delta = backup.backup(notes, words, 'Front')
+    delta_notes, decks = read_notes(delta, tmp_path)
+    assert sorted(fields[0] for fields in delta_notes.values()) == ['apple', 'plum']
+    assert word_guid('en', 'zh', 'apple') in delta_notes
+    assert str(stable_deck_id('Vocab')) in decks
+
+    manifest = backup.load_manifest()
+    assert [(p['kind'], p['notes']) for p in manifest['packages']] == [('base', 2), ('delta', 2)]
+    assert [p['file'] for p in manifest['packages']] == [os.path.basename(base), os.path.basename(delta)]
+
+    full = tmp_path / 'full.apkg'
+    assert backup.reconstruct(str(full)) == 3
+    full_notes, _ = read_notes(full, tmp_path)
+    assert sorted(full_notes.values()) == [['apple', '苹果 (fruit)'], ['pear', '梨'], ['plum', '李子']]
+    assert full_notes[word_guid('en', 'zh', 'pear')] == ['pear', '梨']
+    backup.close()
+
+    # State survives a restart
+    backup = ApkgBackup(str(tmp_path / 'backups'), AnkiExporter().model, 'Vocab')
+    assert backup.backup(notes, words, 'Front') is None
+    backup.close()
+
+
+def test_full_mode_writes_every_note(tmp_path):
+    backup = ApkgBackup(str(tmp_path), AnkiExporter().model, 'Vocab', mode='full')
+    words, notes = words_and_notes([('apple', '苹果')])
+    first = backup.backup(notes, words, 'Front')
+    assert read_notes(first, tmp_path)[0] == {word_guid('en', 'zh', 'apple'): ['apple', '苹果']}
+    assert not os.path.exists(backup.manifest_path)
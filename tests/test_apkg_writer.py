@@ -0,0 +1,77 @@
+import json
+import sqlite3
+import zipfile
+import genanki
+import pytest
+from src.exporters.anki_exporter import AnkiExporter
+from src.exporters.apkg_writer import ApkgWriter, field_checksum
+
+
+def read_collection(path, tmp_path):
+    with zipfile.ZipFile(path) as package:
+        assert json.loads(package.read('media')) == {}
+        package.extract('collection.anki2', tmp_path / 'extracted')
+    return sqlite3.connect(tmp_path / 'extracted' / 'collection.anki2')
+
+
+def sample_notes(count):
+    return [
+        {'Front': f'word{i}', 'Back': f'meaning {i}', 'Phonetic': '/w/', 'Examples': '', 'Collins': ''}
+        for i in range(count)
+    ]
+
+
+def test_writes_notes_and_cards(tmp_path):
+    exporter = AnkiExporter()
+    writer = ApkgWriter(exporter.model, 2059400110, 'Vocab')
+    writer.CHUNK_SIZE = 7
+    notes = sample_notes(20) + [{'Front': '', 'Back': 'no card without a front'}]
+    assert writer.write(iter(notes), str(tmp_path / 'out.apkg')) == 21
+
+    conn = read_collection(tmp_path / 'out.apkg', tmp_path)
+    assert conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0] == 21
+    assert conn.execute("SELECT COUNT(*) FROM cards").fetchone()[0] == 20
+    decks, models = conn.execute("SELECT decks, models FROM col").fetchone()
+    assert json.loads(decks)['2059400110']['name'] == 'Vocab'
+    assert json.loads(models)['1607392319']['name'] == 'Doubao Vocabulary'
+
+    flds, guid, csum = conn.execute("SELECT flds, guid, csum FROM notes WHERE sfld = 'word3'").fetchone()
+    assert flds.split('\x1f') == ['word3', 'meaning 3', '/w/', '', '']
+    assert guid == genanki.Note(model=exporter.model, fields=flds.split('\x1f')).guid
+    assert csum == field_checksum('word3')
+    ids = [row[0] for row in conn.execute("SELECT id FROM notes UNION ALL SELECT id FROM cards")]
+    assert len(set(ids)) == len(ids)
+    conn.close()
+
+
+def test_matches_genanki_collection(tmp_path):
+    exporter = AnkiExporter()
+    notes = sample_notes(5)
+    ApkgWriter(exporter.model, 1, 'Vocab').write(notes, str(tmp_path / 'bulk.apkg'), timestamp=1000)
+    deck = genanki.Deck(1, 'Vocab')
+    for note in notes:
+        deck.add_note(genanki.Note(model=exporter.model, fields=list(note.values())))
+    genanki.Package(deck).write_to_file(str(tmp_path / 'genanki.apkg'), timestamp=1000)
+
+    query = "SELECT id, guid, mid, mod, tags, flds, sfld FROM notes ORDER BY id"
+    bulk = read_collection(tmp_path / 'bulk.apkg', tmp_path).execute(query).fetchall()
+    reference = read_collection(tmp_path / 'genanki.apkg', tmp_path).execute(query).fetchall()
+    assert [row[1:] for row in bulk] == [row[1:] for row in reference]
+
+
+def test_failed_write_leaves_no_file(tmp_path):
+    def notes():
+        yield from sample_notes(3)
+        raise RuntimeError('source failed')
+
+    writer = ApkgWriter(AnkiExporter().model, 1, 'Vocab')
+    with pytest.raises(RuntimeError):
+        writer.write(notes(), str(tmp_path / 'out.apkg'))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_export_to_apkg_reports_success(tmp_path):
+    exporter = AnkiExporter()
+    path = tmp_path / 'deck.apkg'
+    assert exporter.export_to_apkg(sample_notes(3), str(path), 'Vocab') is True
+    assert read_collection(path, tmp_path).execute("SELECT COUNT(*) FROM notes").fetchone()[0] == 3
@@ -0,0 +1,57 @@
+from src.bloom_filter import BloomFilter, optimal_parameters
+from src.cache_manager import CacheManager
+from src.core.models import WordNote
+
+
+def test_optimal_parameters():
+    bits, hashes = optimal_parameters(1_000_000, 0.01)
+    assert bits % 8 == 0
+    # Blocked filters need more bits per item than the classic 9.6
+    assert 9_600_000 < bits < 13_000_000
+    assert hashes == 5
+
+
+def test_filter_persists_and_has_no_false_negatives(tmp_path):
+    path = str(tmp_path / 'words.bloom')
+    bloom = BloomFilter.create(path, capacity=10_000, error_rate=0.01)
+    bloom.update(f"word{i}" for i in range(10_000))
+    bloom.close()
+
+    reopened = BloomFilter.open(path)
+    assert reopened.count == 10_000
+    assert all(f"word{i}" in reopened for i in range(10_000))
+    false_positives = sum(f"other{i}" in reopened for i in range(10_000))
+    assert false_positives < 200
+    reopened.close()
+
+
+def test_cache_manager_rebuilds_stale_filter(tmp_path):
+    note = lambda word: WordNote(source_lang='en', target_lang='zh', word=word, translate='x')
+    cache_file = str(tmp_path / 'word_cache.json')
+    plain = CacheManager(cache_file)
+    plain.save_cache([note('apple')])
+    plain.close()
+
+    # Words added without the filter are picked up by a rebuild
+    cache = CacheManager(cache_file, bloom_filter=True)
+    assert 'apple' in cache and 'pear' not in cache
+    cache.save_cache([note('pear')])
+    assert cache.filter_new_words([note('pear'), note('kiwi')]) == [note('kiwi')]
+    cache.close()
+    assert BloomFilter.open(cache.db_file + '.bloom').count == 2
+
+
+def test_cache_manager_counts_new_words_without_scanning(tmp_path):
+    note = lambda word, translate='x': WordNote(source_lang='en', target_lang='zh', word=word, translate=translate)
+    cache = CacheManager(str(tmp_path / 'word_cache.json'), bloom_filter=True)
+    statements = []
+    cache._conn.set_trace_callback(statements.append)
+
+    cache.save_cache([note('apple'), note('pear'), note('apple')])
+    cache.save_cache([note('pear', 'y'), note('kiwi')])
+    assert not any('COUNT' in statement for statement in statements)
+    assert cache.bloom.count == len(cache) == 3
+    # Hashes of words already cached are still updated
+    assert cache.filter_words([note('pear', 'y')]) == ([], [])
+    cache.close()
+    assert BloomFilter.open(cache.db_file + '.bloom').count == 3
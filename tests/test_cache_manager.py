@@ -0,0 +1,61 @@
+import json
+from src.cache_manager import CacheManager
+from src.core.models import WordNote
+
+
+def note(word):
+    return WordNote(source_lang='en', target_lang='zh', word=word, translate='x')
+
+
+def test_json_cache_is_migrated(tmp_path, caplog):
+    caplog.set_level('INFO')
+    legacy = tmp_path / 'word_cache.json'
+    legacy.write_text(json.dumps({'last_updated': '2024-01-01', 'words': ['apple', 'pear']}))
+
+    cache = CacheManager(str(legacy))
+    assert 'Migrated 2 cached words' in caplog.text
+    assert not legacy.exists()
+    assert (tmp_path / 'word_cache.json.migrated').exists()
+    assert len(cache) == 2
+    assert [n.word for n in cache.filter_new_words([note('apple'), note('kiwi')])] == ['kiwi']
+    cache.close()
+
+
+def test_save_only_adds_new_words(tmp_path):
+    cache = CacheManager(str(tmp_path / 'word_cache.json'))
+    assert cache.cached_words == set()
+    # main checks "if cache_manager", so an empty cache must stay truthy
+    assert len(cache) == 0 and cache
+    cache.save_cache([note('apple'), note('apple'), note('pear')])
+    cache.save_cache([note('pear')])
+    assert cache.cached_words == {'apple', 'pear'}
+    cache.close()
+
+    reopened = CacheManager(str(tmp_path / 'word_cache.json'))
+    assert 'apple' in reopened and 'kiwi' not in reopened
+    assert reopened.filter_new_words([note('pear')]) == []
+    reopened.close()
+
+
+def test_filter_words_detects_edits(tmp_path):
+    cache = CacheManager(str(tmp_path / 'word_cache.json'))
+    cache.save_cache([note('apple'), note('pear')])
+    edited = note('pear').model_copy(update={'translate': 'y'})
+
+    new_words, changed_words = cache.filter_words([note('apple'), edited, note('kiwi')])
+    assert [n.word for n in new_words] == ['kiwi']
+    assert changed_words == [edited]
+
+    cache.save_cache(changed_words)
+    assert cache.filter_words([edited]) == ([], [])
+    cache.close()
+
+
+def test_migrated_words_are_baselined(tmp_path):
+    legacy = tmp_path / 'word_cache.json'
+    legacy.write_text(json.dumps({'words': ['apple']}))
+    cache = CacheManager(str(legacy))
+    assert cache.filter_words([note('apple')]) == ([], [])
+    edited = note('apple').model_copy(update={'translate': 'y'})
+    assert cache.filter_words([edited]) == ([], [edited])
+    cache.close()
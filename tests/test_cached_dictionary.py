@@ -0,0 +1,115 @@
+import asyncio
+import pytest
+from src.services.cached_dictionary import LookupCache
+from src.services.memo_dictionary import LookupMemo
+from src.services.dictionary_base import DictionaryService, WordDetail
+from src.services.dictionary_factory import DictionaryFactory
+
+
+class CountingDictionary(DictionaryService):
+    calls = 0
+
+    async def lookup_word(self, word):
+        CountingDictionary.calls += 1
+        await asyncio.sleep(0)
+        if word == "missing":
+            return None
+        return WordDetail(word=word, phonetic="ˈæpl", examples=["An apple a day."],
+                          collins={'translations': ["fruit"], 'examples': []})
+
+    async def get_examples(self, word):
+        return []
+
+
+@pytest.fixture
+def counting_service():
+    DictionaryFactory.register_service('counting', CountingDictionary)
+    CountingDictionary.calls = 0
+    yield
+    DictionaryFactory.clear_wrappers()
+    DictionaryFactory._services.pop('counting')
+
+
+@pytest.mark.asyncio
+async def test_lookup_cache_persists_across_instances(tmp_path, counting_service):
+    path = str(tmp_path / "lookups.sqlite3")
+    cache = LookupCache(path, ttl=3600, max_entries=10)
+    DictionaryFactory.register_wrapper(cache.wrap)
+
+    service = DictionaryFactory.get_service('counting')
+    first = await service.lookup_word("Apple")
+    assert await service.lookup_word("apple") == first
+    assert await service.get_examples("apple") == ["An apple a day."]
+    assert await service.lookup_word("missing") is None
+    assert CountingDictionary.calls == 2
+    assert cache.stats()['hits'] == 2
+    cache.close()
+
+    reopened = LookupCache(path, ttl=3600)
+    detail = reopened.get('counting', 'APPLE')
+    assert detail == first
+    assert reopened.get('other', 'apple') is None
+    reopened.close()
+
+
+def test_lookup_cache_ttl_and_size_cap(tmp_path):
+    cache = LookupCache(str(tmp_path / "lookups.sqlite3"), ttl=0, max_entries=2)
+    cache.put('youdao', 'old', WordDetail(word='old'))
+    assert cache.get('youdao', 'old') is None
+
+    cache.ttl = None
+    for i, word in enumerate(["a", "b", "c"]):
+        cache.put('youdao', word, WordDetail(word=word))
+    cache.get('youdao', 'a')
+    cache.evict()
+    assert cache.get('youdao', 'b') is None
+    assert cache.get('youdao', 'a') is not None
+    assert cache.stats()['entries'] == 2
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_memo_coalesces_concurrent_lookups_and_caches_misses(counting_service):
+    memo = LookupMemo(max_entries=10, negative_ttl=60)
+    DictionaryFactory.register_wrapper(memo.wrap)
+    first = DictionaryFactory.get_service('counting')
+    second = DictionaryFactory.get_service('counting')
+
+    results = await asyncio.gather(*(service.lookup_word("Apple") for service in (first, second) * 3))
+    assert CountingDictionary.calls == 1
+    assert all(r == results[0] for r in results)
+    assert memo.stats()['coalesced'] == 5
+
+    assert await first.lookup_word("missing") is None
+    assert await second.lookup_word("missing") is None
+    assert await first.get_examples("apple") == ["An apple a day."]
+    assert CountingDictionary.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_memo_propagates_errors_to_waiters():
+    memo = LookupMemo()
+
+    async def failing(word):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(
+        memo.lookup('x', 'word', failing), memo.lookup('x', 'word', failing), return_exceptions=True
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert memo.stats()['entries'] == 0
+
+
+def test_unregistered_wrapper_no_longer_applies(tmp_path, counting_service):
+    cache = LookupCache(str(tmp_path / "lookups.sqlite3"))
+    memo = LookupMemo()
+    DictionaryFactory.register_wrapper(cache.wrap)
+    DictionaryFactory.register_wrapper(memo.wrap)
+
+    DictionaryFactory.unregister_wrapper(cache.wrap)
+    assert type(DictionaryFactory.get_service('counting').service) is CountingDictionary
+    DictionaryFactory.unregister_wrapper(memo.wrap)
+    DictionaryFactory.unregister_wrapper(memo.wrap)
+    assert type(DictionaryFactory.get_service('counting')) is CountingDictionary
+    cache.close()
@@ -0,0 +1,166 @@
+import pytest
+from src.checkpoint import CheckpointStore
+from src.core.interfaces import DataMiddleware
+from src.core.models import CompactWordNote, WordNote
+from src.middleware.checkpoint import CheckpointMiddleware
+from src.middleware.dictionary_enhancement import DictionaryEnhancementMiddleware
+from src.middleware.pipeline import MiddlewarePipeline
+from src.services.dictionary_base import DictionaryService, WordDetail
+
+
+class Enrich(DataMiddleware):
+    one_to_one = True
+
+    def __init__(self, fail_on=None):
+        self.seen = []
+        self.fail_on = fail_on
+
+    async def process(self, data):
+        results = []
+        for note in data:
+            if note.word == self.fail_on:
+                raise RuntimeError("upstream ban")
+            self.seen.append(note.word)
+            results.append(note.model_copy(update={'phonetic': f"/{note.word}/"}))
+        return results
+
+    async def process_stream(self, data, batch_size=32):
+        async for note in data:
+            yield (await self.process([note]))[0]
+
+
+class LaggingEnrich(Enrich):
+    """Holds each output until the next input arrives, like a lookup window"""
+
+    async def process_stream(self, data, batch_size=32):
+        held = None
+        async for note in data:
+            if held:
+                yield held
+            held = (await self.process([note]))[0]
+        if held:
+            yield held
+
+
+class Map(DataMiddleware):
+    async def process(self, data):
+        return [{'Front': note.word, 'Back': note.phonetic} for note in data]
+
+
+def notes(count):
+    return [WordNote(source_lang='en', target_lang='zh', word=f"w{i}", translate='x') for i in range(count)]
+
+
+def test_store_round_trips_models(tmp_path):
+    store = CheckpointStore(str(tmp_path / 'checkpoint.sqlite3'))
+    note = notes(1)[0]
+    store.save('0.Enrich', [('w0', note)])
+    store.save('1.Map', [('w0', {'Front': 'w0'})])
+    assert store.load('0.Enrich', ['w0', 'w1']) == {'w0': note}
+    assert store.load('1.Map', ['w0']) == {'w0': {'Front': 'w0'}}
+    store.clear()
+    assert store.count() == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('streaming', [False, True])
+async def test_rerun_skips_completed_words(tmp_path, streaming):
+    store = CheckpointStore(str(tmp_path / 'checkpoint.sqlite3'))
+
+    async def run(enrich):
+        pipeline = MiddlewarePipeline(checkpoint=store).add_middleware(enrich).add_middleware(Map())
+        if streaming:
+            return [x async for x in pipeline.stream(notes(6), batch_size=2)]
+        return await pipeline.process(notes(6))
+
+    first = Enrich(fail_on='w3')
+    with pytest.raises(RuntimeError):
+        await run(first)
+    recorded = store.count('0.Enrich')
+    assert recorded >= 2
+
+    second = Enrich()
+    results = await run(second)
+    assert len(second.seen) == 6 - recorded
+    assert results == [{'Front': f"w{i}", 'Back': f"/w{i}/"} for i in range(6)]
+    assert store.count('0.Enrich') == 6
+
+
+@pytest.mark.asyncio
+async def test_streamed_restored_items_keep_input_order(tmp_path):
+    store = CheckpointStore(str(tmp_path / 'checkpoint.sqlite3'))
+    recorded = [note for note in notes(8) if note.word not in ('w0', 'w5')]
+    store.save('0.LaggingEnrich', [
+        (CheckpointMiddleware._key(note), note.model_copy(update={'phonetic': 'restored'})) for note in recorded
+    ])
+
+    enrich = LaggingEnrich()
+    pipeline = MiddlewarePipeline(checkpoint=store).add_middleware(enrich).add_middleware(Map())
+    results = [x async for x in pipeline.stream(notes(8), batch_size=2)]
+
+    assert enrich.seen == ['w0', 'w5']
+    assert [r['Front'] for r in results] == [f"w{i}" for i in range(8)]
+    assert [r['Back'] for r in results] == ['/w0/'] + ['restored'] * 4 + ['/w5/'] + ['restored'] * 2
+
+
+class PhoneticDictionary(DictionaryService):
+    def __init__(self, failing=(), unknown=()):
+        self.lookups = []
+        self.failing = failing
+        self.unknown = unknown
+
+    async def lookup_word(self, word):
+        self.lookups.append(word)
+        if word in self.failing:
+            raise ConnectionError("banned")
+        if word in self.unknown:
+            return None
+        return WordDetail(word=word, phonetic=f"/{word}/")
+
+    async def get_examples(self, word):
+        return []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('compact', [False, True])
+async def test_rerun_with_dictionary_enhancement(tmp_path, compact):
+    store = CheckpointStore(str(tmp_path / 'checkpoint.sqlite3'))
+    words = CompactWordNote.from_models(notes(4)) if compact else notes(4)
+    hashes = [word.content_hash() for word in words]
+
+    async def run():
+        enhancement = DictionaryEnhancementMiddleware(concurrency=2)
+        enhancement.dictionary = PhoneticDictionary()
+        pipeline = MiddlewarePipeline(checkpoint=store).add_middleware(enhancement).add_middleware(Map())
+        return enhancement.dictionary, [x async for x in pipeline.stream(words, batch_size=2)]
+
+    first, results = await run()
+    assert first.lookups == ['w0', 'w1', 'w2', 'w3']
+    # The words passed in are not enriched in place, so their keys still match
+    assert [word.content_hash() for word in words] == hashes
+    second, rerun = await run()
+    assert second.lookups == []
+    assert rerun == results == [{'Front': f"w{i}", 'Back': f"/w{i}/"} for i in range(4)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('streaming', [False, True])
+async def test_failed_lookups_are_not_checkpointed(tmp_path, streaming):
+    store = CheckpointStore(str(tmp_path / 'checkpoint.sqlite3'))
+
+    async def run(dictionary):
+        enhancement = DictionaryEnhancementMiddleware(concurrency=2)
+        enhancement.dictionary = dictionary
+        pipeline = MiddlewarePipeline(checkpoint=store).add_middleware(enhancement).add_middleware(Map())
+        if streaming:
+            return [x async for x in pipeline.stream(notes(4), batch_size=2)]
+        return await pipeline.process(notes(4))
+
+    results = await run(PhoneticDictionary(failing=('w1',), unknown=('w2',)))
+    assert [r['Back'] for r in results] == ['/w0/', None, None, '/w3/']
+
+    # The failed lookup is retried, the word the dictionary doesn't know is not
+    retry = PhoneticDictionary()
+    results = await run(retry)
+    assert retry.lookups == ['w1']
+    assert [r['Back'] for r in results] == ['/w0/', '/w1/', None, '/w3/']
@@ -0,0 +1,52 @@
+import sys
+from dataclasses import asdict
+import pytest
+from src.checkpoint import CheckpointStore
+from src.core.models import CompactWordNote, WordNote
+from src.middleware.field_mapping import FieldMappingMiddleware
+from src.services.dictionary_base import WordDetail
+
+
+def make_note(word='symphony', **extra):
+    return WordNote(source_lang='en', target_lang='zh', word=word, translate='交响乐', **extra)
+
+
+def test_round_trip_and_hash():
+    note = make_note(phonetic='/ˈsɪmfəni/', sentences=['A symphony.'], collins={'translations': ['x']})
+    compact = CompactWordNote.from_model(note)
+    assert compact.to_model() == note
+    assert compact.content_hash() == note.content_hash()
+    assert compact == CompactWordNote.from_model(note)
+    assert not hasattr(compact, '__dict__')
+
+
+def test_language_codes_are_interned():
+    # Build the codes at runtime so they are distinct string objects
+    first = CompactWordNote(''.join(['e', 'n']), 'zh', 'a', 'x')
+    second = CompactWordNote(''.join(['e', 'n']), 'zh', 'b', 'y')
+    assert first.source_lang is second.source_lang
+
+
+@pytest.mark.asyncio
+async def test_pipeline_stages_accept_compact_notes():
+    compact = CompactWordNote.from_model(make_note(phonetic='/p/'))
+    compact.examples = ['one', 'two']
+    mapped = await FieldMappingMiddleware().process([compact])
+    assert mapped == await FieldMappingMiddleware().process([compact.to_model()])
+
+
+def test_checkpoint_restores_compact_notes(tmp_path):
+    store = CheckpointStore(str(tmp_path / 'checkpoint.sqlite3'))
+    compact = CompactWordNote.from_model(make_note(sentences=['s']))
+    store.save('0.enhance', [('symphony', compact)])
+    restored = store.load('0.enhance', ['symphony'])['symphony']
+    assert isinstance(restored, CompactWordNote)
+    assert restored == compact
+    store.close()
+
+
+def test_word_detail_is_slotted():
+    detail = WordDetail(word='symphony', phonetic='/p/')
+    assert asdict(detail)['phonetic'] == '/p/'
+    if sys.version_info >= (3, 10):
+        assert not hasattr(detail, '__dict__')
@@ -0,0 +1,62 @@
+import asyncio
+import pytest
+from src.core.models import WordNote
+from src.middleware.dictionary_enhancement import DictionaryEnhancementMiddleware
+from src.services.dictionary_base import DictionaryService, WordDetail
+
+
+class SlowDictionary(DictionaryService):
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+
+    async def lookup_word(self, word):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            # Later words finish first to check that order is preserved
+            await asyncio.sleep(0.001 * (10 - int(word[1:])))
+            if word == "w3":
+                raise RuntimeError("upstream error")
+            return WordDetail(word=word, phonetic=f"/{word}/")
+        finally:
+            self.in_flight -= 1
+
+    async def get_examples(self, word):
+        return []
+
+
+@pytest.mark.asyncio
+async def test_concurrent_enhancement_keeps_order_and_isolates_errors():
+    middleware = DictionaryEnhancementMiddleware(concurrency=4)
+    middleware.dictionary = SlowDictionary()
+    notes = [WordNote(source_lang="en", target_lang="zh", word=f"w{i}", translate="") for i in range(10)]
+
+    hashes = [n.content_hash() for n in notes]
+
+    enhanced = await middleware.process(notes)
+
+    assert [n.word for n in enhanced] == [f"w{i}" for i in range(10)]
+    assert enhanced[3].phonetic is None
+    assert enhanced[4].phonetic == "/w4/"
+    assert middleware.dictionary.peak == 4
+    # Enrichment works on copies, the fetched notes still hash as before
+    assert notes[4].phonetic is None
+    assert [n.content_hash() for n in notes] == hashes
+
+
+@pytest.mark.asyncio
+async def test_streaming_enhancement_keeps_order():
+    middleware = DictionaryEnhancementMiddleware(concurrency=4)
+    middleware.dictionary = SlowDictionary()
+    notes = [WordNote(source_lang="en", target_lang="zh", word=f"w{i}", translate="") for i in range(10)]
+
+    async def source():
+        for note in notes:
+            yield note
+
+    enhanced = [note async for note in middleware.process_stream(source())]
+
+    assert [n.word for n in enhanced] == [f"w{i}" for i in range(10)]
+    assert enhanced[3].phonetic is None
+    assert middleware.dictionary.peak == 4
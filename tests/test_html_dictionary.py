@@ -0,0 +1,91 @@
+import aiohttp
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from src.services.youdao_dictionary import YoudaoDictionary
+from src.services.renren_dictionary import RenRenDictionary
+from src.services.memo_dictionary import LookupMemo
+from src.session_manager import SessionManager
+from src.config import settings
+
+YOUDAO_PAGE = '''
+<span class="phonetic">[ˈæpl]</span>
+<div class="trans-container"><ul><li>n. 苹果</li></ul></div>
+<p class="example-sentences">An apple a day.</p>
+<p class="example-sentences">She ate an apple.</p>
+<div id="authTrans"><div class="collinsMajorTrans">A round fruit.</div></div>
+'''
+
+
+@pytest_asyncio.fixture
+async def dictionary_server():
+    hits = []
+
+    async def youdao(request):
+        hits.append(request.path)
+        if request.path == '/w/error/' and hits.count(request.path) == 1:
+            # Fails once, like a dropped connection
+            raise web.HTTPInternalServerError()
+        return web.Response(text=YOUDAO_PAGE, content_type='text/html')
+
+    async def renren(request):
+        hits.append(request.path_qs)
+        return web.Response(text="<p>查不到该词</p>", content_type='text/html')
+
+    app = web.Application()
+    app.router.add_get('/w/{word}/', youdao)
+    app.router.add_get('/words', renren)
+    server = TestServer(app)
+    await server.start_server()
+    yield server, hits
+    await SessionManager.close_all()
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_youdao_page_fetched_once(dictionary_server):
+    server, hits = dictionary_server
+    dictionary = YoudaoDictionary()
+    dictionary.base_url = str(server.make_url('/w'))
+
+    detail = await dictionary.lookup_word("apple")
+    examples = await dictionary.get_examples("apple")
+
+    assert hits == ['/w/apple/']
+    assert detail.phonetic == "ˈæpl"
+    assert detail.definition == "n. 苹果"
+    assert detail.examples == ["An apple a day.", "She ate an apple."]
+    assert detail.collins is not None
+    assert examples == detail.examples
+
+
+@pytest.mark.asyncio
+async def test_renren_not_found_page(dictionary_server):
+    server, hits = dictionary_server
+    dictionary = RenRenDictionary()
+    dictionary.base_url = str(server.make_url('/words'))
+
+    assert await dictionary.lookup_word("qwzx") is None
+    assert await dictionary.get_examples("qwzx") == []
+    assert hits == ['/words?w=qwzx']
+
+
+@pytest.mark.asyncio
+async def test_failed_lookup_is_not_memoized_as_missing(dictionary_server, monkeypatch):
+    server, hits = dictionary_server
+    monkeypatch.setattr(settings.http, 'max_retries', 1)
+    dictionary = YoudaoDictionary()
+    dictionary.base_url = str(server.make_url('/w'))
+    memo = LookupMemo(negative_ttl=600)
+    service = memo.wrap('youdao', dictionary)
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        await service.lookup_word("error")
+    assert memo.stats()['entries'] == 0
+
+    # The word is looked up again once the dictionary answers
+    server_hits = len(hits)
+    detail = await service.lookup_word("error")
+    assert detail.phonetic == "ˈæpl"
+    assert len(hits) == server_hits + 1
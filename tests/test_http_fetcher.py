@@ -126,3 +126,100 @@ async def test_json_format_fetch(mock_settings):
         assert words[0].word == "symphony"
         assert words[0].translate == "交响乐"
 
+
+def test_csv_record_splitter_respects_quotes():
+    from src.fetchers.http import CsvRecordSplitter
+    text = 'word,sentences\na,"one\nline ""two"",\nthree"\nb,x\nc,"unterminated'
+    splitter = CsvRecordSplitter()
+    records = []
+    for i in range(0, len(text), 3):
+        records.extend(splitter.feed(text[i:i + 3]))
+    records.extend(splitter.close())
+    assert records == ['word,sentences\n', 'a,"one\nline ""two"",\nthree"\n', 'b,x\n', 'c,"unterminated']
+
+@pytest.mark.asyncio
+async def test_csv_stream_fetch():
+    """CSV notes are parsed from a chunked body with a BOM and multi-line fields"""
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+
+    csv_content = '\ufeffword,translation,phonetic,mastered,sentences\r\n' + ''.join(
+        f'word{i},"n. 交响乐 {i}","英 [ˈsɪmfəni]",No,"First sentence {i}.\nSecond, ""quoted"" one."\r\n'
+        for i in range(200)
+    )
+
+    async def export(request):
+        assert request.query['source_lang'] == 'en'
+        response = web.StreamResponse(headers={'Content-Type': 'text/csv; charset=utf-8'})
+        await response.prepare(request)
+        body = csv_content.encode('utf-8')
+        # Odd chunk sizes split records and multi-byte characters
+        for start in range(0, len(body), 37):
+            await response.write(body[start:start + 37])
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_get('/export', export)
+    server = TestServer(app)
+    await server.start_server()
+    try:
+        fetcher = HTTPFetcher(base_url=str(server.make_url('/export')), format='csv')
+        fetcher.STREAM_CHUNK_SIZE = 50
+        async with fetcher:
+            words = [note async for note in fetcher.stream_data()]
+    finally:
+        await server.close()
+
+    assert len(words) == 200
+    assert words[0].word == 'word0'
+    assert words[199].translate == 'n. 交响乐 199'
+    assert words[5].phonetic == '英 [ˈsɪmfəni]'
+    assert words[5].sentences == ['First sentence 5.', 'Second, "quoted" one.']
+
+@pytest.mark.asyncio
+async def test_csv_fetch_data_parses_while_downloading(tmp_path, monkeypatch):
+    """fetch_data reads CSV exports chunk by chunk and still skips an unchanged body"""
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+    from src.sync_state import SyncState
+
+    body = ('﻿word,translation,phonetic,mastered,sentences\r\n' + ''.join(
+        f'word{i},"n. 词 {i}",,No,"Line {i}.\nNext line."\r\n' for i in range(50)
+    )).encode('utf-8')
+
+    async def export(request):
+        response = web.StreamResponse(headers={'Content-Type': 'text/csv; charset=utf-8'})
+        await response.prepare(request)
+        for start in range(0, len(body), 29):
+            await response.write(body[start:start + 29])
+        await response.write_eof()
+        return response
+
+    async def whole_body(self):
+        raise AssertionError('the CSV body is buffered')
+
+    monkeypatch.setattr(aiohttp.ClientResponse, 'text', whole_body)
+    monkeypatch.setattr(aiohttp.ClientResponse, 'read', whole_body)
+    app = web.Application()
+    app.router.add_get('/export', export)
+    server = TestServer(app)
+    await server.start_server()
+    state = SyncState(str(tmp_path / 'sync.json'))
+    try:
+        fetcher = HTTPFetcher(base_url=str(server.make_url('/export')), format='csv', sync_state=state)
+        fetcher.STREAM_CHUNK_SIZE = 40
+        async with fetcher:
+            words = await fetcher.fetch_data()
+        assert len(words) == 50
+        assert words[49].translate == 'n. 词 49'
+        assert words[3].sentences == ['Line 3.', 'Next line.']
+        assert list(state.pending.values())[0]['digest'] == SyncState.digest(body)
+
+        state.commit()
+        fetcher = HTTPFetcher(base_url=str(server.make_url('/export')), format='csv', sync_state=state)
+        async with fetcher:
+            assert await fetcher.fetch_data() == []
+        assert fetcher.not_modified
+    finally:
+        await server.close()
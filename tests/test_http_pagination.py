@@ -0,0 +1,134 @@
+import asyncio
+import aiohttp
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from src.config import PaginationConfig
+from src.fetchers.http import HTTPFetcher, RequestError
+
+
+class FakeWordNotes:
+    """Stand-in for the word_notes endpoint with page and cursor pagination"""
+
+    def __init__(self, total):
+        self.words = [f"word{i}" for i in range(total)]
+        self.requests = []
+        self.fail_once = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def page(self, words, **extra):
+        notes = [{'source_lang': 'en', 'target_lang': 'zh', 'word': w, 'translate': 'x'} for w in words]
+        return web.json_response({'code': 0, 'msg': '', 'data': {'word_notes': notes, **extra}})
+
+    async def handle(self, request):
+        query = request.query
+        self.requests.append(dict(query))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            key = query.get('page') or query.get('cursor')
+            if key in self.fail_once:
+                self.fail_once.discard(key)
+                raise web.HTTPInternalServerError()
+            size = int(query['page_size'])
+            if 'page' in query:
+                start = (int(query['page']) - 1) * size
+                return self.page(self.words[start:start + size])
+            start = int(query.get('cursor', 0))
+            end = start + size
+            more = end < len(self.words)
+            return self.page(self.words[start:end], cursor=str(end) if more else None, has_more=more)
+        finally:
+            self.in_flight -= 1
+
+
+@pytest_asyncio.fixture
+async def notes_api():
+    api = FakeWordNotes(1050)
+    app = web.Application()
+    app.router.add_get('/word_notes', api.handle)
+    server = TestServer(app)
+    await server.start_server()
+    api.url = str(server.make_url('/word_notes'))
+    yield api
+    await server.close()
+
+
+def fetcher_for(api, fast_decode=True, **config):
+    pagination = PaginationConfig(enabled=True, page_size=100, retry_delay=0.001, **config)
+    return HTTPFetcher(base_url=api.url, pagination=pagination, fast_decode=fast_decode)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('fast_decode', [True, False])
+async def test_numbered_pages_are_prefetched(notes_api, fast_decode):
+    async with fetcher_for(notes_api, fast_decode, prefetch=3) as fetcher:
+        words = await fetcher.fetch_data()
+
+    assert [w.word for w in words] == notes_api.words
+    assert notes_api.max_in_flight > 1
+    pages = sorted(int(r['page']) for r in notes_api.requests)
+    # Pages past the short last one may have been requested ahead
+    assert pages[:11] == list(range(1, 12))
+    assert len(pages) <= 11 + 3
+
+
+@pytest.mark.asyncio
+async def test_failed_page_is_retried(notes_api):
+    notes_api.fail_once = {'3', '7'}
+    async with fetcher_for(notes_api, prefetch=2) as fetcher:
+        words = [note.word async for note in fetcher.stream_data()]
+    assert words == notes_api.words
+
+
+@pytest.mark.asyncio
+async def test_page_retries_are_bounded(notes_api):
+    notes_api.fail_once = {'2'}
+    async with fetcher_for(notes_api, max_retries=1) as fetcher:
+        with pytest.raises(aiohttp.ClientResponseError):
+            await fetcher.fetch_data()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('fast_decode', [True, False])
+async def test_cursor_pages(notes_api, fast_decode):
+    notes_api.fail_once = {'500'}
+    async with fetcher_for(notes_api, fast_decode, mode='cursor', prefetch=2) as fetcher:
+        words = [note.word async for note in fetcher.stream_data()]
+    assert words == notes_api.words
+    assert 'cursor' not in notes_api.requests[0]
+    assert [r.get('cursor') for r in notes_api.requests[1:3]] == ['100', '200']
+
+
+@pytest.mark.asyncio
+async def test_consumer_stopping_early_cancels_prefetch(notes_api):
+    async with fetcher_for(notes_api, prefetch=3) as fetcher:
+        stream = fetcher.stream_data()
+        async for note in stream:
+            if note.word == 'word150':
+                break
+        await stream.aclose()
+        await asyncio.sleep(0.05)
+    # Page 2 was being consumed, with the three pages after it in flight
+    assert len(notes_api.requests) <= 2 + 1 + 3
+    assert notes_api.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_api_error_is_raised_with_fast_decode():
+    async def handle(request):
+        return web.json_response({'code': 401, 'msg': 'bad cookie', 'data': None})
+
+    app = web.Application()
+    app.router.add_get('/word_notes', handle)
+    server = TestServer(app)
+    await server.start_server()
+    try:
+        async with HTTPFetcher(base_url=str(server.make_url('/word_notes'))) as fetcher:
+            with pytest.raises(RequestError, match='bad cookie'):
+                await fetcher.fetch_data()
+    finally:
+        await server.close()
@@ -0,0 +1,248 @@
+import itertools
+import json
+import os
+import re
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+import main
+from src.cache_manager import CacheManager
+from src.checkpoint import CheckpointStore
+from src.config import settings
+from src.core.models import WordNote
+from src.services.dictionary_base import DictionaryService, WordDetail
+from src.services.dictionary_factory import DictionaryFactory
+from src.sync_state import SyncState
+
+
+class FakeDoubao:
+    """Word notes endpoint answering conditional requests with 304"""
+
+    def __init__(self):
+        self.words = {'apple': '苹果', 'pear': '梨', 'plum': '李子'}
+        self.responses = []
+
+    def body(self):
+        notes = [
+            {'source_lang': 'en', 'target_lang': 'zh', 'word': word, 'translate': translate}
+            for word, translate in self.words.items()
+        ]
+        return json.dumps({'code': 0, 'msg': '', 'data': {'word_notes': notes}}, ensure_ascii=False)
+
+    async def handle(self, request):
+        body = self.body()
+        tag = f'"{SyncState.digest(body.encode())[:12]}"'
+        if request.headers.get('If-None-Match') == tag:
+            self.responses.append(304)
+            return web.Response(status=304)
+        self.responses.append(200)
+        return web.Response(text=body, content_type='application/json', headers={'ETag': tag})
+
+
+class FakeAnki:
+    """AnkiConnect with just enough actions for main: notes live in a dict"""
+
+    def __init__(self):
+        self.notes = {}
+        self.ids = itertools.count(1)
+        self.actions = []
+
+    def run(self, action, params):
+        self.actions.append(action)
+        if action == 'createDeck':
+            return 1
+        if action == 'modelFieldNames':
+            return ['Front', 'Back']
+        if action == 'addNote':
+            fields = params['note']['fields']
+            if any(note['Front'] == fields['Front'] for note in self.notes.values()):
+                raise ValueError('cannot create note because it is a duplicate')
+            note_id = next(self.ids)
+            self.notes[note_id] = dict(fields)
+            return note_id
+        if action == 'canAddNotes':
+            fronts = {note['Front'] for note in self.notes.values()}
+            return [note['fields']['Front'] not in fronts for note in params['notes']]
+        if action == 'findNotes':
+            match = re.search(r'"(\w+):((?:[^"\\]|\\.)*)"$', params['query'])
+            if not match:
+                return list(self.notes)
+            field, value = match.group(1), re.sub(r'\\(.)', r'\1', match.group(2))
+            return [note_id for note_id, note in self.notes.items() if note.get(field) == value]
+        if action == 'notesInfo':
+            return [
+                {'noteId': note_id, 'fields': {name: {'value': value} for name, value in self.notes[note_id].items()}}
+                for note_id in params['notes']
+            ]
+        if action == 'updateNoteFields':
+            self.notes[params['note']['id']].update(params['note']['fields'])
+            return None
+        raise ValueError(f'unsupported action {action}')
+
+    def respond(self, action, params):
+        try:
+            return {'result': self.run(action, params), 'error': None}
+        except ValueError as e:
+            return {'result': None, 'error': str(e)}
+
+    async def handle(self, request):
+        payload = await request.json()
+        if payload['action'] == 'multi':
+            return web.json_response({'result': [
+                self.respond(action['action'], action.get('params', {})) for action in payload['params']['actions']
+            ], 'error': None})
+        return web.json_response(self.respond(payload['action'], payload.get('params', {})))
+
+
+class FakeYoudao(DictionaryService):
+    lookups = []
+
+    async def lookup_word(self, word):
+        FakeYoudao.lookups.append(word)
+        return WordDetail(word=word, phonetic=f'/{word}/', examples=[f'An {word}.'])
+
+    async def get_examples(self, word):
+        return []
+
+
+async def serve(path, handler):
+    app = web.Application()
+    app.router.add_route('*', path, handler)
+    server = TestServer(app)
+    await server.start_server()
+    return server
+
+
+@pytest_asyncio.fixture
+async def services(tmp_path, monkeypatch):
+    doubao, anki = FakeDoubao(), FakeAnki()
+    doubao_server = await serve('/word_notes', doubao.handle)
+    anki_server = await serve('/', anki.handle)
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.setattr(settings.api.doubao, 'jsonendpoint', str(doubao_server.make_url('/word_notes')))
+    monkeypatch.setattr(settings.anki, 'connect_url', str(anki_server.make_url('/')))
+    monkeypatch.setitem(DictionaryFactory._services, 'youdao', FakeYoudao)
+    FakeYoudao.lookups = []
+    yield doubao, anki
+    await doubao_server.close()
+    await anki_server.close()
+
+
+async def run_main():
+    await main.main()
+    # The lookup memo and cache belong to the run, later services don't see them
+    assert DictionaryFactory._wrappers == []
+
+
+@pytest.mark.asyncio
+async def test_successful_export_clears_checkpoint_and_commits_sync(services, tmp_path):
+    doubao, anki = services
+    await run_main()
+
+    assert sorted(note['Front'] for note in anki.notes.values()) == ['apple', 'pear', 'plum']
+    store = CheckpointStore.from_settings()
+    assert store.count() == 0
+    store.close()
+    assert os.path.exists(SyncState.from_settings().state_file)
+
+
+@pytest.mark.asyncio
+async def test_first_run_fills_empty_word_cache(services):
+    doubao, anki = services
+    await run_main()
+
+    cache = CacheManager(settings.cache.file)
+    assert cache.cached_words == {'apple', 'pear', 'plum'}
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_unchanged_words_are_not_reprocessed(services, monkeypatch):
+    doubao, anki = services
+    # Without the sync short-circuit every run goes through the word cache,
+    # and without the lookup cache every enriched word is looked up again
+    monkeypatch.setattr(settings.sync, 'enabled', False)
+    monkeypatch.setattr(settings.lookup_cache, 'enabled', False)
+    await run_main()
+    assert sorted(FakeYoudao.lookups) == ['apple', 'pear', 'plum']
+
+    FakeYoudao.lookups = []
+    anki.actions = []
+    await run_main()
+    assert FakeYoudao.lookups == []
+    assert 'addNote' not in anki.actions and 'updateNoteFields' not in anki.actions
+
+    doubao.words['pear'] = '梨子'
+    await run_main()
+    assert FakeYoudao.lookups == ['pear']
+    assert sorted(note['Back'] for note in anki.notes.values()) == ['李子', '梨子', '苹果']
+
+
+@pytest.mark.asyncio
+async def test_upsert_matches_notes_by_the_word_field(services, monkeypatch):
+    doubao, anki = services
+    monkeypatch.setattr(settings.anki, 'export_mode', 'upsert')
+    # The word is not the first mapped field, so it can't be guessed from note order
+    monkeypatch.setattr(settings.anki, 'field_mappings', {'Back': 'translate', 'Front': 'word'})
+    monkeypatch.setattr(settings.sync, 'enabled', False)
+    await run_main()
+
+    doubao.words['pear'] = '梨子'
+    await run_main()
+    assert sorted((note['Front'], note['Back']) for note in anki.notes.values()) == [
+        ('apple', '苹果'), ('pear', '梨子'), ('plum', '李子')
+    ]
+
+
+@pytest.mark.asyncio
+async def test_successful_export_is_backed_up(services, caplog):
+    caplog.set_level('INFO')
+    await run_main()
+
+    backups = os.path.expanduser(settings.backup.directory)
+    with open(os.path.join(backups, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+    assert [(package['kind'], package['notes']) for package in manifest['packages']] == [('base', 3)]
+    assert 'Backup written to' in caplog.text
+    assert 'Failed to write backup' not in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_second_run_over_unchanged_notebook_stops_at_fetch(services):
+    doubao, anki = services
+    await run_main()
+    assert doubao.responses == [200]
+
+    anki.actions = []
+    FakeYoudao.lookups = []
+    await run_main()
+    assert doubao.responses == [200, 304]
+    assert anki.actions == [] and FakeYoudao.lookups == []
+
+
+@pytest.mark.asyncio
+async def test_failed_export_is_fetched_again(services):
+    doubao, anki = services
+    run = anki.run
+
+    def unavailable(action, params):
+        if action == 'addNote':
+            raise ValueError('collection is not available')
+        return run(action, params)
+
+    anki.run = unavailable
+    await run_main()
+    assert anki.notes == {}
+
+    anki.run = run
+    await run_main()
+    assert doubao.responses == [200, 200]
+    assert sorted(note['Front'] for note in anki.notes.values()) == ['apple', 'pear', 'plum']
+
+
+def test_exported_words_maps_notes_back_to_words():
+    words = {word: WordNote(source_lang='en', target_lang='zh', word=word, translate='x') for word in ('a', 'b', 'c')}
+    notes = [{'Front': 'c', 'Back': 'x'}, {'Back': 'no word'}, {'Front': 'a'}, {'Front': 'unknown'}]
+    assert main.exported_words(notes, words, 'Front') == [words['c'], words['a']]
+    assert main.exported_words(notes, words, None) == []
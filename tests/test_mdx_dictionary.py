@@ -0,0 +1,197 @@
+import os
+import struct
+import zlib
+import pytest
+from unittest.mock import patch
+from src.services.mdx_dictionary import (
+    MdxDictionaryService, MdxReader, build_key_index, ripemd128, _mdx_key_info_key
+)
+from src.services.mdx_index import MdxKeyIndex, SOURCE_MDX
+
+
+class FakeEntry:
+    def __init__(self, words, defi):
+        self.l_word = words
+        self.s_word = '|'.join(words)
+        self.defi = defi
+
+
+FAKE_GLOSSARY = [
+    FakeEntry(["Abandon"], "<b>词根记忆</b>v. 放弃"),
+    FakeEntry(["colour", "color"], "n. 颜色"),
+    FakeEntry(["abandon"], "duplicate entry"),
+]
+
+
+def test_build_key_index_first_entry_wins():
+    index = build_key_index(FAKE_GLOSSARY)
+    assert index["abandon"] == ("Abandon", "<b>词根记忆</b>v. 放弃")
+    assert index["color"] == ("color", "n. 颜色")
+    assert index["colour|color"] == ("colour|color", "n. 颜色")
+
+
+def test_build_key_index_skips_invalid_entries():
+    class NoDefinition:
+        s_word = "ghost"
+        l_word = ["ghost"]
+
+    index = build_key_index([NoDefinition(), FakeEntry(["Ghost", ""], "n. 鬼")])
+    assert index == {"ghost|": ("Ghost|", "n. 鬼"), "ghost": ("Ghost", "n. 鬼")}
+
+
+@pytest.fixture
+def mdx_file(tmp_path):
+    path = tmp_path / "test.mdx"
+    path.write_bytes(b"not a real dictionary")
+    MdxDictionaryService.set_mdx_path(str(path))
+    with patch('src.services.mdx_dictionary.settings') as mock_settings:
+        mock_settings.cache.directory = str(tmp_path / "cache")
+        yield path
+    MdxDictionaryService.set_mdx_path(None)
+
+
+def test_sidecar_index_is_reused(mdx_file):
+    with patch.object(MdxDictionaryService, '_load_glossary', return_value=FAKE_GLOSSARY) as load:
+        service = MdxDictionaryService()
+        assert load.call_count == 1
+    assert os.path.exists(f"{mdx_file}.idx")
+    assert service._lookup_word_sync("ABANDON") == ("Abandon", "<b>词根记忆</b>v. 放弃")
+    assert service._lookup_word_sync("color") == ("color", "n. 颜色")
+    assert service._lookup_word_sync("missing") is None
+
+    with patch.object(MdxDictionaryService, '_load_glossary') as load:
+        reopened = MdxDictionaryService()
+        load.assert_not_called()
+    assert reopened._lookup_word_sync("colour") == ("colour", "n. 颜色")
+
+
+def test_sidecar_index_invalidated_by_mdx_change(mdx_file):
+    with patch.object(MdxDictionaryService, '_load_glossary', return_value=FAKE_GLOSSARY):
+        MdxDictionaryService()
+
+    mdx_file.write_bytes(b"a different, longer dictionary")
+    with patch.object(MdxDictionaryService, '_load_glossary', return_value=FAKE_GLOSSARY[1:]) as load:
+        service = MdxDictionaryService()
+        assert load.call_count == 1
+    assert service._lookup_word_sync("abandon") == ("abandon", "duplicate entry")
+
+
+def _swap_nibbles(value):
+    return ((value >> 4) | (value << 4)) & 0xff
+
+
+def _encrypt_key_info(block):
+    key = _mdx_key_info_key(block)
+    data = bytearray(block[8:])
+    previous = 0x36
+    for i, value in enumerate(data):
+        data[i] = _swap_nibbles(value ^ previous ^ (i & 0xff) ^ key[i % len(key)])
+        previous = data[i]
+    return block[:8] + bytes(data)
+
+
+def _zlib_block(raw):
+    return b'\x02\x00\x00\x00' + struct.pack('>I', zlib.adler32(raw)) + zlib.compress(raw)
+
+
+def write_mdx(path, entries, encrypted=0, keys_per_block=2, records_per_block=2):
+    """Write a minimal MDX 2.0 file with zlib-compressed blocks"""
+    header = (
+        f'<Dictionary GeneratedByEngineVersion="2.0" RequiredEngineVersion="2.0" '
+        f'Encrypted="{encrypted}" Encoding="UTF-8" Format="Html" Title="Test"/>\r\n\x00'
+    ).encode('utf-16-le')
+    out = struct.pack('>I', len(header)) + header + struct.pack('<I', zlib.adler32(header))
+
+    entries = sorted(entries, key=lambda e: e[0].lower())
+    records, offsets, position = [], [], 0
+    for _, text in entries:
+        data = text.encode('utf-8') + b'\x00'
+        records.append(data)
+        offsets.append(position)
+        position += len(data)
+
+    key_blocks, info = [], b''
+    for i in range(0, len(entries), keys_per_block):
+        chunk = list(zip(entries[i:i + keys_per_block], offsets[i:i + keys_per_block]))
+        raw = b''.join(struct.pack('>Q', off) + key.encode('utf-8') + b'\x00' for (key, _), off in chunk)
+        block = _zlib_block(raw)
+        key_blocks.append(block)
+        first, last = chunk[0][0][0].encode('utf-8'), chunk[-1][0][0].encode('utf-8')
+        info += (struct.pack('>Q', len(chunk))
+                 + struct.pack('>H', len(first)) + first + b'\x00'
+                 + struct.pack('>H', len(last)) + last + b'\x00'
+                 + struct.pack('>QQ', len(block), len(raw)))
+    info_block = _zlib_block(info)
+    if encrypted & 2:
+        info_block = _encrypt_key_info(info_block)
+    key_data = b''.join(key_blocks)
+    key_header = struct.pack('>QQQQQ', len(key_blocks), len(entries), len(info), len(info_block), len(key_data))
+    out += key_header + struct.pack('>I', zlib.adler32(key_header)) + info_block + key_data
+
+    record_blocks, record_info = [], b''
+    for i in range(0, len(records), records_per_block):
+        raw = b''.join(records[i:i + records_per_block])
+        block = _zlib_block(raw)
+        record_blocks.append(block)
+        record_info += struct.pack('>QQ', len(block), len(raw))
+    record_data = b''.join(record_blocks)
+    out += struct.pack('>QQQQ', len(record_blocks), len(entries), len(record_info), len(record_data))
+    out += record_info + record_data
+    path.write_bytes(out)
+
+
+MDX_ENTRIES = [
+    ("Apple", "<b>apple</b> n. 苹果"),
+    ("banana", "n. 香蕉"),
+    ("colour", "n. 颜色"),
+    ("color", "@@@LINK=colour"),
+    ("zebra", "n. 斑马"),
+]
+
+
+def test_ripemd128_vectors():
+    assert ripemd128(b'').hex() == "cdf26213a150dc3ecb610f18f6b38b46"
+    assert ripemd128(b'abc').hex() == "c14a12199c66e4ba84636b0f69144c77"
+
+
+@pytest.mark.parametrize("encrypted", [0, 2])
+def test_native_reader_reads_records(tmp_path, encrypted):
+    path = tmp_path / "native.mdx"
+    write_mdx(path, MDX_ENTRIES, encrypted=encrypted)
+    reader = MdxReader(str(path), cache_blocks=1)
+    try:
+        entries = {key: (offset, length) for key, _, offset, length in reader.index_entries()}
+        assert set(entries) == {"apple", "banana", "colour", "color", "zebra"}
+        assert reader.read_record(*entries["zebra"]) == "n. 斑马"
+        assert reader.read_record(*entries["apple"]) == "<b>apple</b> n. 苹果"
+        assert len(reader._blocks) == 1
+    finally:
+        reader.close()
+
+
+def test_native_index_follows_links(mdx_file):
+    write_mdx(mdx_file, MDX_ENTRIES)
+    with patch.object(MdxDictionaryService, '_load_glossary') as load:
+        service = MdxDictionaryService()
+        load.assert_not_called()
+    assert service._index.source == SOURCE_MDX
+    assert service._lookup_word_sync("apple") == ("Apple", "<b>apple</b> n. 苹果")
+    assert service._lookup_word_sync("Color") == ("color", "n. 颜色")
+    assert service._lookup_word_sync("missing") is None
+
+
+def test_index_keeps_first_duplicate_key(tmp_path):
+    mdx_path = tmp_path / "dup.mdx"
+    mdx_path.write_bytes(b"dictionary")
+    index_path = str(tmp_path / "dup.mdx.idx")
+    # "Apple" sorts before "apple" as bytes, but the entry listed first wins
+    MdxKeyIndex.write(index_path, str(mdx_path), [
+        ("apple", "apple", 10, 5), ("apple", "Apple", 0, 5), ("pear", "pear", 20, 4)
+    ])
+    index = MdxKeyIndex.open(index_path, str(mdx_path))
+    try:
+        assert len(index) == 2
+        assert index.lookup("apple") == ("apple", 10, 5)
+        assert index.lookup("pear") == ("pear", 20, 4)
+    finally:
+        index.close()
@@ -0,0 +1,56 @@
+import json
+import pytest
+from src.metrics import Histogram, MetricsRegistry, metrics
+from src.middleware.pipeline import MiddlewarePipeline
+from tests.test_pipeline import Double, Explode
+
+
+def test_histogram_quantiles():
+    histogram = Histogram(buckets=(0.1, 1, 10))
+    for value in (0.05, 0.05, 0.5, 5):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1, 0]
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(1.0) == 5
+
+
+def test_stage_context_counts_errors():
+    registry = MetricsRegistry()
+    with registry.stage('fetch') as timer:
+        timer.items = 3
+    with pytest.raises(ValueError):
+        with registry.stage('fetch'):
+            raise ValueError()
+    report = registry.report()['stages']['fetch']
+    assert (report['calls'], report['items'], report['errors']) == (2, 3, 1)
+
+
+def test_reports_are_written(tmp_path):
+    registry = MetricsRegistry()
+    registry.observe_stage('Double', 0.5, items=10)
+    registry.set_queue_depth('Double', 4)
+    registry.write_json(str(tmp_path / 'report.json'))
+    registry.write_prometheus(str(tmp_path / 'metrics.prom'))
+
+    report = json.loads((tmp_path / 'report.json').read_text())
+    assert report['stages']['Double']['items_per_sec'] == 20
+    assert report['stages']['Double']['queue_depth']['max'] == 4
+    text = (tmp_path / 'metrics.prom').read_text()
+    assert 'doubao_stage_items_total{stage="Double"} 10' in text
+    assert 'doubao_stage_duration_seconds_bucket{stage="Double",le="+Inf"} 1' in text
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+@pytest.mark.asyncio
+async def test_pipeline_records_stages():
+    metrics.reset()
+    pipeline = MiddlewarePipeline().add_middleware(Double())
+    await pipeline.process(list(range(5)))
+    assert [x async for x in pipeline.stream(range(5), batch_size=2)] == [0, 2, 4, 6, 8]
+    stats = metrics.stages['Double']
+    assert (stats.calls, stats.items) == (2, 10)
+    assert stats.item_latency.count == 10
+
+    with pytest.raises(ValueError):
+        await MiddlewarePipeline().add_middleware(Explode()).process(list(range(10)))
+    assert metrics.stages['Explode'].errors == 1
@@ -0,0 +1,59 @@
+import asyncio
+import pytest
+from src.core.interfaces import DataMiddleware
+from src.middleware.pipeline import MiddlewarePipeline
+
+
+class Double(DataMiddleware):
+    def __init__(self):
+        self.calls = []
+
+    async def process(self, data):
+        self.calls.append(len(data))
+        return [x * 2 for x in data]
+
+
+class Explode(DataMiddleware):
+    async def process(self, data):
+        if 7 in data:
+            raise ValueError("bad item")
+        return data
+
+
+async def numbers(count, produced):
+    for i in range(count):
+        produced.append(i)
+        yield i
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_stream_matches_list_processing():
+    pipeline = MiddlewarePipeline().add_middleware(Double()).add_middleware(Double())
+    expected = await pipeline.process(list(range(10)))
+    streamed = [x async for x in pipeline.stream(range(10), batch_size=3)]
+    assert streamed == expected == [x * 4 for x in range(10)]
+    assert pipeline.middlewares[0].calls[-4:] == [3, 3, 3, 1]
+
+
+@pytest.mark.asyncio
+async def test_stream_applies_backpressure():
+    produced = []
+    pipeline = MiddlewarePipeline().add_middleware(Double())
+    stream = pipeline.stream(numbers(1000, produced), batch_size=2, queue_size=2)
+    assert await stream.__anext__() == 0
+    await asyncio.sleep(0.01)
+    # Only a few queues' worth of items are read ahead of the consumer
+    assert len(produced) < 20
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_batches_and_errors():
+    pipeline = MiddlewarePipeline().add_middleware(Double())
+    batches = [b async for b in pipeline.stream_batches(range(5), batch_size=2)]
+    assert batches == [[0, 2], [4, 6], [8]]
+
+    failing = MiddlewarePipeline().add_middleware(Explode())
+    with pytest.raises(ValueError):
+        [x async for x in failing.stream(range(10), batch_size=4)]
@@ -0,0 +1,60 @@
+import time
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from src.config import RateLimitRule
+from src.rate_limiter import RateLimiter, TokenBucket, parse_retry_after
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_spaces_requests_after_burst():
+    bucket = TokenBucket(rate=50, burst=2)
+    start = time.monotonic()
+    for _ in range(7):
+        await bucket.acquire()
+    # Two tokens from the burst, then five more at 20ms intervals
+    assert 0.09 <= time.monotonic() - start < 0.3
+
+
+@pytest.mark.asyncio
+async def test_pause_blocks_unlimited_host():
+    bucket = TokenBucket()
+    bucket.pause(0.1)
+    start = time.monotonic()
+    await bucket.acquire()
+    assert time.monotonic() - start >= 0.09
+
+
+def test_host_rules_cover_subdomains():
+    limiter = RateLimiter(hosts={"youdao.com": RateLimitRule(rate=5, burst=10)})
+    assert limiter.bucket("www.youdao.com").rate == 5
+    assert limiter.bucket("localhost").rate is None
+
+
+@pytest.mark.asyncio
+async def test_trace_config_pauses_host_on_429():
+    async def throttled(request):
+        return web.Response(status=429, headers={"Retry-After": "2"})
+
+    app = web.Application()
+    app.router.add_get('/', throttled)
+    server = TestServer(app)
+    await server.start_server()
+    limiter = RateLimiter()
+    try:
+        async with aiohttp.ClientSession(trace_configs=[limiter.trace_config()]) as session:
+            async with session.get(str(server.make_url('/'))) as response:
+                assert response.status == 429
+    finally:
+        await server.close()
+
+    bucket = limiter.bucket(server.host)
+    assert 1.5 < bucket.blocked_until - time.monotonic() <= 2
@@ -0,0 +1,28 @@
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from src.session_manager import SessionManager
+
+
+@pytest.mark.asyncio
+async def test_shared_session_reuses_connections():
+    app = web.Application()
+    app.router.add_get('/', lambda request: web.Response(text="ok"))
+    server = TestServer(app)
+    await server.start_server()
+    before = SessionManager.stats.as_dict()
+    try:
+        for _ in range(3):
+            session = await SessionManager.get_session()
+            assert session is await SessionManager.get_session()
+            async with session.get(str(server.make_url('/'))) as response:
+                assert await response.text() == "ok"
+    finally:
+        await SessionManager.close_all()
+        await server.close()
+
+    after = SessionManager.stats
+    assert after.requests - before['requests'] == 3
+    assert after.connections_created - before['connections_created'] == 1
+    assert after.connections_reused - before['connections_reused'] == 2
+    assert session.closed
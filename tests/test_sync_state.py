@@ -0,0 +1,75 @@
+import json
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from src.fetchers.http import HTTPFetcher
+from src.sync_state import SyncState
+
+
+class FakeNotebook:
+    """Word notes endpoint that may support conditional requests"""
+
+    def __init__(self, etag=True):
+        self.words = ['apple', 'pear']
+        self.etag = etag
+        self.requests = []
+
+    def body(self):
+        notes = [{'source_lang': 'en', 'target_lang': 'zh', 'word': w, 'translate': 'x'} for w in self.words]
+        return json.dumps({'code': 0, 'msg': '', 'data': {'word_notes': notes}})
+
+    async def handle(self, request):
+        self.requests.append(dict(request.headers))
+        body = self.body()
+        tag = f'"{SyncState.digest(body.encode())[:12]}"'
+        if self.etag and request.headers.get('If-None-Match') == tag:
+            return web.Response(status=304)
+        headers = {'ETag': tag} if self.etag else {}
+        return web.Response(text=body, content_type='application/json', headers=headers)
+
+
+async def serve(notebook):
+    app = web.Application()
+    app.router.add_get('/word_notes', notebook.handle)
+    server = TestServer(app)
+    await server.start_server()
+    return server
+
+
+async def fetch(server, state):
+    async with HTTPFetcher(base_url=str(server.make_url('/word_notes')), sync_state=state) as fetcher:
+        words = await fetcher.fetch_data()
+    return [w.word for w in words], fetcher.not_modified
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('etag', [True, False])
+async def test_unchanged_notebook_is_skipped_after_commit(tmp_path, etag):
+    notebook = FakeNotebook(etag=etag)
+    server = await serve(notebook)
+    state_file = str(tmp_path / 'sync_state.json')
+    try:
+        state = SyncState(state_file)
+        assert await fetch(server, state) == (['apple', 'pear'], False)
+        # Not committed, e.g. the export failed: the next run gets the words again
+        state = SyncState(state_file)
+        assert await fetch(server, state) == (['apple', 'pear'], False)
+        state.commit()
+
+        state = SyncState(state_file)
+        assert await fetch(server, state) == ([], True)
+        if etag:
+            assert notebook.requests[-1]['If-None-Match'].startswith('"')
+        else:
+            assert 'If-None-Match' not in notebook.requests[-1]
+
+        notebook.words.append('plum')
+        assert await fetch(server, state) == (['apple', 'pear', 'plum'], False)
+    finally:
+        await server.close()
+
+
+def test_key_ignores_parameter_order():
+    assert SyncState.key('u', {'b': 1, 'a': 2}) == SyncState.key('u', {'a': 2, 'b': 1}) == 'u?a=2&b=1'
+    assert SyncState.key('u') == 'u'